@@ -0,0 +1,256 @@
+"""Benchmark suite over the bundled datasets and synthetic pairs
+
+Times scoring matrix initialization, fill and traceback of the first optimal
+alignment separately, and the whole NeedlemanWunsch.align call, for every
+case and engine. Cells per second and peak memory are written to a JSON
+results file and compared with a stored baseline. Run from the repository
+root:
+
+    python benchmarks/run.py --output bench_results.json
+    python benchmarks/run.py --save-baseline
+
+The script exits with status 1 when a case is slower or uses more memory than
+the baseline by more than the threshold.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, "src")
+
+from global_sequence_alignment.fasta import read_fasta_records  # noqa: E402
+from global_sequence_alignment.needleman_wunsch import (  # noqa: E402
+    NeedlemanWunsch,
+    ScoringMatrix,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+DATASET_CASES = [
+    (
+        "pax6/mouse-chicken",
+        "data/homologous_genes/pax6/mouse.fna",
+        "data/homologous_genes/pax6/chicken.fna",
+        "nucleotide",
+    ),
+    (
+        "pax6/human-mouse",
+        "data/homologous_genes/pax6/human.fna",
+        "data/homologous_genes/pax6/mouse.fna",
+        "nucleotide",
+    ),
+    (
+        "thyroid_peroxidase/human-chimpanzee",
+        "data/homologous_genes/thyroid_peroxidase/human.fna",
+        "data/homologous_genes/thyroid_peroxidase/chimpanzee.fna",
+        "nucleotide",
+    ),
+    (
+        "insulin/hamster-human",
+        "data/proteins/insulin/hamster.faa",
+        "data/proteins/insulin/human.faa",
+        "protein",
+    ),
+]
+
+SYNTHETIC_LENGTHS = [125, 250, 500, 1000]
+
+
+def read_sequence(file_path, max_length):
+    _, sequence = next(read_fasta_records(file_path))
+    return sequence[:max_length].decode("ascii")
+
+
+def make_synthetic_pair(length, random_generator):
+    """Make a random sequence and a copy with about 10% point mutations"""
+    sequence_1 = "".join(random_generator.choices("ACGT", k=length))
+    symbols = list(sequence_1)
+    for _ in range(length // 10):
+        position = random_generator.randrange(len(symbols))
+        mutation = random_generator.choice(["substitute", "insert", "delete"])
+        if mutation == "substitute":
+            symbols[position] = random_generator.choice("ACGT")
+        elif mutation == "insert":
+            symbols.insert(position, random_generator.choice("ACGT"))
+        else:
+            del symbols[position]
+    return sequence_1, "".join(symbols)
+
+
+def get_cases(max_length):
+    cases = [
+        (
+            name,
+            read_sequence(path_1, max_length),
+            read_sequence(path_2, max_length),
+            substitution_matrix,
+        )
+        for name, path_1, path_2, substitution_matrix in DATASET_CASES
+    ]
+    random_generator = random.Random(0)
+    for length in SYNTHETIC_LENGTHS:
+        if length > max_length:
+            continue
+        sequence_1, sequence_2 = make_synthetic_pair(length, random_generator)
+        cases.append((f"synthetic/{length}", sequence_1, sequence_2, "nucleotide"))
+    return cases
+
+
+def time_phases(needleman_wunsch, sequence_1, sequence_2):
+    """Time initialization, fill, traceback and the whole align call once"""
+    start = time.perf_counter()
+    scoring_matrix = ScoringMatrix(
+        sequence_1,
+        sequence_2,
+        needleman_wunsch.scoring_function,
+        needleman_wunsch.substitution_matrix,
+        engine=needleman_wunsch.engine,
+    )
+    init_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scoring_matrix.fill()
+    fill_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    next(scoring_matrix.iter_alignments(), None)
+    traceback_seconds = time.perf_counter() - start
+    del scoring_matrix
+
+    start = time.perf_counter()
+    needleman_wunsch.align(sequence_1, sequence_2, first_only=True)
+    align_seconds = time.perf_counter() - start
+    return init_seconds, fill_seconds, traceback_seconds, align_seconds
+
+
+def run_case(sequence_1, sequence_2, substitution_matrix, engine, repeat):
+    needleman_wunsch = NeedlemanWunsch(
+        substitution_matrix=substitution_matrix, engine=engine
+    )
+    cells = (len(sequence_1) + 1) * (len(sequence_2) + 1)
+
+    # The fastest of repeated runs is the least disturbed by other processes
+    timings = [
+        time_phases(needleman_wunsch, sequence_1, sequence_2) for _ in range(repeat)
+    ]
+    init_seconds, fill_seconds, traceback_seconds, align_seconds = (
+        min(phase_timings) for phase_timings in zip(*timings)
+    )
+
+    tracemalloc.start()
+    needleman_wunsch.align(sequence_1, sequence_2, first_only=True)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "cells": cells,
+        "init_seconds": init_seconds,
+        "fill_seconds": fill_seconds,
+        "traceback_seconds": traceback_seconds,
+        "align_seconds": align_seconds,
+        "cells_per_second": cells / fill_seconds if fill_seconds else None,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def find_regressions(results, baseline, threshold):
+    """Compare results with baseline and describe every regression past threshold"""
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        expected = baseline[key]
+        if result["cells_per_second"] < expected["cells_per_second"] * (1 - threshold):
+            regressions.append(
+                f"{key}: {result['cells_per_second']:.0f} cells/s, baseline {expected['cells_per_second']:.0f}"
+            )
+        if result["peak_memory_bytes"] > expected["peak_memory_bytes"] * (
+            1 + threshold
+        ):
+            regressions.append(
+                f"{key}: {result['peak_memory_bytes']} bytes peak, baseline {expected['peak_memory_bytes']}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--engines", default="python,numpy", help="Comma separated engines to run"
+    )
+    parser.add_argument(
+        "--max-length",
+        type=int,
+        default=1000,
+        help="Dataset sequences are cut to this many symbols",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timings are the fastest of this many runs",
+    )
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative drop of cells/s or growth of peak memory",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store results as the new baseline instead of comparing",
+    )
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    results = {}
+    for name, sequence_1, sequence_2, substitution_matrix in get_cases(args.max_length):
+        for engine in args.engines.split(","):
+            key = f"{name}/{engine}"
+            result = run_case(
+                sequence_1, sequence_2, substitution_matrix, engine, args.repeat
+            )
+            results[key] = result
+            print(
+                f"{key:<45} {result['cells']:>9} cells "
+                f"init {result['init_seconds']:7.3f}s "
+                f"fill {result['fill_seconds']:7.3f}s "
+                f"traceback {result['traceback_seconds']:7.3f}s "
+                f"align {result['align_seconds']:7.3f}s "
+                f"{result['cells_per_second']:>12.0f} cells/s "
+                f"{result['peak_memory_bytes'] / 2**20:8.1f} MiB peak"
+            )
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, skipping regression check")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = find_regressions(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    if regressions:
+        sys.exit(1)
+    print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
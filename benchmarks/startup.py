@@ -0,0 +1,91 @@
+"""Benchmark of command line startup and of many short pairs in one process
+
+Run from the repository root:
+
+    python benchmarks/startup.py --target-ms 200
+
+Exits with status 1 when starting the command line takes longer than the
+target.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPEATS = 7
+JOBS = 1000
+# Modules the command line must not import before they are needed
+LAZY_MODULES = ["numpy", "asyncio", "multiprocessing"]
+
+
+def time_process(arguments, env, input_text=""):
+    """Best wall time of running a process in milliseconds"""
+    best_milliseconds = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        subprocess.run(
+            arguments,
+            input=input_text,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        milliseconds = (time.perf_counter() - start) * 1000
+        if best_milliseconds is None or milliseconds < best_milliseconds:
+            best_milliseconds = milliseconds
+    return best_milliseconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=200.0,
+        help="Maximal milliseconds of starting the command line",
+    )
+    parser.add_argument("--jobs", type=int, default=JOBS)
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH="src")
+    python = sys.executable
+    interpreter = time_process([python, "-c", "pass"], env)
+    library = time_process(
+        [python, "-c", "import global_sequence_alignment.needleman_wunsch"], env
+    )
+    startup = time_process([python, "src/main.py", "--stdin-jsonl"], env)
+
+    job = json.dumps({"sequence_1": "GATTACA", "sequence_2": "GCATGCT"})
+    jobs_milliseconds = time_process(
+        [python, "src/main.py", "--stdin-jsonl"], env, (job + "\n") * args.jobs
+    )
+    per_job = (jobs_milliseconds - startup) / args.jobs
+
+    imported = subprocess.run(
+        [
+            python,
+            "-c",
+            "import sys, main; print(' '.join(sorted(sys.modules)))",
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    eager_modules = [module for module in LAZY_MODULES if module in imported]
+
+    print(f"Interpreter startup     {interpreter:8.1f} ms")
+    print(f"Library import          {library:8.1f} ms")
+    print(f"Command line startup    {startup:8.1f} ms (target {args.target_ms:.0f} ms)")
+    print(f"Short pair in process   {per_job:8.3f} ms ({args.jobs} jobs)")
+    if eager_modules:
+        print(f"Imported at startup: {', '.join(eager_modules)}")
+    if startup > args.target_ms or eager_modules:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
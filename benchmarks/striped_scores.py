@@ -0,0 +1,74 @@
+"""Benchmark of score-only engines in cells per second
+
+Run from the repository root:
+
+    python benchmarks/striped_scores.py
+"""
+import random
+import sys
+import time
+
+sys.path.insert(0, "src")
+
+from global_sequence_alignment.needleman_wunsch import NeedlemanWunsch  # noqa: E402
+
+SEQUENCE_LENGTH = 1000
+REPEATS = 3
+
+
+def time_score(needleman_wunsch, sequence_1, sequence_2):
+    """Best time of scoring the sequences and the score"""
+    best_seconds = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        optimal_score = needleman_wunsch.score(sequence_1, sequence_2)
+        seconds = time.perf_counter() - start
+        if best_seconds is None or seconds < best_seconds:
+            best_seconds = seconds
+    return best_seconds, optimal_score
+
+
+def main():
+    random_generator = random.Random(0)
+    cells = SEQUENCE_LENGTH * SEQUENCE_LENGTH
+    for substitution_matrix in ["nucleotide", "protein"]:
+        alphabet = NeedlemanWunsch(
+            substitution_matrix=substitution_matrix
+        ).substitution_matrix.symbol_to_index
+        sequence_1 = "".join(random_generator.choices(alphabet, k=SEQUENCE_LENGTH))
+        sequence_2 = "".join(random_generator.choices(alphabet, k=SEQUENCE_LENGTH))
+
+        print(substitution_matrix)
+        for scoring_function, engines in [
+            ("linear", ["python", "numpy", "striped"]),
+            ("affine", ["python", "striped"]),
+        ]:
+            scores = {}
+            for engine in engines:
+                if scoring_function == "affine" and engine == "python":
+                    # Affine scores of other engines come from the full Gotoh fill
+                    needleman_wunsch = NeedlemanWunsch(
+                        scoring_function, substitution_matrix
+                    )
+                    start = time.perf_counter()
+                    scoring_matrix = needleman_wunsch.build_scoring_matrix(
+                        sequence_1, sequence_2
+                    )
+                    seconds = time.perf_counter() - start
+                    optimal_score = scoring_matrix.get_optimal_score()
+                else:
+                    seconds, optimal_score = time_score(
+                        NeedlemanWunsch(scoring_function, substitution_matrix, engine),
+                        sequence_1,
+                        sequence_2,
+                    )
+                scores[engine] = optimal_score
+                print(
+                    f"  {scoring_function:<7} {engine:<8} {cells / seconds / 1e6:8.2f} M cells/s"
+                )
+            if len(set(scores.values())) != 1:
+                raise SystemExit(f"Engines disagree on the optimal score: {scores}")
+
+
+if __name__ == "__main__":
+    main()
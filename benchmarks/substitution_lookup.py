@@ -0,0 +1,83 @@
+"""Microbenchmark of the per-cell cost of substitution score lookups
+
+Run from the repository root:
+
+    python benchmarks/substitution_lookup.py
+"""
+import random
+import sys
+import timeit
+
+sys.path.insert(0, "src")
+
+from global_sequence_alignment.needleman_wunsch import (  # noqa: E402
+    InvalidSymbolError,
+    NucleotideSubstitutionMatrix,
+    ProteinSubstitutionMatrix,
+)
+
+SEQUENCE_LENGTH = 300
+REPEATS = 5
+
+
+def get_score_by_scanning(substitution_matrix, symbol_1, symbol_2):
+    """Lookup as done before compiling matrices: membership tests and list.index scans"""
+    if symbol_1 not in substitution_matrix.symbol_to_index:
+        raise InvalidSymbolError(f"Symbol {symbol_1} is not in the substitution matrix")
+    if symbol_2 not in substitution_matrix.symbol_to_index:
+        raise InvalidSymbolError(f"Symbol {symbol_2} is not in the substitution matrix")
+    symbol_1_index = substitution_matrix.symbol_to_index.index(symbol_1)
+    symbol_2_index = substitution_matrix.symbol_to_index.index(symbol_2)
+    return substitution_matrix.scores[symbol_1_index][symbol_2_index]
+
+
+def score_all_cells_by_scanning(substitution_matrix, sequence_1, sequence_2):
+    for symbol_2 in sequence_2:
+        for symbol_1 in sequence_1:
+            get_score_by_scanning(substitution_matrix, symbol_1, symbol_2)
+
+
+def score_all_cells_by_symbols(substitution_matrix, sequence_1, sequence_2):
+    get_score = substitution_matrix.get_score
+    for symbol_2 in sequence_2:
+        for symbol_1 in sequence_1:
+            get_score(symbol_1, symbol_2)
+
+
+def score_all_cells_by_profile(substitution_matrix, sequence_1, sequence_2):
+    profile = substitution_matrix.get_profile(sequence_1)
+    for code_2 in substitution_matrix.encode(sequence_2):
+        substitution_row = profile[code_2]
+        for i in range(len(sequence_1)):
+            substitution_row[i]
+
+
+def main():
+    random_generator = random.Random(0)
+    for substitution_matrix in [
+        NucleotideSubstitutionMatrix(),
+        ProteinSubstitutionMatrix(),
+    ]:
+        alphabet = substitution_matrix.symbol_to_index
+        sequence_1 = "".join(random_generator.choices(alphabet, k=SEQUENCE_LENGTH))
+        sequence_2 = "".join(random_generator.choices(alphabet, k=SEQUENCE_LENGTH))
+        cells = SEQUENCE_LENGTH * SEQUENCE_LENGTH
+
+        print(type(substitution_matrix).__name__)
+        for name, function in [
+            ("list.index scans (before)", score_all_cells_by_scanning),
+            ("get_score on compiled tables", score_all_cells_by_symbols),
+            ("encoded profile rows", score_all_cells_by_profile),
+        ]:
+            seconds = min(
+                timeit.repeat(
+                    lambda: function(substitution_matrix, sequence_1, sequence_2),
+                    number=1,
+                    repeat=REPEATS,
+                )
+            )
+            print(f"  {name:<30} {seconds / cells * 1e9:8.1f} ns per cell")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark of loading NCBI substitution matrices and encoding sequences with them
+
+Run from the repository root:
+
+    python benchmarks/substitution_matrices.py
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, "src")
+
+from global_sequence_alignment.needleman_wunsch import SubstitutionMatrix  # noqa: E402
+from global_sequence_alignment.substitution_matrices import (  # noqa: E402
+    NCBI_MATRICES,
+    get_sidecar_path,
+    load_substitution_matrix,
+    parse_ncbi_matrix,
+)
+
+MATRIX_NAME = "BLOSUM62"
+SEQUENCE_LENGTH = 10**6
+REPEATS = 20
+
+
+def load_from_text(file_path):
+    with open(file_path) as f:
+        return SubstitutionMatrix(*parse_ncbi_matrix(f.read()))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        # Sidecar of the copy is written in the temporary directory too
+        os.environ["XDG_CACHE_HOME"] = directory
+        file_path = os.path.join(directory, MATRIX_NAME)
+        shutil.copyfile(NCBI_MATRICES[MATRIX_NAME], file_path)
+
+        text_seconds = min(
+            timeit.repeat(lambda: load_from_text(file_path), number=1, repeat=REPEATS)
+        )
+        load_substitution_matrix(file_path)
+        if not os.path.exists(get_sidecar_path(file_path)):
+            sys.exit("Sidecar was not written")
+        sidecar_seconds = min(
+            timeit.repeat(
+                lambda: load_substitution_matrix(file_path), number=1, repeat=REPEATS
+            )
+        )
+        substitution_matrix = load_substitution_matrix(file_path)
+
+    alphabet = substitution_matrix.symbol_to_index
+    sequence = "".join(random.Random(0).choices(alphabet, k=SEQUENCE_LENGTH))
+    encode_seconds = min(
+        timeit.repeat(
+            lambda: substitution_matrix.encode(sequence), number=1, repeat=REPEATS
+        )
+    )
+
+    print(f"{MATRIX_NAME} parsed from text      {text_seconds * 1e3:8.3f} ms")
+    print(f"{MATRIX_NAME} loaded from sidecar   {sidecar_seconds * 1e3:8.3f} ms")
+    print(
+        f"Encoding {SEQUENCE_LENGTH} symbols       {encode_seconds * 1e3:8.3f} ms "
+        f"({encode_seconds / SEQUENCE_LENGTH * 1e9:.2f} ns per symbol)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import bisect
+import itertools
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from global_sequence_alignment.needleman_wunsch import (
+    MATCH,
+    Alignment,
+    NeedlemanWunsch,
+    Operations,
+)
+
+logger = logging.getLogger(__name__)
+
+# Long enough for k-mers of genes to be unique, short enough to fit between differences
+KMER_LENGTH = 16
+# Position of k-mers occurring more than once
+REPEATED = -1
+
+# Segment of exact matches starting at start_1 of sequence_1 and start_2 of sequence_2
+Segment = Tuple[int, int, int]
+
+
+def index_kmers(sequence: str, kmer_length: int) -> Dict[str, int]:
+    """Index k-mers of sequence by their position, REPEATED if not unique"""
+    positions: Dict[str, int] = {}
+    for position in range(len(sequence) - kmer_length + 1):
+        kmer = sequence[position : position + kmer_length]
+        positions[kmer] = REPEATED if kmer in positions else position
+    return positions
+
+
+def find_anchors(
+    sequence_1: str, sequence_2: str, kmer_length: int
+) -> List[Tuple[int, int]]:
+    """Find positions of k-mers occurring exactly once in each sequence, by sequence_1"""
+    positions_1 = index_kmers(sequence_1, kmer_length)
+    anchors = []
+    for kmer, position_2 in index_kmers(sequence_2, kmer_length).items():
+        position_1 = positions_1.get(kmer, REPEATED)
+        if position_1 != REPEATED and position_2 != REPEATED:
+            anchors.append((position_1, position_2))
+    anchors.sort()
+    return anchors
+
+
+def chain_anchors(anchors: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Get the longest chain of anchors increasing in both sequences
+
+    Anchors are sorted by position in sequence_1, so the chain is the longest
+    increasing subsequence of their positions in sequence_2.
+    """
+    # Position in sequence_2 and anchor ending the best chain of each length
+    tails: List[int] = []
+    tail_anchors: List[int] = []
+    previous_anchors: List[Optional[int]] = []
+    for anchor_index, (_, position_2) in enumerate(anchors):
+        length = bisect.bisect_left(tails, position_2)
+        previous_anchors.append(tail_anchors[length - 1] if length else None)
+        if length == len(tails):
+            tails.append(position_2)
+            tail_anchors.append(anchor_index)
+        else:
+            tails[length] = position_2
+            tail_anchors[length] = anchor_index
+
+    chain = []
+    anchor_index = tail_anchors[-1] if tail_anchors else None
+    while anchor_index is not None:
+        chain.append(anchors[anchor_index])
+        anchor_index = previous_anchors[anchor_index]
+    return chain[::-1]
+
+
+def merge_anchors(chain: List[Tuple[int, int]], kmer_length: int) -> List[Segment]:
+    """Merge chained k-mers into segments of exact matches that do not overlap
+
+    K-mers overlapping on the same diagonal extend a segment, those
+    overlapping a segment on another diagonal are dropped.
+    """
+    segments: List[Segment] = []
+    for position_1, position_2 in chain:
+        if segments:
+            start_1, start_2, length = segments[-1]
+            same_diagonal = position_1 - start_1 == position_2 - start_2
+            if same_diagonal and position_1 <= start_1 + length:
+                segments[-1] = (start_1, start_2, position_1 + kmer_length - start_1)
+                continue
+            if position_1 < start_1 + length or position_2 < start_2 + length:
+                continue
+        segments.append((position_1, position_2, kmer_length))
+    return segments
+
+
+def join_operations(parts: Iterable[Operations]) -> Operations:
+    """Join run length encoded operations, merging runs of the same operation"""
+    joined: List[Tuple[int, str]] = []
+    for run_length, operation in itertools.chain.from_iterable(parts):
+        if joined and joined[-1][1] == operation:
+            joined[-1] = (joined[-1][0] + run_length, operation)
+        else:
+            joined.append((run_length, operation))
+    return tuple(joined)
+
+
+def align_anchored(
+    needleman_wunsch: NeedlemanWunsch,
+    sequence_1: str,
+    sequence_2: str,
+    kmer_length: int = KMER_LENGTH,
+    workers: int = 1,
+    verify: bool = False,
+) -> Tuple[Alignment, int]:
+    """Find one global alignment keeping exact matches anchored by unique k-mers
+
+    Anchors are k-mers occurring once in each sequence, chained in order in
+    both and merged into segments of exact matches. Chunks between segments
+    are aligned independently, in a process pool if workers > 1, and
+    stitched with the segments into one alignment. Every gap lies within one
+    chunk, so the score is the sum of the scores of chunks and segments, also
+    with affine gap penalty. The alignment is optimal when the optimal ones
+    pass through the segments, with verify the optimal score is computed
+    without anchors and a warning is logged when it is higher.
+    """
+    if kmer_length < 1:
+        raise ValueError("K-mer length has to be at least 1")
+    with needleman_wunsch.instrumentation.phase("anchoring"):
+        segments = merge_anchors(
+            chain_anchors(find_anchors(sequence_1, sequence_2, kmer_length)),
+            kmer_length,
+        )
+    # Chunk k lies before segment k, the last one after all of them
+    chunks = []
+    end_1 = end_2 = 0
+    for start_1, start_2, length in segments + [(len(sequence_1), len(sequence_2), 0)]:
+        chunks.append((end_1, start_1, end_2, start_2))
+        end_1, end_2 = start_1 + length, start_2 + length
+    anchored_symbols = sum(length for _, _, length in segments)
+    logger.info(
+        "Anchored %d of %d symbols in %d segments, aligning %d chunks",
+        anchored_symbols,
+        len(sequence_1),
+        len(segments),
+        len(chunks),
+    )
+
+    chunk_operations: List[Operations] = [()] * len(chunks)
+    score = 0
+    aligned_chunks = [
+        chunk_index
+        for chunk_index, (start_1, end_1, start_2, end_2) in enumerate(chunks)
+        if end_1 > start_1 or end_2 > start_2
+    ]
+    results = needleman_wunsch.align_many(
+        (
+            (
+                sequence_1[start_1:end_1],
+                sequence_2[start_2:end_2],
+            )
+            for start_1, end_1, start_2, end_2 in (
+                chunks[chunk_index] for chunk_index in aligned_chunks
+            )
+        ),
+        workers=workers,
+        first_only=True,
+    )
+    for pair_index, alignments, chunk_score in results:
+        chunk_operations[aligned_chunks[pair_index]] = alignments[0].operations
+        score += chunk_score
+
+    substitution_matrix = needleman_wunsch.substitution_matrix
+    self_scores = [
+        substitution_matrix.scores[code][code]
+        for code in range(substitution_matrix.alphabet_size)
+    ]
+    parts: List[Operations] = []
+    for operations, (start_1, _, length) in zip(chunk_operations, segments):
+        parts.extend([operations, ((length, MATCH),)])
+        score += sum(
+            self_scores[code]
+            for code in substitution_matrix.encode(
+                sequence_1[start_1 : start_1 + length]
+            )
+        )
+    parts.append(chunk_operations[-1])
+    alignment = Alignment.from_operations(
+        sequence_1, sequence_2, join_operations(parts)
+    )
+
+    if verify:
+        verify_score(needleman_wunsch, sequence_1, sequence_2, score)
+    return alignment, score
+
+
+def verify_score(
+    needleman_wunsch: NeedlemanWunsch,
+    sequence_1: str,
+    sequence_2: str,
+    anchored_score: int,
+) -> int:
+    """Compute the optimal score without anchors and compare the anchored one with it
+
+    Only scores are computed, in linear memory, but over all cells, so this
+    is meant for inputs small enough to align whole.
+    """
+    unanchored = NeedlemanWunsch(
+        needleman_wunsch.scoring_function,
+        needleman_wunsch.substitution_matrix,
+        "auto",
+        max_memory=needleman_wunsch.max_memory,
+    )
+    optimal_score = unanchored.score(sequence_1, sequence_2)
+    if anchored_score > optimal_score:
+        # No alignment scores above the optimal one, so chunks were stitched wrongly
+        raise ValueError(
+            f"Anchored score {anchored_score} is above the optimal score {optimal_score}"
+        )
+    if anchored_score < optimal_score:
+        logger.warning(
+            "Anchored score %d is below the optimal score %d",
+            anchored_score,
+            optimal_score,
+        )
+    else:
+        logger.info("Anchored score is the optimal score %d", optimal_score)
+    return optimal_score
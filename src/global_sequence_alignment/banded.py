@@ -0,0 +1,203 @@
+import logging
+from typing import List, Optional, Tuple
+
+from global_sequence_alignment.needleman_wunsch import (
+    DELETION,
+    DIAGONAL_FLAG,
+    INSERTION,
+    MATCH,
+    SIDE_FLAG,
+    UPPER_FLAG,
+    Alignment,
+    ScoringFunction,
+    SubstitutionMatrix,
+    get_linear_gap_penalty,
+    run_length_encode,
+)
+
+logger = logging.getLogger(__name__)
+
+BAND_MARGIN = 16
+
+
+class BandLimitError(ValueError):
+    """Exception raised when a band proving optimality would take too many cells"""
+
+    pass
+
+
+class BandedScoringMatrix:
+    """Scoring matrix restricted to cells within band of the main diagonal
+
+    Only cells (i, j) with |i - j| <= band are computed. Row j stores them at
+    offsets i - j + band, so every row takes 2 * band + 1 cells. Scores are kept
+    in two rolling rows and traceback flags for the whole band.
+    """
+
+    def __init__(
+        self,
+        sequence_1: str,
+        sequence_2: str,
+        scoring_function: ScoringFunction,
+        substitution_matrix: SubstitutionMatrix,
+        band: int,
+    ):
+        self.sequence_1 = sequence_1
+        self.sequence_2 = sequence_2
+        self.gap_penalty = get_linear_gap_penalty(scoring_function)
+        self.substitution_matrix = substitution_matrix
+        # The band has to reach the bottom right corner
+        self.band = max(band, abs(len(sequence_1) - len(sequence_2)))
+        self.width = 2 * self.band + 1
+        self.traceback_flags = bytearray((len(sequence_2) + 1) * self.width)
+        self.optimal_score: Optional[int] = None
+        logger.info(
+            "Initialized banded matrix of %d rows and band %d totalling to %d cells",
+            len(sequence_2) + 1,
+            self.band,
+            len(self.traceback_flags),
+        )
+
+    def fill(self):
+        """Fill cells within the band with scores"""
+        horizontal_length = len(self.sequence_1)
+        band, width, gap_penalty = self.band, self.width, self.gap_penalty
+        codes_2 = self.substitution_matrix.encode(self.sequence_2)
+        profile = self.substitution_matrix.get_profile(self.sequence_1)
+        traceback_flags = self.traceback_flags
+
+        minus_infinity = float("-inf")
+        previous_row: List[float] = [minus_infinity] * width
+        for i in range(min(horizontal_length, band) + 1):
+            previous_row[i + band] = i * gap_penalty
+
+        for j in range(1, len(self.sequence_2) + 1):
+            substitution_row = profile[codes_2[j - 1]]
+            row: List[float] = [minus_infinity] * width
+            first_column = max(0, j - band)
+            if first_column == 0:
+                row[band - j] = j * gap_penalty
+                first_column = 1
+            row_offset = j * width
+            for i in range(first_column, min(horizontal_length, j + band) + 1):
+                k = i - j + band
+                diagonal_score = previous_row[k] + substitution_row[i - 1]
+                upper_score = (
+                    previous_row[k + 1] + gap_penalty
+                    if k + 1 < width
+                    else minus_infinity
+                )
+                side_score = row[k - 1] + gap_penalty if k > 0 else minus_infinity
+
+                max_score = max(diagonal_score, upper_score, side_score)
+                row[k] = max_score
+                flags = 0
+                if diagonal_score == max_score:
+                    flags |= DIAGONAL_FLAG
+                if upper_score == max_score:
+                    flags |= UPPER_FLAG
+                if side_score == max_score:
+                    flags |= SIDE_FLAG
+                traceback_flags[row_offset + k] = flags
+            previous_row = row
+
+        self.optimal_score = int(
+            previous_row[len(self.sequence_1) - len(self.sequence_2) + band]
+        )
+
+    def get_alignment(self) -> Alignment:
+        """Traceback one optimal alignment preferring diagonal, then upper moves"""
+        # Operations are collected from the end, so they are kept reversed
+        path: List[str] = []
+        i, j = len(self.sequence_1), len(self.sequence_2)
+        while i > 0 or j > 0:
+            if j == 0:
+                flags = SIDE_FLAG
+            elif i == 0:
+                flags = UPPER_FLAG
+            else:
+                flags = self.traceback_flags[j * self.width + i - j + self.band]
+
+            if flags & DIAGONAL_FLAG:
+                path.append(MATCH)
+                i, j = i - 1, j - 1
+            elif flags & UPPER_FLAG:
+                path.append(INSERTION)
+                j -= 1
+            elif flags & SIDE_FLAG:
+                path.append(DELETION)
+                i -= 1
+            else:
+                raise ValueError("Matrix is not filled")
+        return Alignment.from_operations(
+            self.sequence_1, self.sequence_2, run_length_encode(reversed(path))
+        )
+
+    def get_outside_score_bound(self) -> float:
+        """Get upper bound of the score of any alignment leaving the band
+
+        A path leaving the band reaches diagonal band + 1 on one side, so it
+        makes at least 2 * (band + 1) - |n - m| gap moves, and every two extra
+        gap moves replace one pair of symbols.
+        """
+        total_length = len(self.sequence_1) + len(self.sequence_2)
+        min_gaps = 2 * (self.band + 1) - abs(
+            len(self.sequence_1) - len(self.sequence_2)
+        )
+        if min_gaps > total_length:
+            return float("-inf")
+        max_symbol_score = max(self.substitution_matrix.lookup_table)
+
+        def get_score_bound(gaps: int) -> float:
+            pairs = (total_length - gaps) / 2
+            return pairs * max_symbol_score + gaps * self.gap_penalty
+
+        # The bound is linear in the number of gaps, so it is largest at an end
+        return max(get_score_bound(min_gaps), get_score_bound(total_length))
+
+    def covers_whole_matrix(self) -> bool:
+        return self.band >= max(len(self.sequence_1), len(self.sequence_2))
+
+
+def align_banded(
+    sequence_1: str,
+    sequence_2: str,
+    scoring_function: ScoringFunction,
+    substitution_matrix: SubstitutionMatrix,
+    band: Optional[int] = None,
+    max_cells: Optional[int] = None,
+) -> Tuple[Alignment, int]:
+    """Find one optimal alignment computing only cells near the main diagonal
+
+    Without band it is the length difference plus BAND_MARGIN. The band is
+    doubled until no alignment leaving it can score better than the one found.
+    BandLimitError is raised instead of filling a band of more than max_cells.
+    """
+    if band is None:
+        band = abs(len(sequence_1) - len(sequence_2)) + BAND_MARGIN
+
+    while True:
+        band = max(band, abs(len(sequence_1) - len(sequence_2)))
+        cells = (len(sequence_2) + 1) * (2 * band + 1)
+        if max_cells is not None and cells > max_cells:
+            raise BandLimitError(
+                f"Band {band} of {cells} cells is over the limit of {max_cells} cells"
+            )
+        banded_matrix = BandedScoringMatrix(
+            sequence_1, sequence_2, scoring_function, substitution_matrix, band
+        )
+        banded_matrix.fill()
+        optimal_score = banded_matrix.optimal_score
+        if (
+            banded_matrix.covers_whole_matrix()
+            or optimal_score >= banded_matrix.get_outside_score_bound()  # type: ignore
+        ):
+            break
+        band = max(1, banded_matrix.band * 2)
+        logger.info(
+            "Score %d within band %d might not be optimal, doubling band",
+            optimal_score,
+            banded_matrix.band,
+        )
+
+    return banded_matrix.get_alignment(), optimal_score  # type: ignore
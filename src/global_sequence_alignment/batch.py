@@ -0,0 +1,150 @@
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from global_sequence_alignment.needleman_wunsch import (
+    Alignment,
+    NeedlemanWunsch,
+    ScoringFunction,
+    SubstitutionMatrix,
+)
+
+logger = logging.getLogger(__name__)
+
+# Aligner of the worker process, set up once by the pool initializer
+_worker_needleman_wunsch: Optional[NeedlemanWunsch] = None
+
+
+def _init_worker(
+    scoring_function: ScoringFunction,
+    substitution_matrix: SubstitutionMatrix,
+    engine: str,
+):
+    global _worker_needleman_wunsch
+    _worker_needleman_wunsch = NeedlemanWunsch(
+        scoring_function, substitution_matrix, engine
+    )
+
+
+def _align_pair(
+    needleman_wunsch: NeedlemanWunsch,
+    sequence_1: str,
+    sequence_2: str,
+    max_alignments: Optional[int],
+    first_only: bool,
+    score_only: bool,
+) -> Tuple[List[Alignment], int]:
+    if score_only:
+        return [], needleman_wunsch.score(sequence_1, sequence_2)
+    alignments, optimal_score, _ = needleman_wunsch.align(
+        sequence_1, sequence_2, max_alignments, first_only
+    )
+    return alignments, optimal_score
+
+
+def _align_pair_in_worker(
+    sequence_1: str,
+    sequence_2: str,
+    max_alignments: Optional[int],
+    first_only: bool,
+    score_only: bool,
+) -> Tuple[List[Alignment], int]:
+    return _align_pair(
+        _worker_needleman_wunsch,  # type: ignore
+        sequence_1,
+        sequence_2,
+        max_alignments,
+        first_only,
+        score_only,
+    )
+
+
+def align_many(
+    needleman_wunsch: NeedlemanWunsch,
+    pairs: Iterable[Tuple[str, str]],
+    workers: int = 1,
+    max_alignments: Optional[int] = None,
+    first_only: bool = False,
+    score_only: bool = False,
+) -> Iterator[Tuple[int, List[Alignment], int]]:
+    """Align pairs of sequences yielding (pair index, alignments, optimal score)
+
+    With more than one worker the pairs are aligned in a process pool and
+    results are yielded in completion order. At most two pairs per worker are
+    in flight, so long pair lists are not submitted all at once. The cache of
+    needleman_wunsch is used in this process only, pairs found in it are not
+    submitted.
+    """
+    if workers <= 1:
+        for pair_index, (sequence_1, sequence_2) in enumerate(pairs):
+            alignments, optimal_score = _align_pair(
+                needleman_wunsch,
+                sequence_1,
+                sequence_2,
+                max_alignments,
+                first_only,
+                score_only,
+            )
+            yield pair_index, alignments, optimal_score
+        return
+
+    # Pool imports multiprocessing, which aligning in this process does not need
+    from concurrent.futures import ProcessPoolExecutor
+
+    cache = needleman_wunsch.cache
+    logger.info("Starting process pool with %d workers", workers)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(
+            needleman_wunsch.scoring_function,
+            needleman_wunsch.substitution_matrix,
+            needleman_wunsch.engine,
+        ),
+    ) as executor:
+        pending: Dict[Future, Tuple[int, Optional[str]]] = {}
+        pairs_iterator = enumerate(pairs)
+        pairs_exhausted = False
+        while pending or not pairs_exhausted:
+            while not pairs_exhausted and len(pending) < workers * 2:
+                try:
+                    pair_index, (sequence_1, sequence_2) = next(pairs_iterator)
+                except StopIteration:
+                    pairs_exhausted = True
+                    break
+
+                key = None
+                if cache is not None:
+                    key = cache.make_key(
+                        needleman_wunsch,
+                        sequence_1,
+                        sequence_2,
+                        max_alignments,
+                        first_only,
+                        score_only,
+                    )
+                    cached = cache.load(key, sequence_1, sequence_2)
+                    if cached is not None:
+                        alignments, optimal_score = cached
+                        yield pair_index, alignments, optimal_score
+                        continue
+
+                future = executor.submit(
+                    _align_pair_in_worker,
+                    sequence_1,
+                    sequence_2,
+                    max_alignments,
+                    first_only,
+                    score_only,
+                )
+                pending[future] = (pair_index, key)
+
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pair_index, key = pending.pop(future)
+                alignments, optimal_score = future.result()
+                if key is not None:
+                    cache.store(key, alignments, optimal_score)  # type: ignore
+                yield pair_index, alignments, optimal_score
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from global_sequence_alignment.needleman_wunsch import Alignment, NeedlemanWunsch
+
+logger = logging.getLogger(__name__)
+
+MEMORY_CACHE_ENTRIES = 256
+DISK_CACHE_MAX_BYTES = 256 * 2**20
+# Disk tier is trimmed to this share of its limit, so eviction does not run on every store
+DISK_CACHE_TRIM_RATIO = 0.9
+
+
+class AlignmentCache:
+    """Cache of optimal scores and alignments addressed by hash of their inputs
+
+    Recently used results are kept in memory, all results are stored as JSON
+    files under cache_dir if it is given, with alignments as CIGAR strings.
+    Files not used for the longest time are deleted when they take more than
+    max_disk_bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        memory_entries: int = MEMORY_CACHE_ENTRIES,
+        max_disk_bytes: int = DISK_CACHE_MAX_BYTES,
+    ):
+        self.cache_dir = cache_dir
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.memory: "OrderedDict[str, dict]" = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_bytes = 0
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.disk_bytes = sum(
+                os.path.getsize(file_path) for file_path in self._get_file_paths()
+            )
+
+    def make_key(
+        self,
+        needleman_wunsch: NeedlemanWunsch,
+        sequence_1: str,
+        sequence_2: str,
+        max_alignments: Optional[int] = None,
+        first_only: bool = False,
+        score_only: bool = False,
+    ) -> str:
+        """Hash sequences with everything that changes the result of aligning them"""
+        scoring_function = needleman_wunsch.scoring_function
+        substitution_matrix = needleman_wunsch.substitution_matrix
+        configuration = [
+            type(scoring_function).__name__,
+            vars(scoring_function),
+            substitution_matrix.symbol_to_index,
+            substitution_matrix.scores,
+            "score" if score_only else [max_alignments, first_only],
+        ]
+        digest = hashlib.sha256(json.dumps(configuration, sort_keys=True).encode())
+        for sequence in (sequence_1, sequence_2):
+            digest.update(b"\0")
+            digest.update(sequence.encode())
+        return digest.hexdigest()
+
+    def load(
+        self, key: str, sequence_1: str, sequence_2: str
+    ) -> Optional[Tuple[List[Alignment], int]]:
+        """Get cached alignments and optimal score or None if they are not cached"""
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+        else:
+            entry = self._load_from_disk(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store_in_memory(key, entry)
+
+        alignments = [
+            Alignment.from_cigar(sequence_1, sequence_2, cigar)
+            for cigar in entry["alignments"]
+        ]
+        return alignments, entry["score"]
+
+    def store(self, key: str, alignments: List[Alignment], optimal_score: int):
+        entry = {
+            "score": optimal_score,
+            "alignments": [alignment.cigar for alignment in alignments],
+        }
+        self._store_in_memory(key, entry)
+        if self.cache_dir is not None:
+            self._store_on_disk(key, entry)
+
+    def _store_in_memory(self, key: str, entry: dict):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _get_file_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")  # type: ignore
+
+    def _get_file_paths(self) -> List[str]:
+        return [
+            os.path.join(directory, file_name)
+            for directory, _, file_names in os.walk(self.cache_dir)  # type: ignore
+            for file_name in file_names
+            if file_name.endswith(".json")
+        ]
+
+    def _load_from_disk(self, key: str) -> Optional[dict]:
+        if self.cache_dir is None:
+            return None
+        file_path = self._get_file_path(key)
+        try:
+            with open(file_path) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        # Modification time orders files for eviction
+        os.utime(file_path)
+        return entry
+
+    def _store_on_disk(self, key: str, entry: dict):
+        file_path = self._get_file_path(key)
+        if os.path.exists(file_path):
+            os.utime(file_path)
+            return
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        # Written to a temporary file first, so readers never see a partial entry
+        with tempfile.NamedTemporaryFile(
+            "w", dir=os.path.dirname(file_path), suffix=".tmp", delete=False
+        ) as f:
+            json.dump(entry, f)
+        os.replace(f.name, file_path)
+        self.disk_bytes += os.path.getsize(file_path)
+        if self.disk_bytes > self.max_disk_bytes:
+            self._evict_from_disk()
+
+    def _evict_from_disk(self):
+        """Delete least recently used files until they fit in the trimmed limit"""
+        files = []
+        for file_path in self._get_file_paths():
+            stat = os.stat(file_path)
+            files.append((stat.st_mtime, stat.st_size, file_path))
+        files.sort()
+
+        self.disk_bytes = sum(size for _, size, _ in files)
+        target_bytes = self.max_disk_bytes * DISK_CACHE_TRIM_RATIO
+        evicted = 0
+        for _, size, file_path in files:
+            if self.disk_bytes <= target_bytes:
+                break
+            os.remove(file_path)
+            self.disk_bytes -= size
+            evicted += 1
+        logger.info("Evicted %d cached results from %s", evicted, self.cache_dir)
+
+    def get_stats(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "disk_bytes": self.disk_bytes,
+        }
+
+    def format_stats(self) -> str:
+        return (
+            f"Cache hits: {self.memory_hits + self.disk_hits} "
+            f"({self.memory_hits} memory, {self.disk_hits} disk), "
+            f"misses: {self.misses}"
+        )
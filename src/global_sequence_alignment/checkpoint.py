@@ -0,0 +1,213 @@
+import logging
+import os
+import struct
+import time
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from global_sequence_alignment.matrix_file import (
+    SCORE_DTYPE,
+    get_metadata,
+    get_traceback_matrices,
+    read_header,
+    write_header,
+)
+from global_sequence_alignment.needleman_wunsch import ScoringMatrix
+
+logger = logging.getLogger(__name__)
+
+# Minimal number of seconds between two checkpoints
+CHECKPOINT_INTERVAL = 60.0
+# Last completed row and checksum of it with the frontier rows following it
+SLOT_HEADER = struct.Struct("<QI")
+FRONTIER_DTYPE = np.dtype("<f8")
+
+MINUS_INFINITY = float("-inf")
+
+
+class FillCheckpoint:
+    """Checkpoint of completed rows of a scoring matrix fill in a file
+
+    The file has the layout of a saved scoring matrix followed by two slots
+    recording the last completed row, plus frontier rows a fill needs besides
+    the matrices, like the layers of the last row of Gotoh's algorithm. Rows
+    completed since the last checkpoint are written and synced first, then the
+    older slot is overwritten, so a crash at any point leaves one valid slot.
+    Checkpoints are written at most once per interval of seconds, so each
+    writes only the rows of that interval. The file is deleted when the fill
+    is finished.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        interval: float = CHECKPOINT_INTERVAL,
+        resume: bool = False,
+    ):
+        self.file_path = file_path
+        self.interval = interval
+        self.resume = resume
+        self.file = None
+        self.scoring_matrix: Optional[ScoringMatrix] = None
+        self.rows_written = 0
+        self._slot = 0
+        self._next_time = 0.0
+
+    def start(
+        self, scoring_matrix: ScoringMatrix, frontier_rows: int = 0
+    ) -> Tuple[int, Optional[List[List[float]]]]:
+        """Start checkpointing fill of an initialized matrix
+
+        When resuming, completed rows are restored into the matrix. Returns
+        the last completed row and its frontier rows, None if no row was
+        completed.
+        """
+        self.scoring_matrix = scoring_matrix
+        self.frontier_rows = frontier_rows
+        horizontal_length = len(scoring_matrix.sequence_1) + 1
+        vertical_length = len(scoring_matrix.sequence_2) + 1
+        self.horizontal_length = horizontal_length
+        self.cells = vertical_length * horizontal_length
+        self.traceback_matrices = get_traceback_matrices(scoring_matrix)
+        self.frontier_size = frontier_rows * horizontal_length * FRONTIER_DTYPE.itemsize
+        self._next_time = time.monotonic() + self.interval
+
+        metadata = get_metadata(scoring_matrix)
+        if self.resume and os.path.exists(self.file_path):
+            self.file = open(self.file_path, "r+b")
+            traceback_count, saved_metadata, self.scores_offset = read_header(
+                self.file, self.file_path
+            )
+            if saved_metadata != metadata or traceback_count != len(
+                self.traceback_matrices
+            ):
+                self.file.close()
+                raise ValueError(
+                    f"Checkpoint {self.file_path} is of a different alignment"
+                )
+            self._set_offsets()
+            rows_completed, frontier = self._restore()
+            logger.info(
+                "Resuming fill from row %d of %d", rows_completed, vertical_length - 1
+            )
+            return rows_completed, frontier
+
+        if self.resume:
+            logger.info("No checkpoint at %s, filling from the start", self.file_path)
+        self.file = open(self.file_path, "w+b")
+        self.scores_offset = write_header(
+            self.file, metadata, len(self.traceback_matrices)
+        )
+        self._set_offsets()
+        # Empty slots have invalid checksums
+        self.file.truncate(self.slots_offset + 2 * self.slot_size)
+        return 0, None
+
+    def _set_offsets(self):
+        self.flags_offset = self.scores_offset + self.cells * SCORE_DTYPE.itemsize
+        self.slots_offset = self.flags_offset + self.cells * len(
+            self.traceback_matrices
+        )
+        self.slot_size = SLOT_HEADER.size + self.frontier_size
+
+    def _restore(self) -> Tuple[int, Optional[List[List[float]]]]:
+        """Read the valid slot with most rows and the rows it records"""
+        best_slot = None
+        for slot in range(2):
+            self.file.seek(self.slots_offset + slot * self.slot_size)
+            data = self.file.read(self.slot_size)
+            rows_completed, checksum = SLOT_HEADER.unpack_from(data)
+            frontier_bytes = data[SLOT_HEADER.size :]
+            if checksum != zlib.crc32(data[:8] + frontier_bytes):
+                continue
+            if best_slot is None or rows_completed > best_slot[1]:
+                best_slot = (slot, rows_completed, frontier_bytes)
+        if best_slot is None or best_slot[1] == 0:
+            return 0, None
+        slot, rows_completed, frontier_bytes = best_slot
+        # Next checkpoint overwrites the other slot
+        self._slot = 1 - slot
+        self.rows_written = rows_completed
+
+        horizontal_length = self.horizontal_length
+        scores = self.scoring_matrix.scoring_matrix  # type: ignore
+        # First row is initialized, not filled, so it is not in the file
+        self.file.seek(self.scores_offset + horizontal_length * SCORE_DTYPE.itemsize)
+        for j in range(1, rows_completed + 1):
+            row = np.frombuffer(
+                self.file.read(horizontal_length * SCORE_DTYPE.itemsize),
+                dtype=SCORE_DTYPE,
+            )
+            if isinstance(scores, list):
+                scores[j] = row.tolist()
+            else:
+                scores[j] = row
+        start = horizontal_length
+        end = (rows_completed + 1) * horizontal_length
+        for k, traceback_matrix in enumerate(self.traceback_matrices):
+            self.file.seek(self.flags_offset + k * self.cells + start)
+            traceback_matrix.flags[start:end] = self.file.read(end - start)
+
+        if not self.frontier_rows:
+            return rows_completed, None
+        frontier_values = np.frombuffer(frontier_bytes, dtype=FRONTIER_DTYPE).reshape(
+            self.frontier_rows, horizontal_length
+        )
+        # Finite scores are integers, as when they were computed
+        frontier = [
+            [value if value == MINUS_INFINITY else int(value) for value in row]
+            for row in frontier_values.tolist()
+        ]
+        return rows_completed, frontier
+
+    def update(self, row: int, frontier: Optional[Sequence[List[float]]] = None):
+        """Record that rows up to row are completed, writing them if the interval passed"""
+        now = time.monotonic()
+        if now < self._next_time:
+            return
+        self._next_time = now + self.interval
+        self.write(row, frontier)
+
+    def write(self, row: int, frontier: Optional[Sequence[List[float]]] = None):
+        """Write rows completed since the last checkpoint and record row as the last one"""
+        f = self.file
+        horizontal_length = self.horizontal_length
+        first_row = self.rows_written + 1
+        scores = self.scoring_matrix.scoring_matrix  # type: ignore
+        f.seek(
+            self.scores_offset + first_row * horizontal_length * SCORE_DTYPE.itemsize
+        )
+        for j in range(first_row, row + 1):
+            f.write(np.asarray(scores[j], dtype=SCORE_DTYPE).tobytes())
+        start = first_row * horizontal_length
+        end = (row + 1) * horizontal_length
+        for k, traceback_matrix in enumerate(self.traceback_matrices):
+            f.seek(self.flags_offset + k * self.cells + start)
+            f.write(traceback_matrix.flags[start:end])
+        # Rows have to be on disk before a slot refers to them
+        f.flush()
+        os.fsync(f.fileno())
+
+        frontier_bytes = b""
+        if frontier is not None:
+            frontier_bytes = np.asarray(frontier, dtype=FRONTIER_DTYPE).tobytes()
+        row_bytes = struct.pack("<Q", row)
+        f.seek(self.slots_offset + self._slot * self.slot_size)
+        f.write(
+            SLOT_HEADER.pack(row, zlib.crc32(row_bytes + frontier_bytes))
+            + frontier_bytes
+        )
+        f.flush()
+        os.fsync(f.fileno())
+        self._slot = 1 - self._slot
+        self.rows_written = row
+
+    def finish(self):
+        """Close and delete the checkpoint of a finished fill"""
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        os.remove(self.file_path)
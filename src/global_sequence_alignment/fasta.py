@@ -0,0 +1,77 @@
+import gzip
+import mmap
+from typing import BinaryIO, Iterator, List, Tuple
+
+GZIP_MAGIC = b"\x1f\x8b"
+WHITESPACE = b" \t\r\n\v\f"
+
+
+class FastaFormatError(Exception):
+    """Exception raised when a file is not in FASTA format"""
+
+    pass
+
+
+def _read_mapped_records(mapped: mmap.mmap) -> Iterator[Tuple[str, bytes]]:
+    """Yield records of memory mapped FASTA file, copying each sequence once"""
+    size = len(mapped)
+    position = 0
+    # Skip blank lines before the first header
+    while position < size and mapped[position] in WHITESPACE:
+        position += 1
+    if position < size and mapped[position] != ord(">"):
+        raise FastaFormatError("FASTA file has to start with a header line")
+
+    while position < size:
+        header_end = mapped.find(b"\n", position)
+        if header_end == -1:
+            header_end = size
+        header_start = position + 1
+        header = mapped[header_start:header_end].decode().strip()
+
+        next_header = mapped.find(b"\n>", header_end)
+        sequence_end = size if next_header == -1 else next_header
+        # Sequence lines are joined by deleting line breaks in a single pass
+        sequence = mapped[header_end:sequence_end].translate(None, WHITESPACE)
+        yield header, sequence
+
+        position = sequence_end + 1
+
+
+def _read_streamed_records(file: BinaryIO) -> Iterator[Tuple[str, bytes]]:
+    """Yield records of FASTA file read line by line"""
+    header = None
+    sequence_lines: List[bytes] = []
+    for line in file:
+        if line.startswith(b">"):
+            if header is not None:
+                yield header, b"".join(sequence_lines)
+            header = line[1:].decode().strip()
+            sequence_lines = []
+        elif header is None:
+            if line.strip():
+                raise FastaFormatError("FASTA file has to start with a header line")
+        else:
+            sequence_lines.append(line.translate(None, WHITESPACE))
+    if header is not None:
+        yield header, b"".join(sequence_lines)
+
+
+def read_fasta_records(file_path: str) -> Iterator[Tuple[str, bytes]]:
+    """Read (header, sequence) records of FASTA file lazily
+
+    Plain files are memory mapped, so only the record being yielded is copied
+    into memory. Gzip compressed files are decompressed while streaming.
+    """
+    with open(file_path, "rb") as f:
+        if f.read(len(GZIP_MAGIC)) == GZIP_MAGIC:
+            f.seek(0)
+            with gzip.open(f) as gzip_file:
+                yield from _read_streamed_records(gzip_file)  # type: ignore
+            return
+
+        f.seek(0, 2)
+        if f.tell() == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from _read_mapped_records(mapped)
@@ -0,0 +1,124 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Minimal number of seconds between two progress messages
+PROGRESS_LOG_INTERVAL = 5.0
+
+
+class Instrumentation:
+    """Hooks called around alignment phases, doing nothing by default
+
+    Hooks are called once per phase and once per filled matrix, never per
+    cell, so the default instance costs a few method calls per alignment.
+    """
+
+    def start_phase(self, phase: str):
+        pass
+
+    def end_phase(self, phase: str):
+        pass
+
+    def add_cells(self, cells: int):
+        """Count scoring matrix cells computed"""
+        pass
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        self.start_phase(phase)
+        try:
+            yield
+        finally:
+            self.end_phase(phase)
+
+
+NO_INSTRUMENTATION = Instrumentation()
+
+
+class PhaseTimer(Instrumentation):
+    """Instrumentation measuring wall time of phases and counting cells
+
+    Time of a phase started within another one is not counted for the outer
+    phase, so phase times add up to the total time.
+    """
+
+    def __init__(self):
+        self.phase_seconds: Dict[str, float] = {}
+        self.cells = 0
+        self._active_phases: List[str] = []
+        self._last_time = 0.0
+
+    def _account_time(self):
+        now = time.perf_counter()
+        if self._active_phases:
+            phase = self._active_phases[-1]
+            self.phase_seconds[phase] = (
+                self.phase_seconds.get(phase, 0.0) + now - self._last_time
+            )
+        self._last_time = now
+
+    def start_phase(self, phase: str):
+        self._account_time()
+        self._active_phases.append(phase)
+
+    def end_phase(self, phase: str):
+        self._account_time()
+        if not self._active_phases or self._active_phases[-1] != phase:
+            raise ValueError(f"Phase {phase} is not the last started phase")
+        self._active_phases.pop()
+
+    def add_cells(self, cells: int):
+        self.cells += cells
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.phase_seconds.values())
+
+    @property
+    def cells_per_second(self) -> Optional[float]:
+        """Rate of the fill phase or None if nothing was filled"""
+        fill_seconds = self.phase_seconds.get("fill")
+        if not self.cells or not fill_seconds:
+            return None
+        return self.cells / fill_seconds
+
+    def get_report(self) -> dict:
+        return {
+            "phases": dict(self.phase_seconds),
+            "total_seconds": self.total_seconds,
+            "cells": self.cells,
+            "cells_per_second": self.cells_per_second,
+        }
+
+    def format_report(self) -> str:
+        total_seconds = self.total_seconds
+        lines = ["Phase breakdown:"]
+        for phase, seconds in self.phase_seconds.items():
+            share = seconds / total_seconds * 100 if total_seconds else 0.0
+            lines.append(f"  {phase:<15} {seconds:10.4f}s {share:6.1f}%")
+        lines.append(f"  {'total':<15} {total_seconds:10.4f}s")
+        lines.append(f"Cells computed: {self.cells}")
+        if self.cells_per_second is not None:
+            lines.append(f"Cells per second: {self.cells_per_second:.0f}")
+        return "\n".join(lines)
+
+
+class ProgressLogger:
+    """Log share of computed cells at most once per interval of seconds"""
+
+    def __init__(self, total_cells: int, interval: float = PROGRESS_LOG_INTERVAL):
+        self.total_cells = total_cells
+        self.interval = interval
+        self._next_time = time.monotonic() + interval
+
+    def update(self, cells_computed: int):
+        now = time.monotonic()
+        if now < self._next_time:
+            return
+        self._next_time = now + self.interval
+        logger.info(
+            "Computed %d%% of cells", cells_computed * 100 // max(self.total_cells, 1)
+        )
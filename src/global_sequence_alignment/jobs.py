@@ -0,0 +1,150 @@
+import json
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from global_sequence_alignment.batch import _align_pair
+from global_sequence_alignment.needleman_wunsch import (
+    ENGINES,
+    SCORING_FUNCTIONS,
+    SUBSTITUTION_MATRICES,
+    InvalidSymbolError,
+    NeedlemanWunsch,
+)
+from global_sequence_alignment.substitution_matrices import NCBI_MATRICES
+
+# Jobs may come from the network, so by default they are bounded to keep a
+# worker from enumerating co-optimal alignments or filling cells for too long
+MAX_JOB_ALIGNMENTS = 100
+MAX_JOB_SEQUENCE_LENGTH = 2**20
+
+# Aligners of the process, one per combination of settings seen
+_aligners: Dict[Tuple[str, str, str], NeedlemanWunsch] = {}
+
+
+def _get_flag(job: dict, name: str) -> bool:
+    flag = job.get(name, False)
+    if not isinstance(flag, bool):
+        raise ValueError(f"{name} has to be a boolean")
+    return flag
+
+
+def parse_job(
+    job: dict,
+    alignment_limit: int = MAX_JOB_ALIGNMENTS,
+    length_limit: int = MAX_JOB_SEQUENCE_LENGTH,
+) -> tuple:
+    """Validate alignment job and get its fields in a fixed order
+
+    The tuple identifies the computation, so jobs with equal tuples can share it.
+    Jobs without max_alignments get alignment_limit of them, jobs asking for
+    more or with sequences longer than length_limit are invalid.
+    """
+    sequence_1 = job.get("sequence_1")
+    sequence_2 = job.get("sequence_2")
+    if not isinstance(sequence_1, str) or not isinstance(sequence_2, str):
+        raise ValueError("Job has to have sequence_1 and sequence_2 strings")
+    if max(len(sequence_1), len(sequence_2)) > length_limit:
+        raise ValueError(f"Sequences have to be at most {length_limit} symbols long")
+    scoring_function = job.get("scoring_function", "constant")
+    if scoring_function not in SCORING_FUNCTIONS:
+        raise ValueError("Invalid scoring function")
+    substitution_matrix = job.get("substitution_matrix", "nucleotide")
+    # Matrix files are addressable by registered names only, never by path
+    if (
+        substitution_matrix not in SUBSTITUTION_MATRICES
+        and substitution_matrix not in NCBI_MATRICES
+    ):
+        raise ValueError("Invalid substitution matrix")
+    engine = job.get("engine", "python")
+    if engine not in ENGINES:
+        raise ValueError("Invalid engine")
+    max_alignments = job.get("max_alignments", alignment_limit)
+    if (
+        not isinstance(max_alignments, int)
+        or isinstance(max_alignments, bool)
+        or max_alignments < 1
+    ):
+        raise ValueError("max_alignments has to be a positive integer")
+    if max_alignments > alignment_limit:
+        raise ValueError(f"max_alignments has to be at most {alignment_limit}")
+    return (
+        sequence_1,
+        sequence_2,
+        scoring_function,
+        substitution_matrix,
+        engine,
+        max_alignments,
+        _get_flag(job, "first_only"),
+        _get_flag(job, "score_only"),
+    )
+
+
+def parse_job_line(line: Union[str, bytes]) -> Optional[dict]:
+    """Decode job sent as a line of JSON, None if it is not a JSON object"""
+    try:
+        job = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return job if isinstance(job, dict) else None
+
+
+def format_result(job: Optional[dict], result: dict) -> str:
+    """Encode result as a line of JSON carrying the id of its job"""
+    if job is not None and "id" in job:
+        result = {"id": job["id"], **result}
+    return json.dumps(result) + "\n"
+
+
+def run_job(
+    sequence_1: str,
+    sequence_2: str,
+    scoring_function: str,
+    substitution_matrix: str,
+    engine: str,
+    max_alignments: Optional[int],
+    first_only: bool,
+    score_only: bool,
+) -> dict:
+    """Align parsed job with the aligner of its settings, built on first use"""
+    settings = (scoring_function, substitution_matrix, engine)
+    needleman_wunsch = _aligners.get(settings)
+    if needleman_wunsch is None:
+        needleman_wunsch = NeedlemanWunsch(*settings)
+        _aligners[settings] = needleman_wunsch
+
+    try:
+        alignments, optimal_score = _align_pair(
+            needleman_wunsch,
+            sequence_1,
+            sequence_2,
+            max_alignments,
+            first_only,
+            score_only,
+        )
+    except (ValueError, InvalidSymbolError) as error:
+        return {"error": str(error)}
+    return {
+        "score": optimal_score,
+        "alignments": [
+            [alignment.sequence_1, alignment.sequence_2] for alignment in alignments
+        ],
+    }
+
+
+def align_job_lines(lines: Iterable[Union[str, bytes]]) -> Iterator[str]:
+    """Align jobs of JSON lines one by one in this process, yielding result lines
+
+    Aligners and their substitution matrices are kept between jobs, so many
+    short pairs cost little more than their fills.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        job = parse_job_line(line)
+        if job is None:
+            result = {"error": "Job has to be a JSON object"}
+        else:
+            try:
+                result = run_job(*parse_job(job))
+            except ValueError as error:
+                result = {"error": str(error)}
+        yield format_result(job, result)
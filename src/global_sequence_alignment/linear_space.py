@@ -0,0 +1,221 @@
+import logging
+from itertools import islice
+from typing import List, Sequence, Tuple
+
+from global_sequence_alignment.needleman_wunsch import (
+    DELETION,
+    INSERTION,
+    MATCH,
+    Alignment,
+    ScoringFunction,
+    SubstitutionMatrix,
+    get_linear_gap_penalty,
+    run_length_encode,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def compute_last_row(
+    sequence_1: str,
+    sequence_2: str,
+    gap_penalty: int,
+    substitution_matrix: SubstitutionMatrix,
+    engine: str = "python",
+    profile=None,
+) -> Sequence[int]:
+    """Compute last row of the scoring matrix keeping only two rows in memory
+
+    Cell i of the returned row is the optimal score of aligning the first i
+    symbols of sequence_1 with the whole sequence_2. The profile of sequence_1
+    in the form of the engine is built if not given.
+    """
+    if engine == "numpy":
+        from global_sequence_alignment import numpy_engine
+
+        return numpy_engine.compute_last_row(
+            sequence_1, sequence_2, gap_penalty, substitution_matrix, profile
+        )
+    if engine == "striped":
+        from global_sequence_alignment import striped
+
+        return striped.compute_last_row(
+            sequence_1,
+            sequence_2,
+            gap_penalty,
+            gap_penalty,
+            substitution_matrix,
+            profile,
+        )
+
+    codes_2 = substitution_matrix.encode(sequence_2)
+    if profile is None:
+        profile = substitution_matrix.get_profile(sequence_1)
+    previous_row = [i * gap_penalty for i in range(len(sequence_1) + 1)]
+    for j, code_2 in enumerate(codes_2, start=1):
+        substitution_row = profile[code_2]
+        side_score = j * gap_penalty
+        row = [side_score]
+        for diagonal_value, upper_value, substitution_score in zip(
+            previous_row, islice(previous_row, 1, None), substitution_row
+        ):
+            side_score = max(
+                diagonal_value + substitution_score,
+                upper_value + gap_penalty,
+                side_score + gap_penalty,
+            )
+            row.append(side_score)
+        previous_row = row
+    return previous_row
+
+
+def _align_single_symbol(
+    sequence_1: str,
+    start_1: int,
+    end_1: int,
+    symbol_2: str,
+    gap_penalty: int,
+    substitution_matrix: SubstitutionMatrix,
+    operations: List[str],
+) -> int:
+    """Align part of sequence against one symbol appending operations, return the score"""
+    length = end_1 - start_1
+    # Start with the symbol aligned against a gap and try matching it instead
+    best_score = (length + 1) * gap_penalty
+    best_index = None
+    for i in range(start_1, end_1):
+        score = (length - 1) * gap_penalty + substitution_matrix.get_score(
+            sequence_1[i], symbol_2
+        )
+        if score > best_score:
+            best_score = score
+            best_index = i - start_1
+
+    if best_index is None:
+        operations.append(DELETION * length + INSERTION)
+    else:
+        operations.append(
+            DELETION * best_index + MATCH + DELETION * (length - best_index - 1)
+        )
+    return best_score
+
+
+def _hirschberg_recursive(
+    sequences: Tuple[str, str, str, str],
+    start_1: int,
+    end_1: int,
+    start_2: int,
+    end_2: int,
+    gap_penalty: int,
+    substitution_matrix: SubstitutionMatrix,
+    engine: str,
+    operations: List[str],
+) -> int:
+    """Append operations of an optimal alignment of parts of sequences and return its score
+
+    Parts are given by indices into sequences, which are sequence_1, sequence_2
+    and their reversals, so no level of the recursion keeps copies of them.
+    """
+    sequence_1, sequence_2, reversed_1, reversed_2 = sequences
+    length_1 = end_1 - start_1
+    length_2 = end_2 - start_2
+    if not length_2:
+        operations.append(DELETION * length_1)
+        return length_1 * gap_penalty
+    if not length_1:
+        operations.append(INSERTION * length_2)
+        return length_2 * gap_penalty
+    if length_2 == 1:
+        return _align_single_symbol(
+            sequence_1,
+            start_1,
+            end_1,
+            sequence_2[start_2],
+            gap_penalty,
+            substitution_matrix,
+            operations,
+        )
+
+    # Split sequence_2 in half and find where the optimal path crosses the middle row,
+    # engines take contiguous parts copied only for the duration of the call
+    middle = start_2 + length_2 // 2
+    upper_row = compute_last_row(
+        sequence_1[start_1:end_1],
+        sequence_2[start_2:middle],
+        gap_penalty,
+        substitution_matrix,
+        engine,
+    )
+    total_1 = len(sequence_1)
+    total_2 = len(sequence_2)
+    lower_row = compute_last_row(
+        reversed_1[total_1 - end_1 : total_1 - start_1],
+        reversed_2[total_2 - end_2 : total_2 - middle],
+        gap_penalty,
+        substitution_matrix,
+        engine,
+    )
+    split, optimal_score = max(
+        ((i, int(upper_row[i] + lower_row[length_1 - i])) for i in range(length_1 + 1)),
+        key=lambda candidate: candidate[1],
+    )
+    # Rows are not kept while the halves are aligned
+    del upper_row, lower_row
+
+    _hirschberg_recursive(
+        sequences,
+        start_1,
+        start_1 + split,
+        start_2,
+        middle,
+        gap_penalty,
+        substitution_matrix,
+        engine,
+        operations,
+    )
+    _hirschberg_recursive(
+        sequences,
+        start_1 + split,
+        end_1,
+        middle,
+        end_2,
+        gap_penalty,
+        substitution_matrix,
+        engine,
+        operations,
+    )
+    return optimal_score
+
+
+def hirschberg(
+    sequence_1: str,
+    sequence_2: str,
+    scoring_function: ScoringFunction,
+    substitution_matrix: SubstitutionMatrix,
+    engine: str = "python",
+) -> Tuple[Alignment, int]:
+    """Find one optimal alignment and its score in O(n+m) memory"""
+    gap_penalty = get_linear_gap_penalty(scoring_function)
+    logger.info(
+        "Aligning sequences of lengths %d and %d in linear space",
+        len(sequence_1),
+        len(sequence_2),
+    )
+
+    # Runs of operations of the aligned parts in order
+    operations: List[str] = []
+    optimal_score = _hirschberg_recursive(
+        (sequence_1, sequence_2, sequence_1[::-1], sequence_2[::-1]),
+        0,
+        len(sequence_1),
+        0,
+        len(sequence_2),
+        gap_penalty,
+        substitution_matrix,
+        engine,
+        operations,
+    )
+    alignment = Alignment.from_operations(
+        sequence_1, sequence_2, run_length_encode("".join(operations))
+    )
+    return alignment, optimal_score
@@ -0,0 +1,149 @@
+import json
+import mmap
+import struct
+from typing import BinaryIO, List, Tuple
+
+import numpy as np
+
+from global_sequence_alignment.needleman_wunsch import (
+    SCORING_FUNCTIONS,
+    AffineScoringMatrix,
+    ScoringMatrix,
+    SubstitutionMatrix,
+    TracebackMatrix,
+)
+
+MAGIC = b"NWMATRIX"
+FORMAT_VERSION = 1
+# Magic, format version, number of traceback matrices and length of JSON metadata
+HEADER = struct.Struct("<8sHHI")
+# Arrays start at a multiple of this, so scores can be viewed in place
+ARRAY_ALIGNMENT = 8
+SCORE_DTYPE = np.dtype("<i4")
+
+
+def get_traceback_matrices(scoring_matrix: ScoringMatrix) -> List[TracebackMatrix]:
+    """Get traceback matrix of a scoring matrix followed by its layer ones if any"""
+    traceback_matrices = [scoring_matrix.traceback_matrix]
+    if isinstance(scoring_matrix, AffineScoringMatrix):
+        traceback_matrices.extend(scoring_matrix.layer_traceback_matrices)
+    return traceback_matrices
+
+
+def get_metadata(scoring_matrix: ScoringMatrix) -> dict:
+    """Get sequences and scoring settings of a matrix as stored in its file"""
+    scoring_function = scoring_matrix.scoring_function
+    substitution_matrix = scoring_matrix.substitution_matrix
+    metadata = {
+        "sequence_1": scoring_matrix.sequence_1,
+        "sequence_2": scoring_matrix.sequence_2,
+        "scoring_function": type(scoring_function).__name__,
+        "scoring_parameters": vars(scoring_function),
+        "symbols": substitution_matrix.symbol_to_index,
+        "substitution_scores": substitution_matrix.scores,
+    }
+    # Round trip makes it equal to metadata read from a file
+    return json.loads(json.dumps(metadata))
+
+
+def get_scores_offset(metadata_length: int) -> int:
+    scores_offset = HEADER.size + metadata_length
+    return scores_offset + -scores_offset % ARRAY_ALIGNMENT
+
+
+def write_header(f: BinaryIO, metadata: dict, traceback_count: int) -> int:
+    """Write header and metadata padded to the scores, return offset of the scores"""
+    metadata_bytes = json.dumps(metadata).encode()
+    f.write(HEADER.pack(MAGIC, FORMAT_VERSION, traceback_count, len(metadata_bytes)))
+    f.write(metadata_bytes)
+    scores_offset = get_scores_offset(len(metadata_bytes))
+    f.write(bytes(scores_offset - HEADER.size - len(metadata_bytes)))
+    return scores_offset
+
+
+def read_header(f: BinaryIO, file_path: str) -> Tuple[int, dict, int]:
+    """Read header and metadata, return number of traceback matrices, metadata and offset of the scores"""
+    header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{file_path} is not a scoring matrix file")
+    magic, version, traceback_count, metadata_length = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{file_path} is not a scoring matrix file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported scoring matrix file version {version}")
+    metadata = json.loads(f.read(metadata_length))
+    return traceback_count, metadata, get_scores_offset(metadata_length)
+
+
+def save_scoring_matrix(scoring_matrix: ScoringMatrix, file_path: str):
+    """Write filled scoring matrix to a binary file
+
+    The file has a header, JSON metadata with the sequences and scoring
+    settings, scores as little endian 32 bit integers row by row, and one byte
+    of traceback flags per cell for every traceback matrix.
+    """
+    # Unfilled matrices have no scores to save
+    scoring_matrix.get_optimal_score()
+    traceback_matrices = get_traceback_matrices(scoring_matrix)
+
+    with open(file_path, "wb") as f:
+        write_header(f, get_metadata(scoring_matrix), len(traceback_matrices))
+        # Rows are converted one by one, so lists of the python engine are not copied whole
+        for row in scoring_matrix.scoring_matrix:
+            f.write(np.asarray(row, dtype=SCORE_DTYPE).tobytes())
+        for traceback_matrix in traceback_matrices:
+            f.write(traceback_matrix.flags)
+
+
+def load_scoring_matrix(file_path: str) -> ScoringMatrix:
+    """Map scoring matrix saved with save_scoring_matrix into memory
+
+    Scores and traceback flags are read-only views of the mapped file, so
+    pages are read only when traceback or rendering touches them. The matrix
+    can be traced back and rendered, but not filled again.
+    """
+    with open(file_path, "rb") as f:
+        traceback_count, metadata, scores_offset = read_header(f, file_path)
+        # Mapping stays valid after the file is closed
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    sequence_1 = metadata["sequence_1"]
+    sequence_2 = metadata["sequence_2"]
+    horizontal_length = len(sequence_1) + 1
+    vertical_length = len(sequence_2) + 1
+    cells = vertical_length * horizontal_length
+    flags_offset = scores_offset + cells * SCORE_DTYPE.itemsize
+    if len(buffer) != flags_offset + cells * traceback_count:
+        raise ValueError(f"{file_path} is truncated")
+
+    scores = np.frombuffer(
+        buffer, dtype=SCORE_DTYPE, count=cells, offset=scores_offset
+    ).reshape(vertical_length, horizontal_length)
+    flags = memoryview(buffer)
+    traceback_matrices = [
+        TracebackMatrix(
+            vertical_length,
+            horizontal_length,
+            flags[flags_offset + k * cells : flags_offset + (k + 1) * cells],
+        )
+        for k in range(traceback_count)
+    ]
+
+    scoring_function_classes = {
+        scoring_function_class.__name__: scoring_function_class
+        for scoring_function_class in SCORING_FUNCTIONS.values()
+    }
+    scoring_function_class = scoring_function_classes.get(metadata["scoring_function"])
+    if scoring_function_class is None:
+        raise ValueError(f"Unknown scoring function {metadata['scoring_function']}")
+
+    matrix_class = AffineScoringMatrix if traceback_count > 1 else ScoringMatrix
+    # Matrices are restored from the file instead of being initialized and filled
+    return matrix_class.from_filled_matrices(
+        sequence_1,
+        sequence_2,
+        scoring_function_class(**metadata["scoring_parameters"]),
+        SubstitutionMatrix(metadata["substitution_scores"], metadata["symbols"]),
+        scores,
+        traceback_matrices,
+    )
@@ -0,0 +1,525 @@
+import itertools
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from global_sequence_alignment import numpy_engine
+from global_sequence_alignment.instrumentation import Instrumentation, ProgressLogger
+from global_sequence_alignment.needleman_wunsch import (
+    DELETION,
+    INSERTION,
+    MATCH,
+    AffineGapPenalty,
+    Alignment,
+    NeedlemanWunsch,
+    ScoringFunction,
+    ScoringMatrix,
+    SubstitutionMatrix,
+    TracebackMatrix,
+    get_linear_gap_penalty,
+    run_length_encode,
+)
+from global_sequence_alignment.planner import get_available_memory
+
+logger = logging.getLogger(__name__)
+
+GAP_SYMBOL = "-"
+UPGMA = "upgma"
+NEIGHBOR_JOINING = "nj"
+# Scores of profiles are 64 bit integers, traceback flags one byte
+PROFILE_BYTES_PER_CELL = 8 + 1
+
+# Merges of clusters from the leaves to the root, cluster k of n sequences is
+# sequence k if k < n, otherwise the cluster created by merge k - n
+Merges = List[Tuple[int, int]]
+
+
+class Profile:
+    """Rows of a multiple alignment with counts of symbols in its columns
+
+    Counts have a row per symbol code of the substitution matrix and a last one
+    for gaps, and a column per column of the alignment. Indices are positions
+    of the rows among the sequences aligned.
+    """
+
+    def __init__(
+        self,
+        indices: List[int],
+        rows: List[str],
+        substitution_matrix: SubstitutionMatrix,
+    ):
+        self.indices = indices
+        self.rows = rows
+        self.substitution_matrix = substitution_matrix
+        self.counts = count_symbols(rows, substitution_matrix)
+
+    @classmethod
+    def from_sequence(
+        cls, index: int, sequence: str, substitution_matrix: SubstitutionMatrix
+    ) -> "Profile":
+        # Encoding fails on symbols not in the substitution matrix, gaps included
+        substitution_matrix.encode(sequence)
+        return cls([index], [sequence], substitution_matrix)
+
+    def __len__(self) -> int:
+        return self.counts.shape[1]
+
+    def merge(self, other: "Profile", alignment: Alignment) -> "Profile":
+        """Merge with profile aligned as sequence_2 into one with rows of both"""
+        operations = alignment.operations
+        rows = [
+            Alignment.from_operations(row, "", operations).sequence_1
+            for row in self.rows
+        ] + [
+            Alignment.from_operations("", row, operations).sequence_2
+            for row in other.rows
+        ]
+        return Profile(self.indices + other.indices, rows, self.substitution_matrix)
+
+
+def count_symbols(
+    rows: List[str], substitution_matrix: SubstitutionMatrix
+) -> np.ndarray:
+    """Count symbol codes and gaps in every column of rows of equal length"""
+    alphabet_size = substitution_matrix.alphabet_size
+    byte_codes = bytearray(substitution_matrix.byte_codes)
+    byte_codes[ord(GAP_SYMBOL)] = alphabet_size
+    length = len(rows[0]) if rows else 0
+    counts = np.zeros((alphabet_size + 1, length), dtype=np.int64)
+    columns = np.arange(length)
+    for row in rows:
+        codes = np.frombuffer(row.encode("ascii").translate(byte_codes), np.uint8)
+        counts[codes, columns] += 1
+    return counts
+
+
+def build_pair_scores(
+    substitution_matrix: SubstitutionMatrix, gap_penalty: int
+) -> np.ndarray:
+    """Scores of symbol codes and the gap against each other
+
+    A pair with a gap, even of two gaps, scores the gap penalty, so aligning
+    a column against a new gap column costs the same as against a gap column.
+    """
+    alphabet_size = substitution_matrix.alphabet_size
+    pair_scores = np.full((alphabet_size + 1, alphabet_size + 1), gap_penalty)
+    pair_scores[:-1, :-1] = np.array(substitution_matrix.lookup_table).reshape(
+        alphabet_size, alphabet_size
+    )
+    return pair_scores.astype(np.int64)
+
+
+def build_column_scores(counts: np.ndarray, pair_scores: np.ndarray) -> np.ndarray:
+    """Build table of sum of pairs scores of every symbol against columns
+
+    Row k holds the scores of a symbol with code k, or a gap for the last
+    row, against every row of each column, so the score of two columns is the
+    counts of the other column times this table.
+    """
+    return pair_scores.T @ counts
+
+
+def get_profile_gap_penalty(
+    scoring_function: ScoringFunction, profile_1: Profile, profile_2: Profile
+) -> int:
+    """Penalty of a move against a new gap column, paid by every pair of rows"""
+    return (
+        get_linear_gap_penalty(scoring_function)
+        * len(profile_1.rows)
+        * len(profile_2.rows)
+    )
+
+
+class ProfileScoringMatrix(ScoringMatrix):
+    """Scoring matrix of two profiles scoring pairs of columns by sum of pairs
+
+    Columns of profile_1 take the place of symbols of sequence_1 and columns
+    of profile_2 of symbols of sequence_2. The score of two columns sums the
+    scores of every pair of their rows, see build_pair_scores. Rows of scores
+    are filled as vectors like by the numpy engine. Alignments found by
+    traceback hold the profiles as their sources, only their operations are
+    meaningful.
+    """
+
+    def __init__(
+        self,
+        profile_1: Profile,
+        profile_2: Profile,
+        scoring_function: ScoringFunction,
+        substitution_matrix: SubstitutionMatrix,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
+        self.gap_penalty = get_profile_gap_penalty(
+            scoring_function, profile_1, profile_2
+        )
+        self.pair_scores = build_pair_scores(
+            substitution_matrix, get_linear_gap_penalty(scoring_function)
+        )
+        super().__init__(
+            profile_1,  # type: ignore
+            profile_2,  # type: ignore
+            scoring_function,
+            substitution_matrix,
+            engine="numpy",
+            instrumentation=instrumentation,
+        )
+
+    def _init_matrices(self):
+        horizontal_length = len(self.sequence_1) + 1
+        vertical_length = len(self.sequence_2) + 1
+        gap_offsets = np.arange(horizontal_length, dtype=np.int64) * self.gap_penalty
+        self.scoring_matrix = np.zeros(
+            (vertical_length, horizontal_length), dtype=np.int64
+        )
+        self.scoring_matrix[0, :] = gap_offsets
+        self.scoring_matrix[:, 0] = (
+            np.arange(vertical_length, dtype=np.int64) * self.gap_penalty
+        )
+        self.traceback_matrix = TracebackMatrix(vertical_length, horizontal_length)
+
+    def _fill(self):
+        horizontal_length = len(self.sequence_1) + 1
+        vertical_length = len(self.sequence_2) + 1
+        column_scores = build_column_scores(
+            self.sequence_1.counts, self.pair_scores  # type: ignore
+        )
+        counts_2 = self.sequence_2.counts  # type: ignore
+        gap_offsets = np.arange(horizontal_length, dtype=np.int64) * self.gap_penalty
+        traceback_flags = np.frombuffer(
+            self.traceback_matrix.flags, dtype=np.uint8
+        ).reshape(vertical_length, horizontal_length)
+
+        progress_logger = ProgressLogger(vertical_length * horizontal_length)
+        for j in range(1, vertical_length):
+            row, diagonal_scores, upper_scores = numpy_engine.fill_row(
+                self.scoring_matrix[j - 1],
+                counts_2[:, j - 1] @ column_scores,
+                self.gap_penalty,
+                gap_offsets,
+                self.scoring_matrix[j],
+            )
+            traceback_flags[j, 1:] = numpy_engine.get_traceback_flags(
+                row, diagonal_scores, upper_scores, self.gap_penalty
+            )
+            progress_logger.update((j + 1) * horizontal_length)
+
+
+def compute_last_row(
+    counts_1: np.ndarray,
+    counts_2: np.ndarray,
+    pair_scores: np.ndarray,
+    gap_penalty: int,
+) -> np.ndarray:
+    """Compute last row of the scoring matrix of profiles given by their counts"""
+    column_scores = build_column_scores(counts_1, pair_scores)
+    gap_offsets = np.arange(counts_1.shape[1] + 1, dtype=np.int64) * gap_penalty
+    previous_row = gap_offsets.copy()
+    row = np.empty_like(previous_row)
+    for j in range(counts_2.shape[1]):
+        row[0] = previous_row[0] + gap_penalty
+        numpy_engine.fill_row(
+            previous_row, counts_2[:, j] @ column_scores, gap_penalty, gap_offsets, row
+        )
+        previous_row, row = row, previous_row
+    return previous_row
+
+
+def _hirschberg_recursive(
+    counts_1: np.ndarray,
+    counts_2: np.ndarray,
+    pair_scores: np.ndarray,
+    gap_penalty: int,
+    operations: List[str],
+) -> int:
+    """Append operations of an optimal alignment of profiles and return its score
+
+    Like linear_space.hirschberg, with columns of counts in place of symbols.
+    """
+    length_1 = counts_1.shape[1]
+    length_2 = counts_2.shape[1]
+    if not length_2:
+        operations.append(DELETION * length_1)
+        return length_1 * gap_penalty
+    if not length_1:
+        operations.append(INSERTION * length_2)
+        return length_2 * gap_penalty
+    if length_2 == 1:
+        substitution_row = counts_2[:, 0] @ build_column_scores(counts_1, pair_scores)
+        best_index = int(np.argmax(substitution_row))
+        match_score = (length_1 - 1) * gap_penalty + int(substitution_row[best_index])
+        # Column against a gap column unless matching it with one scores better
+        if match_score <= (length_1 + 1) * gap_penalty:
+            operations.append(DELETION * length_1 + INSERTION)
+            return (length_1 + 1) * gap_penalty
+        operations.append(
+            DELETION * best_index + MATCH + DELETION * (length_1 - best_index - 1)
+        )
+        return match_score
+
+    # Split profile_2 in half and find where the optimal path crosses the middle row
+    middle = length_2 // 2
+    upper_row = compute_last_row(
+        counts_1, counts_2[:, :middle], pair_scores, gap_penalty
+    )
+    lower_row = compute_last_row(
+        counts_1[:, ::-1], counts_2[:, middle:][:, ::-1], pair_scores, gap_penalty
+    )
+    split_scores = upper_row + lower_row[::-1]
+    split = int(np.argmax(split_scores))
+
+    _hirschberg_recursive(
+        counts_1[:, :split],
+        counts_2[:, :middle],
+        pair_scores,
+        gap_penalty,
+        operations,
+    )
+    _hirschberg_recursive(
+        counts_1[:, split:],
+        counts_2[:, middle:],
+        pair_scores,
+        gap_penalty,
+        operations,
+    )
+    return int(split_scores[split])
+
+
+def align_profiles(
+    profile_1: Profile,
+    profile_2: Profile,
+    scoring_function: ScoringFunction,
+    substitution_matrix: SubstitutionMatrix,
+    max_memory: Optional[int] = None,
+    instrumentation: Optional[Instrumentation] = None,
+) -> Tuple[Alignment, int]:
+    """Find one optimal alignment of profiles and its sum of pairs score
+
+    The scoring matrix is filled whole when it fits in max_memory, or else
+    the available memory, otherwise the alignment is found in linear space.
+    """
+    cells = (len(profile_1) + 1) * (len(profile_2) + 1)
+    budget = max_memory if max_memory is not None else get_available_memory()
+    if budget is None or cells * PROFILE_BYTES_PER_CELL <= budget:
+        scoring_matrix = ProfileScoringMatrix(
+            profile_1,
+            profile_2,
+            scoring_function,
+            substitution_matrix,
+            instrumentation,
+        )
+        scoring_matrix.fill()
+        alignment = scoring_matrix.get_alignments(first_only=True)[0]
+        return alignment, scoring_matrix.get_optimal_score()
+
+    logger.info("Aligning profiles of %d cells in linear space", cells)
+    operations: List[str] = []
+    optimal_score = _hirschberg_recursive(
+        profile_1.counts,
+        profile_2.counts,
+        build_pair_scores(
+            substitution_matrix, get_linear_gap_penalty(scoring_function)
+        ),
+        get_profile_gap_penalty(scoring_function, profile_1, profile_2),
+        operations,
+    )
+    alignment = Alignment.from_operations(
+        profile_1, profile_2, run_length_encode("".join(operations))  # type: ignore
+    )
+    return alignment, optimal_score
+
+
+def get_self_score(sequence: str, substitution_matrix: SubstitutionMatrix) -> int:
+    """Score of aligning sequence with itself without gaps"""
+    codes = substitution_matrix.encode(sequence)
+    return sum(
+        codes.count(code) * substitution_matrix.scores[code][code]
+        for code in range(substitution_matrix.alphabet_size)
+    )
+
+
+def get_distance(optimal_score: int, self_score_1: int, self_score_2: int) -> float:
+    """Distance of two sequences from their optimal score, 0 for identical ones
+
+    The score is relative to the lower of the scores of the sequences with
+    themselves.
+    """
+    reference_score = min(self_score_1, self_score_2)
+    if reference_score <= 0:
+        return 1.0
+    return max(0.0, 1 - optimal_score / reference_score)
+
+
+def compute_distances(
+    needleman_wunsch: NeedlemanWunsch, sequences: Sequence[str], workers: int = 1
+) -> np.ndarray:
+    """Compute matrix of distances of all pairs of sequences from optimal scores
+
+    Only optimal scores are computed, in a process pool if workers > 1 and
+    through the cache of needleman_wunsch if it has one.
+    """
+    pairs = list(itertools.combinations(range(len(sequences)), 2))
+    self_scores = [
+        get_self_score(sequence, needleman_wunsch.substitution_matrix)
+        for sequence in sequences
+    ]
+    distances = np.zeros((len(sequences), len(sequences)))
+    results = needleman_wunsch.align_many(
+        ((sequences[index_1], sequences[index_2]) for index_1, index_2 in pairs),
+        workers=workers,
+        score_only=True,
+    )
+    for pair_index, _, optimal_score in results:
+        index_1, index_2 = pairs[pair_index]
+        distance = get_distance(
+            optimal_score, self_scores[index_1], self_scores[index_2]
+        )
+        distances[index_1, index_2] = distances[index_2, index_1] = distance
+    return distances
+
+
+def build_upgma_tree(distances: np.ndarray) -> Merges:
+    """Merge the closest clusters first, distances of clusters being averages"""
+    count = len(distances)
+    sizes = {index: 1 for index in range(count)}
+    cluster_distances: Dict[Tuple[int, int], float] = {
+        (index_1, index_2): float(distances[index_1, index_2])
+        for index_1, index_2 in itertools.combinations(range(count), 2)
+    }
+    merges: Merges = []
+    while len(sizes) > 1:
+        cluster_1, cluster_2 = min(cluster_distances, key=cluster_distances.get)  # type: ignore
+        cluster = count + len(merges)
+        merges.append((cluster_1, cluster_2))
+        size_1 = sizes.pop(cluster_1)
+        size_2 = sizes.pop(cluster_2)
+        for other in sizes:
+            distance_1 = cluster_distances.pop(
+                (min(cluster_1, other), max(cluster_1, other))
+            )
+            distance_2 = cluster_distances.pop(
+                (min(cluster_2, other), max(cluster_2, other))
+            )
+            cluster_distances[(other, cluster)] = (
+                distance_1 * size_1 + distance_2 * size_2
+            ) / (size_1 + size_2)
+        del cluster_distances[(cluster_1, cluster_2)]
+        sizes[cluster] = size_1 + size_2
+    return merges
+
+
+def build_neighbor_joining_tree(distances: np.ndarray) -> Merges:
+    """Join the pair of clusters minimizing the total branch length first
+
+    The tree of neighbor joining is unrooted, it is rooted at the last join.
+    """
+    count = len(distances)
+    cluster_distances = {
+        (index_1, index_2): float(distances[index_1, index_2])
+        for index_1 in range(count)
+        for index_2 in range(count)
+    }
+    clusters = list(range(count))
+    merges: Merges = []
+    while len(clusters) > 1:
+        if len(clusters) == 2:
+            cluster_1, cluster_2 = clusters
+        else:
+            total_distances = {
+                cluster: sum(cluster_distances[(cluster, other)] for other in clusters)
+                for cluster in clusters
+            }
+            cluster_1, cluster_2 = min(
+                itertools.combinations(clusters, 2),
+                key=lambda pair: (len(clusters) - 2) * cluster_distances[pair]
+                - total_distances[pair[0]]
+                - total_distances[pair[1]],
+            )
+        cluster = count + len(merges)
+        merges.append((cluster_1, cluster_2))
+        clusters.remove(cluster_1)
+        clusters.remove(cluster_2)
+        for other in clusters:
+            distance = (
+                cluster_distances[(cluster_1, other)]
+                + cluster_distances[(cluster_2, other)]
+                - cluster_distances[(cluster_1, cluster_2)]
+            ) / 2
+            cluster_distances[(cluster, other)] = distance
+            cluster_distances[(other, cluster)] = distance
+        cluster_distances[(cluster, cluster)] = 0.0
+        clusters.append(cluster)
+    return merges
+
+
+GUIDE_TREE_BUILDERS = {
+    UPGMA: build_upgma_tree,
+    NEIGHBOR_JOINING: build_neighbor_joining_tree,
+}
+
+
+def format_newick(merges: Merges, names: Sequence[str]) -> str:
+    """Format guide tree in the Newick format"""
+    subtrees = list(names)
+    for cluster_1, cluster_2 in merges:
+        subtrees.append(f"({subtrees[cluster_1]},{subtrees[cluster_2]})")
+    return subtrees[-1] + ";"
+
+
+def align_multiple(
+    needleman_wunsch: NeedlemanWunsch,
+    sequences: Sequence[str],
+    guide_tree: str = UPGMA,
+    workers: int = 1,
+    max_memory: Optional[int] = None,
+) -> Tuple[List[str], Merges]:
+    """Align sequences progressively along a guide tree
+
+    The guide tree is built from distances of all pairs of sequences, see
+    compute_distances, by UPGMA or neighbor joining. Every merge of the tree
+    aligns the profiles of the merged clusters, see align_profiles, and gaps
+    once inserted are kept. Returns gapped rows in the order of sequences and
+    the merges of the guide tree.
+    """
+    if guide_tree not in GUIDE_TREE_BUILDERS:
+        raise ValueError("Invalid guide tree")
+    if not sequences:
+        raise ValueError("No sequences to align")
+    scoring_function = needleman_wunsch.scoring_function
+    substitution_matrix = needleman_wunsch.substitution_matrix
+    if isinstance(scoring_function, AffineGapPenalty):
+        raise ValueError("Multiple alignment supports only linear gap penalty")
+    profiles = [
+        Profile.from_sequence(index, sequence, substitution_matrix)
+        for index, sequence in enumerate(sequences)
+    ]
+
+    logger.info("Computing distances of %d sequences", len(sequences))
+    distances = compute_distances(needleman_wunsch, sequences, workers)
+    merges = GUIDE_TREE_BUILDERS[guide_tree](distances)
+
+    clusters: Dict[int, Profile] = dict(enumerate(profiles))
+    for cluster, (cluster_1, cluster_2) in enumerate(merges, start=len(sequences)):
+        profile_1 = clusters.pop(cluster_1)
+        profile_2 = clusters.pop(cluster_2)
+        logger.info(
+            "Aligning profiles of %d and %d sequences",
+            len(profile_1.rows),
+            len(profile_2.rows),
+        )
+        alignment, optimal_score = align_profiles(
+            profile_1,
+            profile_2,
+            scoring_function,
+            substitution_matrix,
+            max_memory,
+            needleman_wunsch.instrumentation,
+        )
+        logger.info("Aligned profiles with sum of pairs score %d", optimal_score)
+        clusters[cluster] = profile_1.merge(profile_2, alignment)
+
+    (profile,) = clusters.values()
+    rows = [""] * len(sequences)
+    for index, row in zip(profile.indices, profile.rows):
+        rows[index] = row
+    return rows, merges
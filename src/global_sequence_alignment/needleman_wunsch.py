@@ -1,6 +1,23 @@
 import enum
+import itertools
 import logging
-from typing import List, Tuple, Union
+import re
+import sys
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple, Union
+
+from global_sequence_alignment.instrumentation import (
+    NO_INSTRUMENTATION,
+    Instrumentation,
+    ProgressLogger,
+)
+
+if TYPE_CHECKING:
+    from global_sequence_alignment.cache import AlignmentCache
+    from global_sequence_alignment.checkpoint import FillCheckpoint
+    from global_sequence_alignment.planner import Plan
+    from global_sequence_alignment.query_profile import PreparedQuery
+
+logger = logging.getLogger(__name__)
 
 GAP_PENALTY = -1
 GAP_EXTENSION_PENALTY = -1
@@ -52,30 +69,86 @@ class AffineGapPenalty(ScoringFunction):
         return self.gap_penalty + (gap_length - 1) * self.gap_extension_penalty
 
 
+def get_linear_gap_penalty(scoring_function: ScoringFunction) -> int:
+    """Get the penalty of every gap symbol for scoring functions without gap opening cost"""
+    if isinstance(scoring_function, AffineGapPenalty):
+        raise ValueError("Affine gap penalty is supported only by the full matrix")
+    return scoring_function.score(1)
+
+
 class InvalidSymbolError(Exception):
     """Exception raised when an invalid symbol is found"""
 
     pass
 
 
+INVALID_SYMBOL_CODE = 255
+
+
 class SubstitutionMatrix:
     def __init__(self, scores, symbol_to_index: List[str]):
         self.scores = scores
         self.symbol_to_index = symbol_to_index
+        self._compile()
+
+    def _compile(self):
+        """Compile scores into lookup tables indexed by symbol codes"""
+        self.alphabet_size = len(self.symbol_to_index)
+        if self.alphabet_size >= INVALID_SYMBOL_CODE:
+            raise ValueError("Too many symbols in the substitution matrix")
+        self.symbol_codes = {
+            symbol: code for code, symbol in enumerate(self.symbol_to_index)
+        }
+
+        # Translation table from byte values of symbols to their codes
+        byte_codes = bytearray([INVALID_SYMBOL_CODE] * 256)
+        for symbol, code in self.symbol_codes.items():
+            byte_codes[ord(symbol)] = code
+        self.byte_codes = bytes(byte_codes)
+
+        # Flat table where score of codes (c1, c2) is at c1 * alphabet_size + c2
+        self.lookup_table = [score for row in self.scores for score in row]
+
+    def encode(self, sequence: Union[str, bytes]) -> bytes:
+        """Encode sequence of symbols or their bytes as one symbol code per symbol"""
+        if isinstance(sequence, str):
+            try:
+                sequence = sequence.encode("ascii")
+            except UnicodeEncodeError as error:
+                raise InvalidSymbolError(
+                    f"Symbol {sequence[error.start]} is not in the substitution matrix"
+                ) from None
+        codes = sequence.translate(self.byte_codes)
+        invalid_position = codes.find(INVALID_SYMBOL_CODE)
+        if invalid_position != -1:
+            invalid_symbol = chr(sequence[invalid_position])
+            raise InvalidSymbolError(
+                f"Symbol {invalid_symbol} is not in the substitution matrix"
+            )
+        return codes
+
+    def get_profile(self, sequence: str) -> List[List[int]]:
+        """Get substitution scores along sequence for every symbol code
+
+        Row k holds get_score(sequence[i], symbol with code k) for every position i.
+        """
+        codes = self.encode(sequence)
+        return [
+            [self.scores[code][k] for code in codes] for k in range(self.alphabet_size)
+        ]
 
     def get_score(self, symbol_1: str, symbol_2: str) -> bool:
-        if symbol_1 not in self.symbol_to_index:
+        symbol_1_code = self.symbol_codes.get(symbol_1)
+        if symbol_1_code is None:
             raise InvalidSymbolError(
                 f"Symbol {symbol_1} is not in the substitution matrix"
             )
-        if symbol_2 not in self.symbol_to_index:
+        symbol_2_code = self.symbol_codes.get(symbol_2)
+        if symbol_2_code is None:
             raise InvalidSymbolError(
                 f"Symbol {symbol_2} is not in the substitution matrix"
             )
-        symbol_1_index = self.symbol_to_index.index(symbol_1)
-        symbol_2_index = self.symbol_to_index.index(symbol_2)
-        score = self.scores[symbol_1_index][symbol_2_index]
-        return score
+        return self.lookup_table[symbol_1_code * self.alphabet_size + symbol_2_code]
 
 
 NUCLEOTIDE_SCORES = [[1, -1, -1, -1], [-1, 1, -1, -1], [-1, -1, 1, -1], [-1, -1, -1, 1]]
@@ -153,20 +226,183 @@ class ProteinSubstitutionMatrix(SubstitutionMatrix):
         pass
 
 
+# Alignment operations relative to sequence_1, as in CIGAR strings
+MATCH = "M"
+INSERTION = "I"
+DELETION = "D"
+
+CIGAR_PATTERN = re.compile(r"(\d+)([MID])")
+
+Operations = Tuple[Tuple[int, str], ...]
+
+
+def run_length_encode(operations: Iterable[str]) -> Operations:
+    """Encode operations as (run length, operation) pairs"""
+    return tuple(
+        (sum(1 for _ in run), operation)
+        for operation, run in itertools.groupby(operations)
+    )
+
+
 class Alignment:
+    """Alignment of two sequences stored as run length encoded operations
+
+    Operations start at start_1 of source_1 and start_2 of source_2. M pairs
+    a symbol of each, I a symbol of source_2 with a gap and D a symbol of
+    source_1 with a gap. The sources are shared with the aligned sequences,
+    so gapped rows are built only when sequence_1 or sequence_2 is read.
+    """
+
+    __slots__ = ("source_1", "source_2", "start_1", "start_2", "operations")
+
     def __init__(self, sequence_1: str, sequence_2: str):
-        self.sequence_1 = sequence_1
-        self.sequence_2 = sequence_2
+        """Create alignment of gapped rows of equal length"""
+        operations = []
+        for symbol_1, symbol_2 in zip(sequence_1, sequence_2):
+            if symbol_1 == "-":
+                operations.append(INSERTION)
+            elif symbol_2 == "-":
+                operations.append(DELETION)
+            else:
+                operations.append(MATCH)
+        self.source_1 = sequence_1.replace("-", "")
+        self.source_2 = sequence_2.replace("-", "")
+        self.start_1 = 0
+        self.start_2 = 0
+        self.operations = run_length_encode(operations)
+
+    @classmethod
+    def from_operations(
+        cls,
+        source_1: str,
+        source_2: str,
+        operations: Operations,
+        start_1: int = 0,
+        start_2: int = 0,
+    ) -> "Alignment":
+        alignment = cls.__new__(cls)
+        alignment.source_1 = source_1
+        alignment.source_2 = source_2
+        alignment.start_1 = start_1
+        alignment.start_2 = start_2
+        alignment.operations = operations
+        return alignment
+
+    @classmethod
+    def from_cigar(
+        cls,
+        source_1: str,
+        source_2: str,
+        cigar: str,
+        start_1: int = 0,
+        start_2: int = 0,
+    ) -> "Alignment":
+        operations = tuple(
+            (int(run_length), operation)
+            for run_length, operation in CIGAR_PATTERN.findall(cigar)
+        )
+        return cls.from_operations(source_1, source_2, operations, start_1, start_2)
+
+    @property
+    def cigar(self) -> str:
+        return "".join(
+            f"{run_length}{operation}" for run_length, operation in self.operations
+        )
+
+    @property
+    def end_1(self) -> int:
+        return self.start_1 + sum(
+            run_length
+            for run_length, operation in self.operations
+            if operation != INSERTION
+        )
+
+    @property
+    def end_2(self) -> int:
+        return self.start_2 + sum(
+            run_length
+            for run_length, operation in self.operations
+            if operation != DELETION
+        )
+
+    @property
+    def length(self) -> int:
+        """Number of columns of the alignment"""
+        return sum(run_length for run_length, _ in self.operations)
+
+    @property
+    def gap_count(self) -> int:
+        """Number of columns with a gap"""
+        return sum(
+            run_length
+            for run_length, operation in self.operations
+            if operation != MATCH
+        )
+
+    @property
+    def identity(self) -> float:
+        """Share of columns with identical symbols"""
+        length = self.length
+        if not length:
+            return 0.0
+        identical = 0
+        i, j = self.start_1, self.start_2
+        for run_length, operation in self.operations:
+            next_i = i if operation == INSERTION else i + run_length
+            next_j = j if operation == DELETION else j + run_length
+            if operation == MATCH:
+                identical += sum(
+                    symbol_1 == symbol_2
+                    for symbol_1, symbol_2 in zip(
+                        self.source_1[i:next_i], self.source_2[j:next_j]
+                    )
+                )
+            i, j = next_i, next_j
+        return identical / length
+
+    def _render(self, source: str, start: int, gap_operation: str) -> str:
+        parts = []
+        position = start
+        for run_length, operation in self.operations:
+            if operation == gap_operation:
+                parts.append("-" * run_length)
+            else:
+                next_position = position + run_length
+                parts.append(source[position:next_position])
+                position = next_position
+        return "".join(parts)
+
+    @property
+    def sequence_1(self) -> str:
+        """Gapped row of source_1"""
+        return self._render(self.source_1, self.start_1, INSERTION)
+
+    @property
+    def sequence_2(self) -> str:
+        """Gapped row of source_2"""
+        return self._render(self.source_2, self.start_2, DELETION)
 
-    # TODO: Implement __str__ method
     def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Alignment):
+            return NotImplemented
+        return (
+            self.operations == other.operations
+            and self._get_aligned_sources() == other._get_aligned_sources()
+        )
+
+    def _get_aligned_sources(self) -> Tuple[str, str]:
+        """Get parts of the sources covered by the alignment"""
         return (
-            self.sequence_1 == other.sequence_1 and self.sequence_2 == other.sequence_2  # type: ignore
+            self.source_1[self.start_1 : self.end_1],
+            self.source_2[self.start_2 : self.end_2],
         )
 
     def __repr__(self) -> str:
         return f"{self.sequence_1}\n{self.sequence_2}"
 
+    def __str__(self) -> str:
+        return repr(self)
+
 
 class TracebackDirection(enum.Enum):
     DIAGONAL = 0
@@ -174,6 +410,76 @@ class TracebackDirection(enum.Enum):
     SIDE = 2
 
 
+DIAGONAL_FLAG = 1 << TracebackDirection.DIAGONAL.value
+UPPER_FLAG = 1 << TracebackDirection.UPPER.value
+SIDE_FLAG = 1 << TracebackDirection.SIDE.value
+
+# Directions for every combination of flags, shared between cells
+DIRECTIONS_BY_FLAGS: List[Optional[List[TracebackDirection]]] = [
+    [
+        traceback_direction
+        for traceback_direction in TracebackDirection
+        if flags & (1 << traceback_direction.value)
+    ]
+    or None
+    for flags in range(8)
+]
+
+
+class TracebackMatrix:
+    """2D matrix of traceback directions packed as 3 bit flags in one byte per cell
+
+    Flags are a new bytearray unless a buffer of them is given, like a view of
+    a mapped file.
+    """
+
+    bytes_per_cell = 1
+
+    def __init__(
+        self,
+        vertical_length: int,
+        horizontal_length: int,
+        flags: Optional[Union[bytearray, memoryview]] = None,
+    ):
+        self.vertical_length = vertical_length
+        self.horizontal_length = horizontal_length
+        if flags is None:
+            flags = bytearray(vertical_length * horizontal_length)
+        self.flags = flags
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.flags)
+
+    def get_flags(self, row: int, column: int) -> int:
+        return self.flags[row * self.horizontal_length + column]
+
+    def set_flags(self, row: int, column: int, flags: int):
+        self.flags[row * self.horizontal_length + column] = flags
+
+    def get_directions(
+        self, row: int, column: int
+    ) -> Optional[List[TracebackDirection]]:
+        """Get traceback directions of a cell or None if it has none"""
+        return DIRECTIONS_BY_FLAGS[self.get_flags(row, column)]
+
+    def set_directions(
+        self, row: int, column: int, traceback_directions: List[TracebackDirection]
+    ):
+        flags = 0
+        for traceback_direction in traceback_directions:
+            flags |= 1 << traceback_direction.value
+        self.set_flags(row, column, flags)
+
+    def get_row(self, row: int) -> List[Optional[List[TracebackDirection]]]:
+        start = row * self.horizontal_length
+        end = start + self.horizontal_length
+        return [DIRECTIONS_BY_FLAGS[flags] for flags in self.flags[start:end]]
+
+    def tolist(self) -> List[List[Optional[List[TracebackDirection]]]]:
+        return [self.get_row(row) for row in range(self.vertical_length)]
+
+
 class ScoringMatrix:
     def __init__(
         self,
@@ -183,6 +489,65 @@ class ScoringMatrix:
         substitution_matrix: SubstitutionMatrix,
         match_score: int = 1,
         mismatch_score: int = -1,
+        engine: str = "python",
+        instrumentation: Optional[Instrumentation] = None,
+        threads: int = 1,
+        checkpoint: Optional["FillCheckpoint"] = None,
+        profile=None,
+    ):
+        self._init_settings(
+            sequence_1,
+            sequence_2,
+            scoring_function,
+            substitution_matrix,
+            match_score,
+            mismatch_score,
+            engine,
+            instrumentation,
+            threads,
+            checkpoint,
+            profile,
+        )
+        with self.instrumentation.phase("init"):
+            self._init_matrices()
+
+    @classmethod
+    def from_filled_matrices(
+        cls,
+        sequence_1: str,
+        sequence_2: str,
+        scoring_function: ScoringFunction,
+        substitution_matrix: SubstitutionMatrix,
+        scoring_matrix,
+        traceback_matrices: List[TracebackMatrix],
+        engine: str = "numpy",
+    ) -> "ScoringMatrix":
+        """Create matrix holding scores and traceback matrices filled before
+
+        Traceback matrices are the one of the best scores followed by those of
+        the layers, if any. The matrix can be traced back and rendered, but
+        not filled again.
+        """
+        filled_matrix = cls.__new__(cls)
+        filled_matrix._init_settings(
+            sequence_1, sequence_2, scoring_function, substitution_matrix, engine=engine
+        )
+        filled_matrix._set_matrices(scoring_matrix, traceback_matrices)
+        return filled_matrix
+
+    def _init_settings(
+        self,
+        sequence_1: str,
+        sequence_2: str,
+        scoring_function: ScoringFunction,
+        substitution_matrix: SubstitutionMatrix,
+        match_score: int = 1,
+        mismatch_score: int = -1,
+        engine: str = "python",
+        instrumentation: Optional[Instrumentation] = None,
+        threads: int = 1,
+        checkpoint: Optional["FillCheckpoint"] = None,
+        profile=None,
     ):
         self.sequence_1 = sequence_1
         self.sequence_2 = sequence_2
@@ -190,50 +555,115 @@ class ScoringMatrix:
         self.substitution_matrix = substitution_matrix
         self.match_score = match_score
         self.mismatch_score = mismatch_score
-
-        self._init_matrices()
+        self.engine = engine
+        self.instrumentation = instrumentation or NO_INSTRUMENTATION
+        self.threads = threads
+        self.checkpoint = checkpoint
+        # Profile of sequence_1 in the form of the engine, built by fill if not given
+        self.profile = profile
+        # Buffers holding the matrices in memory shared with processes filling them
+        self.shared_buffers = None
+
+    def _set_matrices(self, scoring_matrix, traceback_matrices: List[TracebackMatrix]):
+        self.scoring_matrix = scoring_matrix
+        (self.traceback_matrix,) = traceback_matrices
 
     def _init_matrices(self) -> Tuple[List[List[None]], List[List[TracebackDirection]]]:  # type: ignore
         """Initialize 2D matrix for holding scores and traceback directions"""
-        logging.info("Prepaing to initialize matrices")
+        logger.info("Prepaing to initialize matrices")
         horizontal_length = len(self.sequence_1) + 1
         vertical_length = len(self.sequence_2) + 1
 
-        # Initialize matrices with None values
-        scoring_matrix = [[None] * horizontal_length for _ in range(vertical_length)]
-        traceback_matrix = [[None] * horizontal_length for _ in range(vertical_length)]
-
         gap_penalty = self.scoring_function.gap_penalty
-        # Initialize first row with gap penalties times index
-        for i in range(horizontal_length):
-            scoring_matrix[0][i] = i * gap_penalty  # type: ignore
-        # Initialize first column with gap penalties times index
-        for j in range(vertical_length):
-            scoring_matrix[j][0] = j * gap_penalty  # type: ignore
+        if self.engine == "numpy" and self.threads > 1:
+            from global_sequence_alignment import parallel
+
+            matrices = parallel.init_shared_matrices(
+                horizontal_length, vertical_length, gap_penalty
+            )
+            scoring_matrix, traceback_matrix, self.shared_buffers = matrices
+            scoring_bytes_per_cell = scoring_matrix.itemsize
+        elif self.engine == "numpy":
+            from global_sequence_alignment import numpy_engine
+
+            # Initialize traceback matrix with no directions
+            traceback_matrix = TracebackMatrix(vertical_length, horizontal_length)
+            scoring_matrix = numpy_engine.init_scoring_matrix(
+                horizontal_length, vertical_length, gap_penalty
+            )
+            scoring_bytes_per_cell = scoring_matrix.itemsize
+        else:
+            # Initialize traceback matrix with no directions
+            traceback_matrix = TracebackMatrix(vertical_length, horizontal_length)
+            scoring_matrix = [
+                [None] * horizontal_length for _ in range(vertical_length)
+            ]
+            # Initialize first row with gap penalties times index
+            for i in range(horizontal_length):
+                scoring_matrix[0][i] = i * gap_penalty  # type: ignore
+            # Initialize first column with gap penalties times index
+            for j in range(vertical_length):
+                scoring_matrix[j][0] = j * gap_penalty  # type: ignore
+            # A list slot pointing to an int object per filled cell
+            scoring_bytes_per_cell = 8 + sys.getsizeof(2**20)
 
         self.scoring_matrix = scoring_matrix
         self.traceback_matrix = traceback_matrix
-        logging.info(
-            "Initialized scoring and traceback matrices both of size %dx%d totalling to %d cells",
+        logger.info(
+            "Initialized scoring and traceback matrices both of size %dx%d totalling to %d cells using ~%d bytes per cell",
             vertical_length,
             horizontal_length,
             vertical_length * horizontal_length,
+            scoring_bytes_per_cell + traceback_matrix.bytes_per_cell,
         )
 
     def fill(self):
         """Fill 2D matrix with scores"""
+        with self.instrumentation.phase("fill"):
+            self._fill()
+            if self.checkpoint is not None:
+                self.checkpoint.finish()
+        self.instrumentation.add_cells(len(self.sequence_1) * len(self.sequence_2))
+
+    def _start_checkpoint(
+        self, frontier_rows: int = 0
+    ) -> Tuple[int, Optional[List[List[float]]]]:
+        """Restore rows completed before, return first row to fill and the saved frontier rows"""
+        if self.checkpoint is None:
+            return 1, None
+        rows_completed, frontier = self.checkpoint.start(self, frontier_rows)
+        return rows_completed + 1, frontier
+
+    def _get_profile(self) -> List[List[int]]:
+        if self.profile is not None:
+            return self.profile
+        return self.substitution_matrix.get_profile(self.sequence_1)
+
+    def _fill(self):
+        if self.engine == "numpy":
+            if self.threads > 1:
+                self._fill_parallel()
+            else:
+                self._fill_numpy()
+            return
+
         horizontal_length = len(self.sequence_1) + 1
         vertical_length = len(self.sequence_2) + 1
-
-        cells_computed = 0
-        total_cells = vertical_length * horizontal_length
-        last_percentage = 0
-        for j in range(1, vertical_length):
+        first_row, _ = self._start_checkpoint()
+        checkpoint = self.checkpoint
+
+        traceback_flags = self.traceback_matrix.flags
+        # Every gap symbol costs the same, so a gap of length 1 gives the per-move penalty
+        gap_penalty = self.scoring_function.score(1)
+        # Sequences are encoded once and scored by indexing a profile row
+        codes_2 = self.substitution_matrix.encode(self.sequence_2)
+        profile = self._get_profile()
+        cells_computed = first_row * horizontal_length
+        progress_logger = ProgressLogger(vertical_length * horizontal_length)
+        for j in range(first_row, vertical_length):
+            substitution_row = profile[codes_2[j - 1]]
             for i in range(1, horizontal_length):
-                # Check symbol equality
-                symbol_1 = self.sequence_1[i - 1]
-                symbol_2 = self.sequence_2[j - 1]
-                symbol_score = self.substitution_matrix.get_score(symbol_1, symbol_2)
+                symbol_score = substitution_row[i - 1]
 
                 diagonal_value = self.scoring_matrix[j - 1][i - 1]
                 upper_value = self.scoring_matrix[j - 1][i]
@@ -241,8 +671,8 @@ class ScoringMatrix:
 
                 # Compute score
                 diagonal_score = diagonal_value + symbol_score
-                upper_score = upper_value + self.scoring_function.score(upper_value)
-                side_score = side_value + self.scoring_function.score(side_value)
+                upper_score = upper_value + gap_penalty
+                side_score = side_value + gap_penalty
 
                 # Set score
                 scores = [diagonal_score, upper_score, side_score]
@@ -250,103 +680,193 @@ class ScoringMatrix:
                 self.scoring_matrix[j][i] = max_score
 
                 # Set traceback directions
-                traceback_directions = []
+                flags = 0
                 if scores[0] == max_score:
-                    traceback_directions.append(TracebackDirection.DIAGONAL)
+                    flags |= DIAGONAL_FLAG
                 if scores[1] == max_score:
-                    traceback_directions.append(TracebackDirection.UPPER)
+                    flags |= UPPER_FLAG
                 if scores[2] == max_score:
-                    traceback_directions.append(TracebackDirection.SIDE)
-                self.traceback_matrix[j][i] = traceback_directions
+                    flags |= SIDE_FLAG
+                traceback_flags[j * horizontal_length + i] = flags
             cells_computed += horizontal_length
+            progress_logger.update(cells_computed)
+            if checkpoint is not None:
+                checkpoint.update(j)
+
+    def _fill_numpy(self):
+        """Fill 2D matrix with scores using vectorized row updates"""
+        from global_sequence_alignment import numpy_engine
+
+        first_row, _ = self._start_checkpoint()
+        numpy_engine.fill(
+            self.sequence_1,
+            self.sequence_2,
+            self.scoring_function,
+            self.substitution_matrix,
+            self.scoring_matrix,
+            self.traceback_matrix,
+            first_row,
+            self.checkpoint,
+            self.profile,
+        )
 
-            new_percentage = int(cells_computed / total_cells * 100)
-            if new_percentage > last_percentage:
-                logging.info("Computed %d%% of cells", new_percentage)
-                last_percentage = new_percentage
+    def _fill_parallel(self):
+        """Fill 2D matrix with scores by tiles in worker processes"""
+        from global_sequence_alignment import parallel
+
+        if self.checkpoint is not None:
+            raise ValueError("Checkpointing is not supported by parallel fill")
+        parallel.fill(
+            self.sequence_1,
+            self.sequence_2,
+            self.scoring_function,
+            self.substitution_matrix,
+            self.shared_buffers,
+            self.threads,
+        )
 
     def get_optimal_score(self) -> int:
         """Get optimal score from the bottom right corner of the matrix"""
         optimal_score = self.scoring_matrix[-1][-1]
         if optimal_score is None:
             raise ValueError("Matrix is not filled")
-        return optimal_score
-
-    def get_alignments(self) -> List[Alignment]:
-        """Traceback 2D matrix to find optimal alignments"""
-        logging.info("Starting extracting alignments")
+        return int(optimal_score)
+
+    def iter_alignments(
+        self, max_alignments: Optional[int] = None, first_only: bool = False
+    ) -> Iterator[Alignment]:
+        """Traceback 2D matrix yielding optimal alignments one by one
+
+        Only the time spent finding an alignment counts for the traceback phase,
+        not the time the caller spends with it.
+        """
+        alignments = self._traceback(max_alignments, first_only)
+        while True:
+            with self.instrumentation.phase("traceback"):
+                alignment = next(alignments, None)
+            if alignment is None:
+                return
+            yield alignment
+
+    def _traceback(
+        self, max_alignments: Optional[int], first_only: bool
+    ) -> Iterator[Alignment]:
+        """Traceback 2D matrix yielding optimal alignments one by one
+
+        Tied traceback branches are explored depth first with an explicit stack,
+        so alignments are produced lazily and long paths do not hit the recursion
+        limit. Cells of the first row and column lead straight to the top left
+        corner.
+        """
+        logger.info("Starting extracting alignments")
+        if first_only:
+            max_alignments = 1
+        if max_alignments is not None and max_alignments <= 0:
+            return
+
+        if not self.sequence_1 and not self.sequence_2:
+            yield Alignment.from_operations(self.sequence_1, self.sequence_2, ())
+            return
+
+        # Operations are collected from the end, so they are kept reversed
+        path: List[str] = []
+        # Each entry is a cell, the length of the path leading to it and a direction to take
+        stack = [
+            (len(self.sequence_1), len(self.sequence_2), 0, traceback_direction)
+            for traceback_direction in reversed(
+                self._get_directions(len(self.sequence_1), len(self.sequence_2))
+            )
+        ]
 
-        horizontal_length = len(self.sequence_1)
-        vertical_length = len(self.sequence_2)
+        alignments_found = 0
+        while stack:
+            i, j, path_length, traceback_direction = stack.pop()
+            del path[path_length:]
+
+            if traceback_direction == TracebackDirection.DIAGONAL:
+                path.append(MATCH)
+                next_i, next_j = i - 1, j - 1
+            elif traceback_direction == TracebackDirection.UPPER:
+                path.append(INSERTION)
+                next_i, next_j = i, j - 1
+            elif traceback_direction == TracebackDirection.SIDE:
+                path.append(DELETION)
+                next_i, next_j = i - 1, j
+            else:
+                raise ValueError("Invalid traceback direction")
 
-        def get_alignments_recursive(
-            sequence_1_alignment, sequence_2_alignment, i, j
-        ) -> List[Alignment]:
             # When we reach the top left corner of the matrix, we have found an alignment
-            if i == 0 and j == 0:
-                return [Alignment(sequence_1_alignment, sequence_2_alignment)]
-
-            # Otherwise, we need to check if we path ended not in the top left corner
-            traceback_directions = self.traceback_matrix[j][i]
-            if not traceback_directions:
-                return []
-            if j == 0 and TracebackDirection.UPPER not in traceback_directions:
-                return []
-            if i == 0 and TracebackDirection.SIDE not in traceback_directions:
-                return []
-
-            # If we have multiple directions, we need to create multiple alignments
-            alignments = []
-            for traceback_direction in traceback_directions:
-                found_alignments = []
-                if traceback_direction == TracebackDirection.DIAGONAL:
-                    found_alignments = get_alignments_recursive(
-                        self.sequence_1[i - 1] + sequence_1_alignment,
-                        self.sequence_2[j - 1] + sequence_2_alignment,
-                        i - 1,
-                        j - 1,
-                    )
-                elif traceback_direction == TracebackDirection.UPPER:
-                    found_alignments = get_alignments_recursive(
-                        "-" + sequence_1_alignment,
-                        self.sequence_2[j - 1] + sequence_2_alignment,
-                        i,
-                        j - 1,
-                    )
-                elif traceback_direction == TracebackDirection.SIDE:
-                    found_alignments = get_alignments_recursive(
-                        self.sequence_1[i - 1] + sequence_1_alignment,
-                        "-" + sequence_2_alignment,
-                        i - 1,
-                        j,
-                    )
-                else:
-                    raise ValueError("Invalid traceback direction")
-                alignments.extend(found_alignments)
-            return alignments
-
-        alignments = get_alignments_recursive(
-            sequence_1_alignment="",
-            sequence_2_alignment="",
-            i=horizontal_length,
-            j=vertical_length,
-        )
-
-        return alignments
-
-    def __str__(self) -> str:
-        """String representation of the matrix"""
-        horizontal_length = (len(self.sequence_1) + 1) * 2
-        vertical_length = (len(self.sequence_2) + 1) * 2
-        output = [
-            ["  " for _ in range(horizontal_length)] for __ in range(vertical_length)
-        ]
-        for row_idx, row in enumerate(self.scoring_matrix):
-            for column_idx, cell in enumerate(row):
-                value = str(cell).rjust(2)
+            if next_i == 0 and next_j == 0:
+                yield Alignment.from_operations(
+                    self.sequence_1, self.sequence_2, run_length_encode(reversed(path))
+                )
+                alignments_found += 1
+                if alignments_found == max_alignments:
+                    return
+                continue
+
+            path_length += 1
+            next_directions = self._get_next_directions(
+                i, j, traceback_direction, next_i, next_j
+            )
+            for next_direction in reversed(next_directions):
+                stack.append((next_i, next_j, path_length, next_direction))
+
+    def _get_directions(self, i: int, j: int) -> List[TracebackDirection]:
+        """Get traceback directions of a cell including the implicit ones on the borders"""
+        if i == 0 and j == 0:
+            return []
+        if j == 0:
+            return [TracebackDirection.SIDE]
+        if i == 0:
+            return [TracebackDirection.UPPER]
+        return self.traceback_matrix.get_directions(j, i) or []
+
+    def _get_next_directions(
+        self,
+        i: int,
+        j: int,
+        traceback_direction: TracebackDirection,
+        next_i: int,
+        next_j: int,
+    ) -> List[TracebackDirection]:
+        """Get directions to continue with after leaving cell (i, j) in a direction"""
+        return self._get_directions(next_i, next_j)
+
+    def get_alignments(
+        self, max_alignments: Optional[int] = None, first_only: bool = False
+    ) -> List[Alignment]:
+        """Traceback 2D matrix to find optimal alignments"""
+        return list(self.iter_alignments(max_alignments, first_only))
+
+    def save(self, file_path: str):
+        """Save filled matrix to a binary file, see matrix_file"""
+        from global_sequence_alignment.matrix_file import save_scoring_matrix
+
+        save_scoring_matrix(self, file_path)
+
+    @staticmethod
+    def load(file_path: str) -> "ScoringMatrix":
+        """Load matrix saved with save by mapping the file into memory"""
+        from global_sequence_alignment.matrix_file import load_scoring_matrix
+
+        return load_scoring_matrix(file_path)
+
+    def render(self, rows: slice = slice(None), columns: slice = slice(None)) -> str:
+        """Render scores and traceback directions of a window of the matrix
+
+        Only cells within the window are stringified, so a small window of a
+        huge matrix is cheap.
+        """
+        row_range = range(*rows.indices(len(self.sequence_2) + 1))
+        column_range = range(*columns.indices(len(self.sequence_1) + 1))
+        output = [["  "] * (len(column_range) * 2) for _ in range(len(row_range) * 2)]
+        for row_idx, j in enumerate(row_range):
+            scoring_row = self.scoring_matrix[j]
+            for column_idx, i in enumerate(column_range):
+                value = str(scoring_row[i]).rjust(2)
                 output[row_idx * 2 + 1][column_idx * 2 + 1] = value
-        for row_idx, row in enumerate(self.traceback_matrix):
-            for column_idx, traceback_directions in enumerate(row):
+                traceback_directions = self.traceback_matrix.get_directions(j, i)
                 if traceback_directions is None:
                     continue
                 for traceback_direction in traceback_directions:
@@ -360,6 +880,162 @@ class ScoringMatrix:
         output_stringified = "\n".join(["".join(row) for row in output])
         return output_stringified
 
+    def __str__(self) -> str:
+        """String representation of the matrix"""
+        return self.render()
+
+
+class AffineScoringMatrix(ScoringMatrix):
+    """Scoring matrix for affine gap penalties using Gotoh's three layers
+
+    Layer M holds scores of alignments ending with a pair of symbols, layer U
+    ending with a gap in sequence_1 (an upper move) and layer S ending with a
+    gap in sequence_2 (a side move). Each layer has its own traceback matrix
+    whose flags tell from which layers of the neighbouring cell its score
+    came, the layers being identified by the move that ends in them. The
+    scoring and traceback matrices inherited from ScoringMatrix hold the best
+    score of a cell and the layers achieving it.
+    """
+
+    def _init_matrices(self):
+        super()._init_matrices()
+        horizontal_length = len(self.sequence_1) + 1
+        vertical_length = len(self.sequence_2) + 1
+        # A gap running along the first row or column is opened once
+        for i in range(1, horizontal_length):
+            self.scoring_matrix[0][i] = self.scoring_function.score(i)
+        for j in range(1, vertical_length):
+            self.scoring_matrix[j][0] = self.scoring_function.score(j)
+        self.layer_traceback_matrices = [
+            TracebackMatrix(vertical_length, horizontal_length)
+            for _ in TracebackDirection
+        ]
+
+    def _set_matrices(self, scoring_matrix, traceback_matrices: List[TracebackMatrix]):
+        self.scoring_matrix = scoring_matrix
+        self.traceback_matrix, *self.layer_traceback_matrices = traceback_matrices
+
+    def _fill(self):
+        """Fill layers with scores keeping only their last two rows"""
+        if self.engine != "python":
+            raise ValueError(
+                "Affine gap penalty is supported only by the python engine"
+            )
+
+        horizontal_length = len(self.sequence_1) + 1
+        vertical_length = len(self.sequence_2) + 1
+        open_penalty = self.scoring_function.score(1)
+        extension_penalty = self.scoring_function.gap_extension_penalty  # type: ignore
+        codes_2 = self.substitution_matrix.encode(self.sequence_2)
+        profile = self._get_profile()
+
+        traceback_flags = self.traceback_matrix.flags
+        diagonal_flags, upper_flags, side_flags = (
+            traceback_matrix.flags for traceback_matrix in self.layer_traceback_matrices
+        )
+
+        minus_infinity = float("-inf")
+        # Layers of the last row are the frontier a resumed fill continues from
+        first_row, frontier = self._start_checkpoint(frontier_rows=3)
+        if frontier is not None:
+            previous_diagonal_row, previous_upper_row, previous_side_row = frontier
+        else:
+            previous_diagonal_row = [0] + [minus_infinity] * (horizontal_length - 1)
+            previous_upper_row = [minus_infinity] * horizontal_length
+            previous_side_row = [minus_infinity] + self.scoring_matrix[0][1:]
+        checkpoint = self.checkpoint
+
+        progress_logger = ProgressLogger(vertical_length * horizontal_length)
+        for j in range(first_row, vertical_length):
+            substitution_row = profile[codes_2[j - 1]]
+            diagonal_row = [minus_infinity] * horizontal_length
+            upper_row = [minus_infinity] * horizontal_length
+            side_row = [minus_infinity] * horizontal_length
+            upper_row[0] = self.scoring_matrix[j][0]
+            scoring_row = self.scoring_matrix[j]
+            row_offset = j * horizontal_length
+
+            for i in range(1, horizontal_length):
+                # Pair of symbols after any layer of the diagonal cell
+                from_diagonal = previous_diagonal_row[i - 1]
+                from_upper = previous_upper_row[i - 1]
+                from_side = previous_side_row[i - 1]
+                best = max(from_diagonal, from_upper, from_side)
+                diagonal_row[i] = best + substitution_row[i - 1]
+                flags = 0
+                if from_diagonal == best:
+                    flags |= DIAGONAL_FLAG
+                if from_upper == best:
+                    flags |= UPPER_FLAG
+                if from_side == best:
+                    flags |= SIDE_FLAG
+                diagonal_flags[row_offset + i] = flags
+
+                # Gap in sequence_1 opened after the upper cell or extended
+                from_diagonal = previous_diagonal_row[i] + open_penalty
+                from_upper = previous_upper_row[i] + extension_penalty
+                from_side = previous_side_row[i] + open_penalty
+                best = max(from_diagonal, from_upper, from_side)
+                upper_row[i] = best
+                flags = 0
+                if from_diagonal == best:
+                    flags |= DIAGONAL_FLAG
+                if from_upper == best:
+                    flags |= UPPER_FLAG
+                if from_side == best:
+                    flags |= SIDE_FLAG
+                upper_flags[row_offset + i] = flags
+
+                # Gap in sequence_2 opened after the side cell or extended
+                from_diagonal = diagonal_row[i - 1] + open_penalty
+                from_upper = upper_row[i - 1] + open_penalty
+                from_side = side_row[i - 1] + extension_penalty
+                best = max(from_diagonal, from_upper, from_side)
+                side_row[i] = best
+                flags = 0
+                if from_diagonal == best:
+                    flags |= DIAGONAL_FLAG
+                if from_upper == best:
+                    flags |= UPPER_FLAG
+                if from_side == best:
+                    flags |= SIDE_FLAG
+                side_flags[row_offset + i] = flags
+
+                # Best score of the cell and the layers achieving it
+                best = max(diagonal_row[i], upper_row[i], side_row[i])
+                scoring_row[i] = best
+                flags = 0
+                if diagonal_row[i] == best:
+                    flags |= DIAGONAL_FLAG
+                if upper_row[i] == best:
+                    flags |= UPPER_FLAG
+                if side_row[i] == best:
+                    flags |= SIDE_FLAG
+                traceback_flags[row_offset + i] = flags
+
+            previous_diagonal_row = diagonal_row
+            previous_upper_row = upper_row
+            previous_side_row = side_row
+            progress_logger.update((j + 1) * horizontal_length)
+            if checkpoint is not None:
+                checkpoint.update(j, (diagonal_row, upper_row, side_row))
+
+    def _get_next_directions(
+        self,
+        i: int,
+        j: int,
+        traceback_direction: TracebackDirection,
+        next_i: int,
+        next_j: int,
+    ) -> List[TracebackDirection]:
+        # Only gaps run along the first row and column
+        if next_i == 0 or next_j == 0:
+            return self._get_directions(next_i, next_j)
+        layer_traceback_matrix = self.layer_traceback_matrices[
+            traceback_direction.value
+        ]
+        return layer_traceback_matrix.get_directions(j, i) or []
+
 
 SCORING_FUNCTIONS = {
     "constant": ConstantGapPenalty,
@@ -372,12 +1048,29 @@ SUBSTITUTION_MATRICES = {
     "protein": ProteinSubstitutionMatrix,
 }
 
+ENGINES = ["python", "numpy", "striped", "auto"]
+
+
+def get_substitution_matrix(name: str) -> SubstitutionMatrix:
+    """Get substitution matrix by name, NCBI matrix name or path of an NCBI matrix file"""
+    if name in SUBSTITUTION_MATRICES:
+        return SUBSTITUTION_MATRICES[name]()
+    from global_sequence_alignment.substitution_matrices import load_substitution_matrix
+
+    return load_substitution_matrix(name)
+
 
 class NeedlemanWunsch:
     def __init__(
         self,
         scoring_function: Union[str, ScoringFunction] = "constant",
         substitution_matrix: Union[str, SubstitutionMatrix] = "nucleotide",
+        engine: str = "python",
+        instrumentation: Optional[Instrumentation] = None,
+        cache: Optional["AlignmentCache"] = None,
+        threads: int = 1,
+        checkpoint: Optional["FillCheckpoint"] = None,
+        max_memory: Optional[int] = None,
     ) -> None:
         # Setup
         if isinstance(scoring_function, str):
@@ -388,20 +1081,307 @@ class NeedlemanWunsch:
             self.scoring_function = scoring_function
 
         if isinstance(substitution_matrix, str):
-            if substitution_matrix not in SUBSTITUTION_MATRICES:
-                raise ValueError("Invalid substitution matrix")
-            self.substitution_matrix = SUBSTITUTION_MATRICES[substitution_matrix]()
+            self.substitution_matrix = get_substitution_matrix(substitution_matrix)
         else:
             self.substitution_matrix = substitution_matrix  # type: ignore
 
-    def align(
-        self, sequence_1, sequence_2
-    ) -> Tuple[List[Alignment], int, ScoringMatrix]:
-        """Align two sequences using the Needleman-Wunsch algorithm"""
-        scoring_matrix = ScoringMatrix(
-            sequence_1, sequence_2, self.scoring_function, self.substitution_matrix
+        if engine not in ENGINES:
+            raise ValueError("Invalid engine")
+        self.engine = engine
+        self.instrumentation = instrumentation or NO_INSTRUMENTATION
+        self.cache = cache
+        if threads > 1 and engine not in ("numpy", "auto"):
+            raise ValueError("Parallel fill is supported only by the numpy engine")
+        # With the auto engine, the most processes a plan may fill tiles in
+        self.threads = threads
+        if threads > 1 and checkpoint is not None:
+            raise ValueError("Checkpointing is not supported by parallel fill")
+        # Checkpoint of the fill of the next scoring matrix built
+        self.checkpoint = checkpoint
+        # Memory budget of plans of the auto engine, available memory if None
+        self.max_memory = max_memory
+
+    def plan(
+        self,
+        sequence_1,
+        sequence_2,
+        max_alignments: Optional[int] = None,
+        first_only: bool = False,
+        score_only: bool = False,
+        banded: bool = True,
+    ) -> "Plan":
+        """Choose strategy and engine computing the requested outputs of aligning two sequences
+
+        See planner.plan_alignment, the auto engine runs the plan.
+        """
+        from global_sequence_alignment.planner import plan_alignment
+
+        return plan_alignment(
+            self.scoring_function,
+            len(sequence_1),
+            len(sequence_2),
+            max_alignments,
+            first_only,
+            score_only,
+            self.threads,
+            self.max_memory,
+            checkpointed=self.checkpoint is not None,
+            banded=banded,
+        )
+
+    def _get_planned(self, plan: "Plan") -> "NeedlemanWunsch":
+        """Aligner with settings of this one and the engine and processes of plan"""
+        return NeedlemanWunsch(
+            self.scoring_function,
+            self.substitution_matrix,
+            plan.engine,
+            self.instrumentation,
+            self.cache,
+            plan.threads,
+            self.checkpoint if plan.threads == 1 else None,
+        )
+
+    def build_scoring_matrix(
+        self, sequence_1, sequence_2, profile=None
+    ) -> ScoringMatrix:
+        """Create and fill scoring matrix for two sequences
+
+        Affine gap penalties use Gotoh's three layer matrix. A profile of
+        sequence_1 prepared for the engine saves building it, see prepare.
+        """
+        if self.engine == "auto":
+            plan = self.plan(sequence_1, sequence_2)
+            return self._get_planned(plan).build_scoring_matrix(sequence_1, sequence_2)
+        if self.engine == "striped":
+            raise ValueError("Striped engine computes only optimal scores")
+        if isinstance(self.scoring_function, AffineGapPenalty):
+            scoring_matrix_class = AffineScoringMatrix
+        else:
+            scoring_matrix_class = ScoringMatrix
+        scoring_matrix = scoring_matrix_class(
+            sequence_1,
+            sequence_2,
+            self.scoring_function,
+            self.substitution_matrix,
+            engine=self.engine,
+            instrumentation=self.instrumentation,
+            threads=self.threads,
+            checkpoint=self.checkpoint,
+            profile=profile,
         )
         scoring_matrix.fill()
-        alignments = scoring_matrix.get_alignments()
-        optimal_score = scoring_matrix.get_optimal_score()
+        return scoring_matrix
+
+    def align(
+        self,
+        sequence_1,
+        sequence_2,
+        max_alignments: Optional[int] = None,
+        first_only: bool = False,
+        profile=None,
+    ) -> Tuple[List[Alignment], int, Optional[ScoringMatrix]]:
+        """Align two sequences using the Needleman-Wunsch algorithm
+
+        With a cache, the scoring matrix is None when the result is found in it.
+        With the auto engine, one alignment may be found in linear space or
+        within a band, without a scoring matrix.
+        """
+        if self.cache is not None:
+            key = self.cache.make_key(
+                self, sequence_1, sequence_2, max_alignments, first_only
+            )
+            cached = self.cache.load(key, sequence_1, sequence_2)
+            if cached is not None:
+                alignments, optimal_score = cached
+                return alignments, optimal_score, None
+
+        if self.engine == "auto":
+            alignments, optimal_score, scoring_matrix = self._align_planned(
+                sequence_1, sequence_2, max_alignments, first_only
+            )
+        else:
+            scoring_matrix = self.build_scoring_matrix(sequence_1, sequence_2, profile)
+            alignments = scoring_matrix.get_alignments(max_alignments, first_only)
+            optimal_score = scoring_matrix.get_optimal_score()
+        if self.cache is not None:
+            self.cache.store(key, alignments, optimal_score)
         return alignments, optimal_score, scoring_matrix
+
+    def _align_planned(
+        self,
+        sequence_1,
+        sequence_2,
+        max_alignments: Optional[int],
+        first_only: bool,
+    ) -> Tuple[List[Alignment], int, Optional[ScoringMatrix]]:
+        from global_sequence_alignment.banded import BandLimitError
+        from global_sequence_alignment.planner import BANDED, LINEAR_SPACE
+
+        plan = self.plan(sequence_1, sequence_2, max_alignments, first_only)
+        needleman_wunsch = self._get_planned(plan)
+        if plan.strategy == BANDED:
+            try:
+                alignment, optimal_score = needleman_wunsch.align_banded(
+                    sequence_1, sequence_2, max_cells=plan.max_cells
+                )
+                return [alignment], optimal_score, None
+            except BandLimitError as error:
+                logger.info("%s, planning without a band", error)
+            plan = self.plan(
+                sequence_1, sequence_2, max_alignments, first_only, banded=False
+            )
+            needleman_wunsch = self._get_planned(plan)
+        if plan.strategy == LINEAR_SPACE:
+            alignment, optimal_score = needleman_wunsch.align_linear_space(
+                sequence_1, sequence_2
+            )
+            return [alignment], optimal_score, None
+        scoring_matrix = needleman_wunsch.build_scoring_matrix(sequence_1, sequence_2)
+        return (
+            scoring_matrix.get_alignments(max_alignments, first_only),
+            scoring_matrix.get_optimal_score(),
+            scoring_matrix,
+        )
+
+    def score(self, sequence_1, sequence_2, profile=None) -> int:
+        """Compute the optimal score keeping two rows and no traceback in memory
+
+        Only the striped engine supports affine gap penalty here, the auto
+        engine chooses it for affine gap penalty.
+        """
+        from global_sequence_alignment.linear_space import compute_last_row
+
+        if self.engine == "auto":
+            plan = self.plan(sequence_1, sequence_2, score_only=True)
+            return self._get_planned(plan).score(sequence_1, sequence_2)
+
+        if self.cache is not None:
+            key = self.cache.make_key(self, sequence_1, sequence_2, score_only=True)
+            cached = self.cache.load(key, sequence_1, sequence_2)
+            if cached is not None:
+                return cached[1]
+
+        with self.instrumentation.phase("fill"):
+            if self.engine == "striped":
+                from global_sequence_alignment import striped
+
+                last_row = striped.compute_last_row(
+                    sequence_1,
+                    sequence_2,
+                    *striped.get_gap_penalties(self.scoring_function),
+                    self.substitution_matrix,
+                    profile,
+                )
+            else:
+                last_row = compute_last_row(
+                    sequence_1,
+                    sequence_2,
+                    get_linear_gap_penalty(self.scoring_function),
+                    self.substitution_matrix,
+                    engine=self.engine,
+                    profile=profile,
+                )
+        self.instrumentation.add_cells(len(sequence_1) * len(sequence_2))
+        optimal_score = int(last_row[-1])
+        if self.cache is not None:
+            self.cache.store(key, [], optimal_score)
+        return optimal_score
+
+    def prepare(self, query: str) -> "PreparedQuery":
+        """Prepare query for aligning it as sequence_1 with many targets
+
+        Substitution scores along the query are looked up once, instead of once
+        per target.
+        """
+        from global_sequence_alignment.query_profile import PreparedQuery
+
+        return PreparedQuery(self, query)
+
+    def align_many(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        workers: int = 1,
+        max_alignments: Optional[int] = None,
+        first_only: bool = False,
+        score_only: bool = False,
+    ) -> Iterator[Tuple[int, List[Alignment], int]]:
+        """Align many pairs of sequences, in a process pool if workers > 1
+
+        Yields (pair index, alignments, optimal score) as pairs are finished.
+        """
+        from global_sequence_alignment.batch import align_many
+
+        return align_many(self, pairs, workers, max_alignments, first_only, score_only)
+
+    def align_anchored(
+        self,
+        sequence_1,
+        sequence_2,
+        kmer_length: Optional[int] = None,
+        workers: int = 1,
+        verify: bool = False,
+    ) -> Tuple[Alignment, int]:
+        """Find one alignment aligning only chunks between exact matches of unique k-mers
+
+        With verify, the score is compared with the optimal score computed
+        without anchors, see anchored.align_anchored.
+        """
+        from global_sequence_alignment.anchored import KMER_LENGTH, align_anchored
+
+        return align_anchored(
+            self,
+            sequence_1,
+            sequence_2,
+            KMER_LENGTH if kmer_length is None else kmer_length,
+            workers,
+            verify,
+        )
+
+    def align_multiple(
+        self,
+        sequences: List[str],
+        guide_tree: str = "upgma",
+        workers: int = 1,
+        max_memory: Optional[int] = None,
+    ) -> Tuple[List[str], List[Tuple[int, int]]]:
+        """Align sequences progressively along a guide tree of their distances
+
+        Returns gapped rows in the order of sequences and the merges of the
+        guide tree, see msa.align_multiple.
+        """
+        from global_sequence_alignment.msa import align_multiple
+
+        return align_multiple(self, sequences, guide_tree, workers, max_memory)
+
+    def align_banded(
+        self,
+        sequence_1,
+        sequence_2,
+        band: Optional[int] = None,
+        max_cells: Optional[int] = None,
+    ) -> Tuple[Alignment, int]:
+        """Find one optimal alignment computing only cells within band of the diagonal"""
+        from global_sequence_alignment.banded import align_banded
+
+        with self.instrumentation.phase("banded"):
+            return align_banded(
+                sequence_1,
+                sequence_2,
+                self.scoring_function,
+                self.substitution_matrix,
+                band,
+                max_cells,
+            )
+
+    def align_linear_space(self, sequence_1, sequence_2) -> Tuple[Alignment, int]:
+        """Find one optimal alignment in linear memory using Hirschberg's algorithm"""
+        from global_sequence_alignment.linear_space import hirschberg
+
+        with self.instrumentation.phase("hirschberg"):
+            return hirschberg(
+                sequence_1,
+                sequence_2,
+                self.scoring_function,
+                self.substitution_matrix,
+                engine="numpy" if self.engine == "auto" else self.engine,
+            )
@@ -0,0 +1,200 @@
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import numpy as np
+
+from global_sequence_alignment.instrumentation import ProgressLogger
+from global_sequence_alignment.needleman_wunsch import (
+    DIAGONAL_FLAG,
+    SIDE_FLAG,
+    UPPER_FLAG,
+    ScoringFunction,
+    SubstitutionMatrix,
+    TracebackMatrix,
+    get_linear_gap_penalty,
+)
+
+if TYPE_CHECKING:
+    from global_sequence_alignment.checkpoint import FillCheckpoint
+
+
+def encode_sequence(
+    sequence: str, substitution_matrix: SubstitutionMatrix
+) -> np.ndarray:
+    """Encode sequence as symbol codes of the substitution matrix"""
+    return np.frombuffer(substitution_matrix.encode(sequence), dtype=np.uint8)
+
+
+def build_profile(
+    codes: np.ndarray, substitution_matrix: SubstitutionMatrix
+) -> np.ndarray:
+    """Build table of substitution scores of every symbol against encoded sequence
+
+    Row k holds get_score(sequence[i], symbol with code k) for every position i.
+    """
+    alphabet_size = substitution_matrix.alphabet_size
+    lookup_table = np.array(substitution_matrix.lookup_table, dtype=np.int32).reshape(
+        alphabet_size, alphabet_size
+    )
+    return np.ascontiguousarray(lookup_table[codes, :].T)
+
+
+def init_scoring_matrix(
+    horizontal_length: int, vertical_length: int, gap_penalty: int, buffer=None
+) -> np.ndarray:
+    """Allocate scoring matrix with initialized first row and column
+
+    A given zeroed buffer, like memory shared with processes, holds the matrix.
+    """
+    if buffer is None:
+        scoring_matrix = np.zeros((vertical_length, horizontal_length), dtype=np.int32)
+    else:
+        scoring_matrix = np.frombuffer(buffer, dtype=np.int32).reshape(
+            vertical_length, horizontal_length
+        )
+    scoring_matrix[0, :] = np.arange(horizontal_length, dtype=np.int32) * gap_penalty
+    scoring_matrix[:, 0] = np.arange(vertical_length, dtype=np.int32) * gap_penalty
+    return scoring_matrix
+
+
+def fill_row(
+    previous_row: np.ndarray,
+    substitution_row: np.ndarray,
+    gap_penalty: int,
+    gap_offsets: np.ndarray,
+    row: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compute row of scores from the previous one
+
+    The first cell of row has to be set by the caller. Side moves depend on
+    the cell to the left, so they are resolved with a prefix maximum:
+    row[i] = max(best[i], row[i - 1] + gap) is equivalent to
+    row[i] - i * gap = max over k <= i of (best[k] - k * gap).
+    """
+    diagonal_scores = previous_row[:-1] + substitution_row
+    upper_scores = previous_row[1:] + gap_penalty
+
+    np.maximum(diagonal_scores, upper_scores, out=row[1:])
+    row -= gap_offsets
+    np.maximum.accumulate(row, out=row)
+    row += gap_offsets
+    return row, diagonal_scores, upper_scores
+
+
+def get_traceback_flags(
+    row: np.ndarray,
+    diagonal_scores: np.ndarray,
+    upper_scores: np.ndarray,
+    gap_penalty: int,
+) -> np.ndarray:
+    """Compute traceback direction flags for all but the first cell of a row"""
+    scores = row[1:]
+    side_scores = row[:-1] + gap_penalty
+    flags = (diagonal_scores == scores).astype(np.uint8) * DIAGONAL_FLAG
+    flags |= (upper_scores == scores).astype(np.uint8) * UPPER_FLAG
+    flags |= (side_scores == scores).astype(np.uint8) * SIDE_FLAG
+    return flags
+
+
+def fill(
+    sequence_1: str,
+    sequence_2: str,
+    scoring_function: ScoringFunction,
+    substitution_matrix: SubstitutionMatrix,
+    scoring_matrix: np.ndarray,
+    traceback_matrix: TracebackMatrix,
+    first_row: int = 1,
+    checkpoint: Optional["FillCheckpoint"] = None,
+    profile: Optional[np.ndarray] = None,
+):
+    """Fill initialized scoring and traceback matrices row by row
+
+    Rows before first_row are already filled, like when resuming from a
+    checkpoint. The profile of sequence_1 is built if not given.
+    """
+    gap_penalty = get_linear_gap_penalty(scoring_function)
+    codes_2 = encode_sequence(sequence_2, substitution_matrix)
+    if profile is None:
+        profile = build_profile(
+            encode_sequence(sequence_1, substitution_matrix), substitution_matrix
+        )
+
+    vertical_length, horizontal_length = scoring_matrix.shape
+    gap_offsets = np.arange(horizontal_length, dtype=np.int32) * gap_penalty
+    # Writable view sharing memory with the packed traceback matrix
+    traceback_flags = np.frombuffer(traceback_matrix.flags, dtype=np.uint8).reshape(
+        vertical_length, horizontal_length
+    )
+
+    progress_logger = ProgressLogger(vertical_length * horizontal_length)
+    for j in range(first_row, vertical_length):
+        row, diagonal_scores, upper_scores = fill_row(
+            scoring_matrix[j - 1],
+            profile[codes_2[j - 1]],
+            gap_penalty,
+            gap_offsets,
+            scoring_matrix[j],
+        )
+        traceback_flags[j, 1:] = get_traceback_flags(
+            row, diagonal_scores, upper_scores, gap_penalty
+        )
+        progress_logger.update((j + 1) * horizontal_length)
+        if checkpoint is not None:
+            checkpoint.update(j)
+
+
+def fill_tile(
+    scoring_matrix: np.ndarray,
+    traceback_flags: np.ndarray,
+    profile: np.ndarray,
+    codes_2: np.ndarray,
+    gap_penalty: int,
+    rows: range,
+    columns: range,
+):
+    """Fill cells of a tile whose upper and left neighbours are filled
+
+    Row segments are computed together with the cell to the left of the tile,
+    so side moves entering the tile are resolved as in a whole row.
+    """
+    segment = slice(columns.start - 1, columns.stop)
+    tile_columns = slice(columns.start, columns.stop)
+    substitution_columns = slice(columns.start - 1, columns.stop - 1)
+    gap_offsets = np.arange(len(columns) + 1, dtype=np.int32) * gap_penalty
+    row = np.empty(len(columns) + 1, dtype=np.int32)
+    for j in rows:
+        row[0] = scoring_matrix[j, columns.start - 1]
+        row, diagonal_scores, upper_scores = fill_row(
+            scoring_matrix[j - 1, segment],
+            profile[codes_2[j - 1], substitution_columns],
+            gap_penalty,
+            gap_offsets,
+            row,
+        )
+        scoring_matrix[j, tile_columns] = row[1:]
+        traceback_flags[j, tile_columns] = get_traceback_flags(
+            row, diagonal_scores, upper_scores, gap_penalty
+        )
+
+
+def compute_last_row(
+    sequence_1: str,
+    sequence_2: str,
+    gap_penalty: int,
+    substitution_matrix: SubstitutionMatrix,
+    profile: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Compute last row of the scoring matrix keeping only two rows in memory"""
+    codes_2 = encode_sequence(sequence_2, substitution_matrix)
+    if profile is None:
+        profile = build_profile(
+            encode_sequence(sequence_1, substitution_matrix), substitution_matrix
+        )
+
+    gap_offsets = np.arange(len(sequence_1) + 1, dtype=np.int32) * gap_penalty
+    previous_row = gap_offsets.copy()
+    row = np.empty_like(previous_row)
+    for code_2 in codes_2:
+        row[0] = previous_row[0] + gap_penalty
+        fill_row(previous_row, profile[code_2], gap_penalty, gap_offsets, row)
+        previous_row, row = row, previous_row
+    return previous_row
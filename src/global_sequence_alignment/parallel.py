@@ -0,0 +1,136 @@
+import ctypes
+import logging
+import math
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.sharedctypes import RawArray
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from global_sequence_alignment import numpy_engine
+from global_sequence_alignment.needleman_wunsch import (
+    ScoringFunction,
+    SubstitutionMatrix,
+    TracebackMatrix,
+    get_linear_gap_penalty,
+)
+
+logger = logging.getLogger(__name__)
+
+TILE_HEIGHT = 256
+MIN_TILE_WIDTH = 512
+
+# Shared matrices and sequence data of the worker process, set up by the pool initializer
+_worker_state: Optional[tuple] = None
+
+
+def init_shared_matrices(
+    horizontal_length: int, vertical_length: int, gap_penalty: int
+) -> Tuple[np.ndarray, TracebackMatrix, Tuple[Any, Any]]:
+    """Allocate scoring and traceback matrices in memory shared with worker processes
+
+    Returns the matrices and the shared buffers holding them, which workers
+    are started with. The buffers are anonymous, so no segment outlives the
+    matrices, even when a worker or this process crashes.
+    """
+    cells = vertical_length * horizontal_length
+    shared_buffers = (
+        RawArray(ctypes.c_int32, cells),
+        RawArray(ctypes.c_uint8, cells),
+    )
+    scoring_matrix = numpy_engine.init_scoring_matrix(
+        horizontal_length, vertical_length, gap_penalty, shared_buffers[0]
+    )
+    flags = memoryview(np.frombuffer(shared_buffers[1], dtype=np.uint8))
+    traceback_matrix = TracebackMatrix(vertical_length, horizontal_length, flags)
+    return scoring_matrix, traceback_matrix, shared_buffers
+
+
+def _init_worker(
+    shared_buffers: Tuple[Any, Any],
+    shape: Tuple[int, int],
+    profile: np.ndarray,
+    codes_2: np.ndarray,
+    gap_penalty: int,
+):
+    global _worker_state
+    scores_buffer, flags_buffer = shared_buffers
+    scoring_matrix = np.frombuffer(scores_buffer, dtype=np.int32).reshape(shape)
+    traceback_flags = np.frombuffer(flags_buffer, dtype=np.uint8).reshape(shape)
+    _worker_state = (scoring_matrix, traceback_flags, profile, codes_2, gap_penalty)
+
+
+def _fill_tile_in_worker(rows: range, columns: range):
+    scoring_matrix, traceback_flags, profile, codes_2, gap_penalty = _worker_state  # type: ignore
+    numpy_engine.fill_tile(
+        scoring_matrix, traceback_flags, profile, codes_2, gap_penalty, rows, columns
+    )
+
+
+def split_into_tiles(length: int, tile_length: int) -> List[range]:
+    """Split indices 1 to length - 1 into ranges of at most tile_length"""
+    return [
+        range(start, min(start + tile_length, length))
+        for start in range(1, length, tile_length)
+    ]
+
+
+def fill(
+    sequence_1: str,
+    sequence_2: str,
+    scoring_function: ScoringFunction,
+    substitution_matrix: SubstitutionMatrix,
+    shared_buffers: Tuple[Any, Any],
+    threads: int,
+    tile_height: int = TILE_HEIGHT,
+    tile_width: Optional[int] = None,
+):
+    """Fill initialized scoring and traceback matrices by tiles in worker processes
+
+    A tile depends only on tiles above and to the left of it, so tiles on one
+    anti-diagonal of tiles are filled concurrently, one anti-diagonal after
+    another. Workers fill tiles in place in the shared buffers of the
+    matrices, see init_shared_matrices. Without tile_width the columns are
+    split into one tile per thread.
+    """
+    gap_penalty = get_linear_gap_penalty(scoring_function)
+    codes_1 = numpy_engine.encode_sequence(sequence_1, substitution_matrix)
+    codes_2 = numpy_engine.encode_sequence(sequence_2, substitution_matrix)
+    profile = numpy_engine.build_profile(codes_1, substitution_matrix)
+
+    vertical_length, horizontal_length = len(sequence_2) + 1, len(sequence_1) + 1
+    if tile_width is None:
+        tile_width = max(MIN_TILE_WIDTH, math.ceil(horizontal_length / threads))
+    row_tiles = split_into_tiles(vertical_length, tile_height)
+    column_tiles = split_into_tiles(horizontal_length, tile_width)
+    logger.info(
+        "Filling %dx%d tiles in %d processes",
+        len(row_tiles),
+        len(column_tiles),
+        threads,
+    )
+
+    with ProcessPoolExecutor(
+        max_workers=threads,
+        initializer=_init_worker,
+        initargs=(
+            shared_buffers,
+            (vertical_length, horizontal_length),
+            profile,
+            codes_2,
+            gap_penalty,
+        ),
+    ) as executor:
+        for diagonal in range(len(row_tiles) + len(column_tiles) - 1):
+            first_row_tile = max(0, diagonal - len(column_tiles) + 1)
+            last_row_tile = min(diagonal, len(row_tiles) - 1)
+            futures = [
+                executor.submit(
+                    _fill_tile_in_worker,
+                    row_tiles[row_tile],
+                    column_tiles[diagonal - row_tile],
+                )
+                for row_tile in range(first_row_tile, last_row_tile + 1)
+            ]
+            for future in futures:
+                future.result()
@@ -0,0 +1,194 @@
+import logging
+import os
+import sys
+from typing import Optional
+
+from global_sequence_alignment.banded import BAND_MARGIN
+from global_sequence_alignment.needleman_wunsch import AffineGapPenalty, ScoringFunction
+
+logger = logging.getLogger(__name__)
+
+SCORE = "score"
+FULL = "full"
+PARALLEL = "parallel"
+BANDED = "banded"
+LINEAR_SPACE = "linear_space"
+STRATEGIES = [SCORE, FULL, PARALLEL, BANDED, LINEAR_SPACE]
+
+# Scores of the numpy engine are 32 bit integers, traceback flags one byte
+NUMPY_BYTES_PER_CELL = 4 + 1
+# A list slot pointing to an int object, plus the traceback flags
+PYTHON_BYTES_PER_CELL = 8 + sys.getsizeof(2**20) + 1
+# Gotoh's layers keep two rows of scores but a traceback flag per cell each
+AFFINE_BYTES_PER_CELL = PYTHON_BYTES_PER_CELL + 3
+# Rows of scores, profiles and operations of plans linear in the lengths
+BYTES_PER_SYMBOL = 64
+# The band is filled in python, so it pays off only with this share of the cells at most
+BANDED_MAX_SHARE = 0.02
+# Smaller matrices are filled by the python engine before numpy would be imported
+PYTHON_MAX_CELLS = 2**14
+# Smaller matrices are not worth starting processes for
+PARALLEL_MIN_CELLS = 2**24
+
+
+class MemoryBudgetError(ValueError):
+    """Exception raised when no plan giving the requested outputs fits in memory"""
+
+    pass
+
+
+class Plan:
+    """Strategy and engine chosen for aligning a pair, with its estimated cost"""
+
+    def __init__(
+        self,
+        strategy: str,
+        engine: str,
+        cells: int,
+        memory_bytes: int,
+        threads: int = 1,
+        max_cells: Optional[int] = None,
+    ):
+        self.strategy = strategy
+        self.engine = engine
+        self.cells = cells
+        self.memory_bytes = memory_bytes
+        self.threads = threads
+        # Most cells a banded plan may double its band to
+        self.max_cells = max_cells
+
+    def __repr__(self) -> str:
+        return (
+            f"Plan({self.strategy!r}, {self.engine!r}, cells={self.cells}, "
+            f"memory_bytes={self.memory_bytes}, threads={self.threads}, "
+            f"max_cells={self.max_cells})"
+        )
+
+    def __str__(self) -> str:
+        threads = f" in {self.threads} processes" if self.threads > 1 else ""
+        return (
+            f"{self.strategy} with the {self.engine} engine{threads}, "
+            f"~{self.cells} cells and ~{format_bytes(self.memory_bytes)}"
+        )
+
+
+def format_bytes(size: int) -> str:
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024  # type: ignore
+    return f"{size:.1f} TiB"
+
+
+def parse_memory_size(text: str) -> int:
+    """Parse number of bytes with an optional K, M, G or T suffix of powers of 1024"""
+    number = text.strip().upper()
+    # KiB and KB alike are powers of 1024
+    for suffix in ["IB", "B"]:
+        if number.endswith(suffix):
+            number = number[: -len(suffix)]
+            break
+    exponent = 0
+    if number and number[-1] in "KMGT":
+        exponent = "KMGT".index(number[-1]) + 1
+        number = number[:-1]
+    try:
+        size = float(number)
+    except ValueError:
+        raise ValueError(f"Invalid memory size {text}") from None
+    if size < 0:
+        raise ValueError(f"Invalid memory size {text}")
+    return int(size * 1024**exponent)
+
+
+def get_available_memory() -> Optional[int]:
+    """Get bytes of memory available without swapping, None if it is not known"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def plan_alignment(
+    scoring_function: ScoringFunction,
+    length_1: int,
+    length_2: int,
+    max_alignments: Optional[int] = None,
+    first_only: bool = False,
+    score_only: bool = False,
+    threads: int = 1,
+    max_memory: Optional[int] = None,
+    checkpointed: bool = False,
+    banded: bool = True,
+) -> Plan:
+    """Choose how to compute the requested outputs of aligning sequences of lengths
+
+    Optimal scores alone take two rows. One alignment takes the full matrix
+    if it fits in memory, unless a band around the diagonal is much smaller,
+    otherwise Hirschberg's algorithm. The band may be doubled up to that
+    share of the cells and the budget, beyond that the alignment is planned
+    again without banded. All co-optimal alignments take the full
+    matrix, filled by tiles in up to threads processes when it is large.
+    Affine gap penalty is supported by Gotoh's full matrix and the striped
+    score engine only. Small matrices are left to the python engine. Only
+    fills of the full matrix in one process are checkpointed, so checkpointed
+    alignments take one. The budget is max_memory or else the available memory.
+    """
+    cells = (length_1 + 1) * (length_2 + 1)
+    linear_bytes = (length_1 + length_2 + 2) * BYTES_PER_SYMBOL
+    affine = isinstance(scoring_function, AffineGapPenalty)
+    # Strategies finding one alignment do not fill the full matrix to checkpoint
+    one_alignment = (first_only or max_alignments == 1) and not checkpointed
+    budget = max_memory if max_memory is not None else get_available_memory()
+
+    candidates = []
+    small = cells <= PYTHON_MAX_CELLS
+    engine = "python" if small else "numpy"
+    if score_only:
+        candidates.append(
+            Plan(SCORE, "striped" if affine else engine, cells, linear_bytes)
+        )
+    elif affine:
+        candidates.append(Plan(FULL, "python", cells, cells * AFFINE_BYTES_PER_CELL))
+    else:
+        full_bytes = cells * (PYTHON_BYTES_PER_CELL if small else NUMPY_BYTES_PER_CELL)
+        band = abs(length_1 - length_2) + BAND_MARGIN
+        banded_cells = min(cells, (length_2 + 1) * (2 * band + 1))
+        # Traceback flags of the band take a byte per cell
+        max_banded_cells = int(cells * BANDED_MAX_SHARE)
+        if budget is not None:
+            max_banded_cells = min(max_banded_cells, budget)
+        if one_alignment and banded and banded_cells <= max_banded_cells:
+            candidates.append(
+                Plan(
+                    BANDED,
+                    "python",
+                    banded_cells,
+                    banded_cells,
+                    max_cells=max_banded_cells,
+                )
+            )
+        if threads > 1 and cells >= PARALLEL_MIN_CELLS and not checkpointed:
+            # Workers fill the matrices in place in shared memory, without copies
+            candidates.append(Plan(PARALLEL, "numpy", cells, full_bytes, threads))
+        candidates.append(Plan(FULL, engine, cells, full_bytes))
+        if one_alignment:
+            # Hirschberg's algorithm computes about twice the cells
+            candidates.append(Plan(LINEAR_SPACE, engine, 2 * cells, linear_bytes))
+
+    for plan in candidates:
+        if budget is None or plan.memory_bytes <= budget:
+            logger.info("Planned %s", plan)
+            return plan
+    smallest_plan = min(candidates, key=lambda plan: plan.memory_bytes)
+    raise MemoryBudgetError(
+        f"Memory budget of {format_bytes(budget)} is too small "  # type: ignore
+        f"even for {smallest_plan}"
+    )
@@ -0,0 +1,78 @@
+import heapq
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+from global_sequence_alignment.needleman_wunsch import (
+    Alignment,
+    NeedlemanWunsch,
+    ScoringMatrix,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PreparedQuery:
+    """Query with its substitution profile built once for many targets
+
+    The profile holds substitution scores of every symbol of the alphabet
+    along the query, in the form of the engine, so a row of the scoring matrix
+    of a target only takes the profile row of its symbol, filled as a vector
+    with the numpy engine and as striped vectors with the striped one. The
+    query is sequence_1 of every alignment.
+    """
+
+    def __init__(self, needleman_wunsch: NeedlemanWunsch, query: str):
+        self.needleman_wunsch = needleman_wunsch
+        self.query = query
+        substitution_matrix = needleman_wunsch.substitution_matrix
+        if needleman_wunsch.engine == "auto":
+            # Engine is planned for every target, so no profile fits all of them
+            self.profile = None
+        elif needleman_wunsch.engine == "striped":
+            from global_sequence_alignment.striped import StripedProfile
+
+            self.profile = StripedProfile(query, substitution_matrix)
+        elif needleman_wunsch.engine == "numpy":
+            from global_sequence_alignment import numpy_engine
+
+            self.profile = numpy_engine.build_profile(
+                numpy_engine.encode_sequence(query, substitution_matrix),
+                substitution_matrix,
+            )
+        else:
+            self.profile = substitution_matrix.get_profile(query)
+
+    def score(self, target: str) -> int:
+        """Compute the optimal score of the query and target"""
+        return self.needleman_wunsch.score(self.query, target, self.profile)
+
+    def align(
+        self,
+        target: str,
+        max_alignments: Optional[int] = None,
+        first_only: bool = False,
+    ) -> Tuple[List[Alignment], int, Optional[ScoringMatrix]]:
+        """Align the query with target, see NeedlemanWunsch.align"""
+        return self.needleman_wunsch.align(
+            self.query, target, max_alignments, first_only, self.profile
+        )
+
+    def rank(
+        self, targets: Iterable[Tuple[str, str]], top: Optional[int] = None
+    ) -> List[Tuple[str, int]]:
+        """Score named targets and get (name, optimal score) from the best
+
+        Targets are consumed one by one, so they can be read lazily; with top
+        only that many best results are kept. Equal scores keep the order of
+        targets.
+        """
+
+        def score_targets():
+            for name, target in targets:
+                optimal_score = self.score(target)
+                logger.info("Scored %s with %d", name, optimal_score)
+                yield name, optimal_score
+
+        if top is None:
+            return sorted(score_targets(), key=lambda result: result[1], reverse=True)
+        return heapq.nlargest(top, score_targets(), key=lambda result: result[1])
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from global_sequence_alignment.jobs import (
+    MAX_JOB_ALIGNMENTS,
+    MAX_JOB_SEQUENCE_LENGTH,
+    format_result,
+    parse_job,
+    parse_job_line,
+    run_job,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+# Longest job line read, enough for a pair of sequences of a few dozen megabases
+MAX_LINE_LENGTH = 256 * 2**20
+
+
+class AlignmentServer:
+    """Server aligning JSON jobs in a pool of worker processes
+
+    Every line received on a connection is a job and every line sent back is
+    its result, carrying the id of the job. Results are sent as soon as they
+    are ready, so they may come in different order than jobs. At most
+    max_pending jobs of all connections are waiting for results; while there
+    are that many, no more lines are read, so the sockets push back on
+    clients. Jobs equal to one in flight wait for its result instead of being
+    computed again. Lines longer than max_line_length, jobs whose worker
+    failed and jobs over the limits of parse_job get an error result.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_pending: Optional[int] = None,
+        max_line_length: int = MAX_LINE_LENGTH,
+        max_alignments: int = MAX_JOB_ALIGNMENTS,
+        max_sequence_length: int = MAX_JOB_SEQUENCE_LENGTH,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending or workers * 2
+        self.max_line_length = max_line_length
+        self.max_alignments = max_alignments
+        self.max_sequence_length = max_sequence_length
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.pending_jobs: Optional[asyncio.Semaphore] = None
+        self.in_flight: Dict[tuple, asyncio.Future] = {}
+        self.jobs_computed = 0
+        self.jobs_merged = 0
+
+    def _start_executor(self):
+        # Forked workers would inherit sockets of connections and keep them open
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    async def __aenter__(self) -> "AlignmentServer":
+        self._start_executor()
+        self.pending_jobs = asyncio.Semaphore(self.max_pending)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.executor.shutdown()  # type: ignore
+
+    async def align(self, job: dict) -> dict:
+        """Compute result of a job or share the one of an equal job in flight"""
+        try:
+            parsed_job = parse_job(job, self.max_alignments, self.max_sequence_length)
+        except ValueError as error:
+            return {"error": str(error)}
+
+        result = self.in_flight.get(parsed_job)
+        if result is not None:
+            self.jobs_merged += 1
+            return await asyncio.shield(result)
+
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        self.in_flight[parsed_job] = result
+        executor = self.executor
+        try:
+            self.jobs_computed += 1
+            try:
+                response = await loop.run_in_executor(executor, run_job, *parsed_job)
+            except BrokenProcessPool:
+                # A worker died, jobs of the pool fail and later ones get a new pool
+                logger.error("Worker process terminated abruptly, restarting workers")
+                if self.executor is executor:
+                    self._start_executor()
+                    executor.shutdown(wait=False)  # type: ignore
+                response = {"error": "Worker process terminated abruptly"}
+            except Exception as error:
+                logger.error("Job failed: %r", error)
+                response = {"error": f"Job failed: {error!r}"}
+            result.set_result(response)
+        except BaseException as error:
+            result.set_exception(error)
+            raise
+        finally:
+            del self.in_flight[parsed_job]
+        return result.result()
+
+    async def _reply(
+        self,
+        job: Optional[dict],
+        writer: asyncio.StreamWriter,
+        write_lock: asyncio.Lock,
+    ):
+        try:
+            if job is None:
+                response = {"error": "Job has to be a JSON object"}
+            else:
+                response = await self.align(job)
+        finally:
+            self.pending_jobs.release()  # type: ignore
+        await self._write(job, response, writer, write_lock)
+
+    @staticmethod
+    async def _write(
+        job: Optional[dict],
+        response: dict,
+        writer: asyncio.StreamWriter,
+        write_lock: asyncio.Lock,
+    ):
+        async with write_lock:
+            writer.write(format_result(job, response).encode())
+            await writer.drain()
+
+    @staticmethod
+    async def _skip_line(reader: asyncio.StreamReader):
+        """Discard the rest of a line that is too long to be read"""
+        while True:
+            try:
+                await reader.readuntil(b"\n")
+                return
+            except asyncio.LimitOverrunError as error:
+                await reader.readexactly(error.consumed)
+            except asyncio.IncompleteReadError:
+                return
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        write_lock = asyncio.Lock()
+        replies: List[asyncio.Task] = []
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as error:
+                    line = error.partial
+                except asyncio.LimitOverrunError:
+                    await self._skip_line(reader)
+                    await self._write(
+                        None, {"error": "Job line is too long"}, writer, write_lock
+                    )
+                    continue
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                job = parse_job_line(line)
+                # Next line is not read until there is a slot, the reply releases it
+                await self.pending_jobs.acquire()  # type: ignore
+                replies.append(
+                    asyncio.create_task(self._reply(job, writer, write_lock))
+                )
+            await asyncio.gather(*replies)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    async def serve(
+        self,
+        socket_path: Optional[str] = None,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+    ):
+        if socket_path:
+            server = await asyncio.start_unix_server(
+                self.handle_connection, socket_path, limit=self.max_line_length
+            )
+            logger.info("Serving alignments on %s", socket_path)
+        else:
+            server = await asyncio.start_server(
+                self.handle_connection, host, port, limit=self.max_line_length
+            )
+            logger.info("Serving alignments on %s:%d", host, port)
+        async with server:
+            await server.serve_forever()
@@ -0,0 +1,236 @@
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from global_sequence_alignment import numpy_engine
+from global_sequence_alignment.needleman_wunsch import (
+    AffineGapPenalty,
+    ScoringFunction,
+    SubstitutionMatrix,
+)
+
+logger = logging.getLogger(__name__)
+
+# Number of interleaved lanes of a striped vector
+LANES = 64
+# Narrow lanes are tried first, wider ones when scores would overflow them
+SCORE_DTYPES = (np.int16, np.int32)
+
+
+class ScoreOverflowError(ValueError):
+    """Exception raised when scores do not fit integers of the lanes"""
+
+    pass
+
+
+def get_gap_penalties(scoring_function: ScoringFunction) -> Tuple[int, int]:
+    """Get penalties of opening a gap and of extending it by one symbol"""
+    gap_open = scoring_function.score(1)
+    if not isinstance(scoring_function, AffineGapPenalty):
+        return gap_open, gap_open
+    gap_extension = scoring_function.gap_extension_penalty
+    # Consecutive gap symbols are one gap, so a gap is never closed and opened again
+    if gap_extension < gap_open:
+        raise ValueError(
+            "Striped engine requires gap extension penalty of at most the opening one"
+        )
+    return gap_open, gap_extension
+
+
+def stripe(values: np.ndarray, segments: int, lanes: int) -> np.ndarray:
+    """Rearrange last axis of segments * lanes values into (segments, lanes)
+
+    Value p goes to segment p % segments of lane p // segments.
+    """
+    shape = values.shape[:-1] + (lanes, segments)
+    return np.ascontiguousarray(np.swapaxes(values.reshape(shape), -1, -2))
+
+
+def unstripe(values: np.ndarray) -> np.ndarray:
+    """Rearrange (segments, lanes) values back into one axis"""
+    return values.T.ravel()
+
+
+def get_gap_scores(length: int, gap_open: int, gap_extension: int) -> np.ndarray:
+    """Get scores of gaps of lengths 0 to length"""
+    gap_scores = gap_open + np.arange(-1, length, dtype=np.int64) * gap_extension
+    gap_scores[0] = 0
+    return gap_scores
+
+
+class StripedProfile:
+    """Substitution scores along a query in interleaved lanes
+
+    Position p of the query is in segment p % segments of lane p // segments,
+    so the vector of a segment holds positions segments apart. Element k is
+    the striped profile of the symbol with code k, padded with zeros past the
+    end of the query. Profiles in narrower integers are cached on first use.
+    """
+
+    def __init__(
+        self,
+        sequence: str,
+        substitution_matrix: SubstitutionMatrix,
+        lanes: int = LANES,
+    ):
+        self.length = len(sequence)
+        self.lanes = lanes
+        self.segments = max(1, -(-self.length // lanes))
+        profile = numpy_engine.build_profile(
+            numpy_engine.encode_sequence(sequence, substitution_matrix),
+            substitution_matrix,
+        )
+        padded = np.zeros(
+            (substitution_matrix.alphabet_size, self.segments * lanes), dtype=np.int32
+        )
+        padded[:, : self.length] = profile
+        self.max_abs_score = int(np.abs(profile).max(initial=0))
+        self._scores: Dict[type, np.ndarray] = {
+            np.int32: stripe(padded, self.segments, lanes)
+        }
+
+    def get_scores(self, dtype: type) -> np.ndarray:
+        scores = self._scores.get(dtype)
+        if scores is None:
+            scores = self._scores[np.int32].astype(dtype)
+            self._scores[dtype] = scores
+        return scores
+
+
+def compute_last_row(
+    sequence_1: str,
+    sequence_2: str,
+    gap_open: int,
+    gap_extension: int,
+    substitution_matrix: SubstitutionMatrix,
+    profile: Optional[StripedProfile] = None,
+) -> np.ndarray:
+    """Compute last row of the scoring matrix with striped vectors
+
+    A gap of length k costs gap_open + (k - 1) * gap_extension. Scores are
+    computed in int16 lanes and again in int32 lanes if they would overflow.
+    The profile of sequence_1 is built if not given.
+    """
+    if profile is None:
+        profile = StripedProfile(sequence_1, substitution_matrix)
+    codes_2 = numpy_engine.encode_sequence(sequence_2, substitution_matrix)
+    for dtype in SCORE_DTYPES:
+        try:
+            return _compute_last_row(profile, codes_2, gap_open, gap_extension, dtype)
+        except ScoreOverflowError:
+            logger.info("Scores overflow %s lanes", np.dtype(dtype).name)
+    raise ScoreOverflowError("Scores overflow integers of all lanes")
+
+
+def _compute_last_row(
+    profile: StripedProfile,
+    codes_2: np.ndarray,
+    gap_open: int,
+    gap_extension: int,
+    dtype: type,
+) -> np.ndarray:
+    """Compute last row in lanes of dtype with Farrar's striped algorithm
+
+    H is the best score of a cell, E of a cell ending with an upper move and
+    F of one ending with a side move. For every symbol of sequence_2, the
+    moves from the previous row are vectors over all segments at once. F is
+    then carried from a segment to the next one, which is the next position
+    in every lane, but not from the last segment of a lane to the first one
+    of the next lane. The lazy F loop carries those side gaps across lanes
+    for as long as they can raise a score. Instead of saturating, the
+    computation stops when scores come near the limits of dtype.
+    """
+    segments, lanes = profile.segments, profile.lanes
+    length_1, length_2 = profile.length, len(codes_2)
+    first_row = get_gap_scores(segments * lanes, gap_open, gap_extension)
+    first_column = get_gap_scores(length_2, gap_open, gap_extension)
+    if not length_2:
+        return first_row[: length_1 + 1]
+
+    # Scores change by at most step per move, keeping sentinels and scores apart
+    step = max(abs(gap_open), abs(gap_extension), profile.max_abs_score, 1)
+    limits = np.iinfo(dtype)
+    minus_infinity = limits.min + 2 * step
+    lowest = limits.min + 4 * step
+    highest = limits.max - 2 * step
+    if first_row[-1] < lowest or first_column[-1] < lowest:
+        raise ScoreOverflowError
+    first_column = first_column.tolist()
+    # With equal penalties E and F are H of the cell they come from plus the gap
+    linear = gap_open == gap_extension
+    lazy_threshold = gap_open - gap_extension
+
+    scores_by_code = profile.get_scores(dtype)
+    # Row 0 holds cells diagonal to the first segment, the rest the striped row
+    rows = np.empty((segments + 1, lanes), dtype=dtype)
+    rows[1:] = stripe(first_row[1:], segments, lanes)
+    next_rows = np.empty_like(rows)
+    upper_scores = np.full((segments, lanes), minus_infinity, dtype=dtype)
+    side_scores = np.empty(lanes, dtype=dtype)
+    # Side gaps carried across lanes raise nothing while not above these
+    lazy_bounds = np.empty((segments, lanes), dtype=dtype)
+
+    for j in range(1, length_2 + 1):
+        previous_scores = rows[1:]
+        rows[0, 1:] = rows[-1, :-1]
+        rows[0, 0] = first_column[j - 1]
+        if linear:
+            np.add(previous_scores, gap_open, out=upper_scores)
+        else:
+            np.maximum(
+                previous_scores + gap_open,
+                upper_scores + gap_extension,
+                out=upper_scores,
+            )
+        scores = next_rows[1:]
+        np.add(rows[:-1], scores_by_code[codes_2[j - 1]], out=scores)
+        np.maximum(scores, upper_scores, out=scores)
+
+        side_scores.fill(minus_infinity)
+        side_scores[0] = first_column[j] + gap_open
+        if linear:
+            for segment_scores in scores:
+                np.maximum(segment_scores, side_scores, out=segment_scores)
+                np.add(segment_scores, gap_open, out=side_scores)
+            # F entering a segment is below H of the cell
+            bounds = scores
+        else:
+            for segment_scores, segment_bounds in zip(scores, lazy_bounds):
+                np.copyto(segment_bounds, side_scores)
+                np.maximum(segment_scores, side_scores, out=segment_scores)
+                np.maximum(
+                    segment_scores + gap_open,
+                    side_scores + gap_extension,
+                    out=side_scores,
+                )
+            # A carried F not above the F entering a segment raises nothing, nor
+            # does it after extending when not above H opening a gap there
+            np.maximum(lazy_bounds, scores + lazy_threshold, out=lazy_bounds)
+            bounds = lazy_bounds
+
+        # Lazy F loop
+        k = segments
+        while True:
+            if k == segments:
+                side_scores[1:] = side_scores[:-1].copy()
+                side_scores[0] = minus_infinity
+                k = 0
+            segment_scores = scores[k]
+            if not (side_scores > bounds[k]).any():
+                break
+            np.maximum(segment_scores, side_scores, out=segment_scores)
+            if not linear:
+                np.maximum(bounds[k], segment_scores + lazy_threshold, out=bounds[k])
+            side_scores += gap_extension
+            np.maximum(side_scores, minus_infinity, out=side_scores)
+            k += 1
+
+        rows, next_rows = next_rows, rows
+        if scores.min() < lowest or scores.max() > highest:
+            raise ScoreOverflowError
+
+    last_row = np.empty(length_1 + 1, dtype=np.int64)
+    last_row[0] = first_column[-1]
+    last_row[1:] = unstripe(rows[1:])[:length_1]
+    return last_row
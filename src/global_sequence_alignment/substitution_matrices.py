@@ -0,0 +1,217 @@
+import array
+import hashlib
+import logging
+import os
+import struct
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from global_sequence_alignment.needleman_wunsch import SubstitutionMatrix
+
+logger = logging.getLogger(__name__)
+
+MATRICES_DIR = os.path.join(os.path.dirname(__file__), "matrices")
+# Matrices in NCBI format addressable by name, the bundled ones by default
+NCBI_MATRICES: Dict[str, str] = {
+    name: os.path.join(MATRICES_DIR, name)
+    for name in [
+        "BLOSUM45",
+        "BLOSUM50",
+        "BLOSUM62",
+        "BLOSUM80",
+        "BLOSUM90",
+        "PAM30",
+        "PAM70",
+        "PAM250",
+        "NUC.4.4",
+    ]
+}
+
+# Sidecars are kept in this directory of the user cache directory
+SIDECAR_DIR = os.path.join("global_sequence_alignment", "matrices")
+SIDECAR_SUFFIX = ".nwsm"
+SIDECAR_MAGIC = b"NWSUBMAT"
+SIDECAR_VERSION = 1
+# Magic, format version, alphabet size, size and modification time of the source file
+SIDECAR_HEADER = struct.Struct("<8sHHQq")
+# Scores are stored as little endian 16 bit integers
+SCORE_TYPECODE = "h"
+
+
+class MatrixFormatError(ValueError):
+    """Exception raised when a file is not a substitution matrix in NCBI format"""
+
+    pass
+
+
+def register_matrix_file(name: str, file_path: str):
+    """Make matrix in NCBI format addressable by name"""
+    NCBI_MATRICES[name] = file_path
+
+
+def parse_ncbi_matrix(text: str) -> Tuple[List[List[int]], List[str]]:
+    """Parse substitution scores and symbols of a matrix in NCBI format
+
+    Lines starting with # are comments, the first other line has the symbols
+    of the columns and every following line a symbol and its row of scores.
+    Rows may come in any order but have to cover the symbols of the columns.
+    """
+    lines = [
+        line.split()
+        for line in text.splitlines()
+        if line.strip() and not line.startswith("#")
+    ]
+    if not lines:
+        raise MatrixFormatError("Substitution matrix has no symbols")
+    symbols = lines[0]
+    if len(set(symbols)) != len(symbols) or any(
+        len(s) != 1 or not s.isascii() for s in symbols
+    ):
+        raise MatrixFormatError(
+            "Symbols of substitution matrix have to be distinct ASCII characters"
+        )
+
+    rows: Dict[str, List[int]] = {}
+    for fields in lines[1:]:
+        symbol, *scores = fields
+        if symbol not in symbols or symbol in rows:
+            raise MatrixFormatError(f"Unexpected row {symbol} of substitution matrix")
+        if len(scores) != len(symbols):
+            raise MatrixFormatError(
+                f"Row {symbol} of substitution matrix has {len(scores)} scores, expected {len(symbols)}"
+            )
+        try:
+            rows[symbol] = [int(score) for score in scores]
+        except ValueError:
+            raise MatrixFormatError(
+                f"Row {symbol} of substitution matrix has scores that are not integers"
+            ) from None
+    if len(rows) != len(symbols):
+        missing = [symbol for symbol in symbols if symbol not in rows]
+        raise MatrixFormatError(f"Substitution matrix has no rows {' '.join(missing)}")
+    return [rows[symbol] for symbol in symbols], symbols
+
+
+def get_sidecar_dir() -> str:
+    """Get directory of sidecars in XDG_CACHE_HOME, ~/.cache by default"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, SIDECAR_DIR)
+
+
+def get_sidecar_path(file_path: str) -> str:
+    """Get path of the sidecar of a matrix file, named by a hash of its absolute path"""
+    absolute_path = os.path.realpath(file_path)
+    digest = hashlib.sha256(os.fsencode(absolute_path)).hexdigest()[:16]
+    return os.path.join(
+        get_sidecar_dir(),
+        f"{os.path.basename(absolute_path)}.{digest}{SIDECAR_SUFFIX}",
+    )
+
+
+def _read_sidecar(
+    sidecar_path: str, source_stat: os.stat_result
+) -> Optional[Tuple[List[List[int]], List[str]]]:
+    """Read scores and symbols of a sidecar written for the current source file"""
+    try:
+        with open(sidecar_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < SIDECAR_HEADER.size:
+        return None
+    magic, version, alphabet_size, size, mtime_ns = SIDECAR_HEADER.unpack_from(data)
+    if (
+        magic != SIDECAR_MAGIC
+        or version != SIDECAR_VERSION
+        or (size, mtime_ns) != (source_stat.st_size, source_stat.st_mtime_ns)
+    ):
+        return None
+    scores = array.array(SCORE_TYPECODE)
+    scores_offset = SIDECAR_HEADER.size + alphabet_size
+    scores_size = alphabet_size * alphabet_size * scores.itemsize
+    if len(data) != scores_offset + scores_size:
+        return None
+    symbols = list(data[SIDECAR_HEADER.size : scores_offset].decode("ascii"))
+    scores.frombytes(data[scores_offset:])
+    if sys.byteorder != "little":
+        scores.byteswap()
+    flat_scores = scores.tolist()
+    return [
+        flat_scores[k * alphabet_size : (k + 1) * alphabet_size]
+        for k in range(alphabet_size)
+    ], symbols
+
+
+def _write_sidecar(
+    sidecar_path: str,
+    source_stat: os.stat_result,
+    scores: List[List[int]],
+    symbols: List[str],
+):
+    """Write scores and symbols of the source file, if the sidecar directory is writable"""
+    flat_scores = array.array(
+        SCORE_TYPECODE, [score for row in scores for score in row]
+    )
+    if sys.byteorder != "little":
+        flat_scores.byteswap()
+    header = SIDECAR_HEADER.pack(
+        SIDECAR_MAGIC,
+        SIDECAR_VERSION,
+        len(symbols),
+        source_stat.st_size,
+        source_stat.st_mtime_ns,
+    )
+    directory = os.path.dirname(sidecar_path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # Written to a temporary file first, so readers never see a partial sidecar
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=directory, suffix=".tmp", delete=False
+        ) as f:
+            f.write(header + "".join(symbols).encode("ascii") + flat_scores.tobytes())
+        try:
+            os.replace(f.name, sidecar_path)
+        except OSError:
+            os.remove(f.name)
+            raise
+    except OSError as error:
+        logger.info("Substitution matrix sidecar not written: %s", error)
+
+
+def load_substitution_matrix(name_or_path: str) -> SubstitutionMatrix:
+    """Load substitution matrix in NCBI format by registered name or file path
+
+    Parsed matrices are stored in a binary sidecar in the user cache
+    directory, which is read instead of parsing the file again while the file
+    is unchanged.
+    """
+    file_path = NCBI_MATRICES.get(name_or_path, name_or_path)
+    try:
+        source_stat = os.stat(file_path)
+    except OSError:
+        raise ValueError(f"Invalid substitution matrix {name_or_path}") from None
+
+    sidecar_path = get_sidecar_path(file_path)
+    parsed = _read_sidecar(sidecar_path, source_stat)
+    if parsed is None:
+        try:
+            with open(file_path) as f:
+                text = f.read()
+        except UnicodeDecodeError:
+            raise MatrixFormatError(
+                f"{file_path} is not a substitution matrix file"
+            ) from None
+        except OSError as error:
+            raise ValueError(
+                f"Cannot read substitution matrix {file_path}: {error.strerror}"
+            ) from None
+        parsed = parse_ncbi_matrix(text)
+        scores, symbols = parsed
+        if any(not -(2**15) <= score < 2**15 for row in scores for score in row):
+            raise MatrixFormatError(f"Scores of {file_path} do not fit 16 bits")
+        _write_sidecar(sidecar_path, source_stat, scores, symbols)
+    scores, symbols = parsed
+    return SubstitutionMatrix(scores, symbols)
@@ -1,38 +1,256 @@
+import itertools
+import json
 import logging
+import os
 import sys
+from contextlib import closing
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import click
 
-from global_sequence_alignment.needleman_wunsch import NeedlemanWunsch
+from global_sequence_alignment.cache import AlignmentCache
+from global_sequence_alignment.fasta import read_fasta_records
+from global_sequence_alignment.instrumentation import (
+    NO_INSTRUMENTATION,
+    Instrumentation,
+    PhaseTimer,
+)
+from global_sequence_alignment.needleman_wunsch import (
+    ENGINES,
+    Alignment,
+    NeedlemanWunsch,
+    ScoringMatrix,
+    SubstitutionMatrix,
+    get_substitution_matrix,
+)
+from global_sequence_alignment.planner import MemoryBudgetError, parse_memory_size
 
-root = logging.getLogger()
-root.setLevel(logging.DEBUG)
+if TYPE_CHECKING:
+    from global_sequence_alignment.checkpoint import FillCheckpoint
 
-handler = logging.StreamHandler(sys.stdout)
-handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
-root.addHandler(handler)
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+FASTA_LINE_LENGTH = 60
+
+
+def configure_logging(level: str, stream) -> logging.Handler:
+    """Log records of level and above to stream, return the handler added to the root logger"""
+    root = logging.getLogger()
+    root.setLevel(level)
+    handler = logging.StreamHandler(stream)
+    handler.setLevel(level)
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    handler.setFormatter(formatter)
+    root.addHandler(handler)
+    return handler
 
 
 def read_fasta_file(file_path):
-    with open(file_path, "r") as f:
-        lines = f.readlines()
-        return "".join([line.strip() for line in lines[1:]])
+    """Read sequence of the first record of FASTA file"""
+    with closing(read_fasta_records(file_path)) as records:
+        _, sequence = next(records, ("", b""))
+        if next(records, None) is not None:
+            logging.warning(f"{file_path} has more records, using the first one")
+    return sequence.decode("ascii")
+
+
+def iter_fasta_sequences(file_path) -> Iterator[Tuple[str, str]]:
+    """Read named sequences of all records of FASTA file lazily
+
+    A single record is named after the file, multiple records by the first
+    word of their headers.
+    """
+    with closing(read_fasta_records(file_path)) as records:
+        first_records = list(itertools.islice(records, 2))
+        if len(first_records) == 1:
+            yield get_sequence_name(file_path), first_records[0][1].decode("ascii")
+            return
+        for header, sequence in itertools.chain(first_records, records):
+            yield header.split()[0] if header else "", sequence.decode("ascii")
+
+
+def read_fasta_sequences(file_path) -> List[Tuple[str, str]]:
+    """Read named sequences of all records of FASTA file, see iter_fasta_sequences"""
+    return list(iter_fasta_sequences(file_path))
 
 
 def write_optimal_alignments_to_file(file_path, alignments):
+    """Write alignments to file as they are produced, return how many were written"""
+    alignments_written = 0
     with open(file_path, "w") as f:
         for alignment in alignments:
+            if alignments_written:
+                f.write("\n")
             alignment_serialized = str(alignment)
-            f.write(alignment_serialized)
+            f.write(alignment_serialized + "\n")
+            alignments_written += 1
+    return alignments_written
+
+
+def read_manifest(file_path) -> List[Tuple[str, str]]:
+    """Read pairs of FASTA file paths, one whitespace separated pair per line"""
+    pairs = []
+    with open(file_path, "r") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            path_1, path_2 = line.split()
+            pairs.append((path_1, path_2))
+    return pairs
+
+
+def get_sequence_name(file_path) -> str:
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def write_score_matrix(file_path, names, scores: Dict[Tuple[str, str], int]):
+    """Write symmetric matrix of optimal scores as TSV, leaving missing pairs empty"""
+    with open(file_path, "w") as f:
+        f.write("\t".join([""] + names) + "\n")
+        for name_1 in names:
+            row = [name_1]
+            for name_2 in names:
+                score = scores.get((name_1, name_2), scores.get((name_2, name_1)))
+                row.append("" if score is None else str(score))
+            f.write("\t".join(row) + "\n")
+
+
+def write_aligned_fasta(file, names: List[str], rows: List[str]):
+    """Write gapped rows of a multiple alignment as FASTA records"""
+    for name, row in zip(names, rows):
+        file.write(f">{name}\n")
+        for start in range(0, len(row), FASTA_LINE_LENGTH):
+            file.write(row[start : start + FASTA_LINE_LENGTH] + "\n")
+
+
+def parse_matrix_window(ctx, param, value) -> Optional[Tuple[slice, slice]]:
+    """Parse window of rows and columns given as r0:r1,c0:c1, bounds may be left out"""
+    if value is None:
+        return None
+    try:
+        bounds = [
+            [int(bound) if bound else None for bound in window.split(":")]
+            for window in value.split(",")
+        ]
+        (row_start, row_stop), (column_start, column_stop) = bounds
+    except ValueError:
+        raise click.BadParameter("has to be in the form r0:r1,c0:c1") from None
+    return slice(row_start, row_stop), slice(column_start, column_stop)
+
+
+def parse_band(ctx, param, value) -> Optional[Union[int, str]]:
+    """Parse band given as a non-negative number of cells or 'auto'"""
+    if value is None or value == "auto":
+        return value
+    try:
+        band: Optional[int] = int(value)
+    except ValueError:
+        band = None
+    if band is None or band < 0:
+        raise click.BadParameter("has to be a non-negative integer or 'auto'")
+    return band
+
+
+def parse_max_memory(ctx, param, value) -> Optional[int]:
+    """Parse memory size given as bytes or with a K, M, G or T suffix"""
+    if value is None:
+        return None
+    try:
+        return parse_memory_size(value)
+    except ValueError:
+        raise click.BadParameter("has to be a size like 512M or 4G") from None
+
 
+def parse_substitution_matrix(ctx, param, value) -> SubstitutionMatrix:
+    """Get substitution matrix by name or load it from an NCBI matrix file"""
+    try:
+        return get_substitution_matrix(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error)) from None
 
-@click.command()
+
+class DefaultCommandGroup(click.Group):
+    """Command group that runs the default command when no subcommand is named"""
+
+    def __init__(self, *args, default_command: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        group_options = {option for param in self.params for option in param.opts}
+        if not args or (
+            args[0] not in self.commands
+            and args[0] not in ctx.help_option_names
+            and args[0].split("=")[0] not in group_options
+        ):
+            args.insert(0, self.default_command)
+        return super().parse_args(ctx, args)
+
+    def resolve_command(self, ctx, args):
+        # Options of the group may come before arguments of the default command
+        if args[0] not in self.commands:
+            args.insert(0, self.default_command)
+        return super().resolve_command(ctx, args)
+
+
+@click.group(
+    cls=DefaultCommandGroup,
+    default_command="align",
+    invoke_without_command=True,
+    # Options of the default command are passed on to it
+    context_settings={"ignore_unknown_options": True},
+)
+@click.option(
+    "--log-level",
+    type=click.Choice(LOG_LEVELS),
+    help="Lowest level of logged messages, DEBUG by default and WARNING with --stdin-jsonl",
+)
+@click.option(
+    "--stdin-jsonl",
+    is_flag=True,
+    help="If set, JSON jobs are read one per line from the standard input and their results are written one per line to the standard output, as with serve",
+)
+@click.pass_context
+def cli(ctx, log_level: Optional[str], stdin_jsonl: bool):
+    """Global sequence alignment with the Needleman-Wunsch algorithm"""
+    # Standard output carries results of jobs, so logs go to standard error
+    if stdin_jsonl:
+        handler = configure_logging(log_level or "WARNING", sys.stderr)
+    else:
+        handler = configure_logging(log_level or "DEBUG", sys.stdout)
+    ctx.call_on_close(lambda: logging.getLogger().removeHandler(handler))
+    if not stdin_jsonl:
+        if ctx.invoked_subcommand is None:
+            raise click.UsageError("Missing sequences or command")
+        return
+    if ctx.invoked_subcommand is not None:
+        raise click.UsageError("--stdin-jsonl does not take sequences or a command")
+
+    from global_sequence_alignment.jobs import align_job_lines
+
+    for result_line in align_job_lines(sys.stdin):
+        sys.stdout.write(result_line)
+        # Results are sent as they are ready to a process waiting for them
+        sys.stdout.flush()
+
+
+@cli.command(name="align")
 @click.argument("sequence_1")
 @click.argument("sequence_2")
 @click.option("--scoring_function", default="constant")
-@click.option("--substitution_matrix", default="nucleotide")
+@click.option(
+    "--substitution_matrix",
+    default="nucleotide",
+    callback=parse_substitution_matrix,
+    help="nucleotide, protein, an NCBI matrix like BLOSUM80 or an NCBI matrix file",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(ENGINES),
+    default="python",
+    help="Engine used to fill the scoring matrix",
+)
 @click.option(
     "--direct",
     is_flag=True,
@@ -43,53 +261,711 @@ def write_optimal_alignments_to_file(file_path, alignments):
     is_flag=True,
     help="If set, the scoring matrix is printed to the console",
 )
+@click.option(
+    "--matrix-window",
+    callback=parse_matrix_window,
+    help="Rows and columns of the scoring matrix to print as r0:r1,c0:c1, implies --print_scoring_matrix",
+)
+@click.option(
+    "--save-matrix",
+    help="File to save the filled scoring matrix to, for the inspect command",
+)
+@click.option(
+    "--low-memory",
+    is_flag=True,
+    help="If set, one optimal alignment is found in linear memory with Hirschberg's algorithm",
+)
+@click.option(
+    "--score-only",
+    is_flag=True,
+    help="If set, only the optimal score is computed, without alignments",
+)
+@click.option(
+    "--band",
+    callback=parse_band,
+    help="If set, one optimal alignment is found computing only cells within this distance of the diagonal, 'auto' derives it from the length difference",
+)
+@click.option(
+    "--anchor-k",
+    type=click.IntRange(min=1),
+    help="If set, one alignment is found aligning only chunks between exact matches of k-mers of this length unique in both sequences",
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    help="Number of worker processes aligning chunks between anchors with --anchor-k",
+)
+@click.option(
+    "--verify-anchors",
+    is_flag=True,
+    help="If set, the score of --anchor-k is compared with the optimal score computed without anchors",
+)
+@click.option(
+    "--max-alignments",
+    type=int,
+    help="Maximum number of co-optimal alignments to extract",
+)
+@click.option(
+    "--first-only",
+    is_flag=True,
+    help="If set, only the first optimal alignment is extracted",
+)
 @click.option("--output-path")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="If set, time spent in every phase of the alignment is printed",
+)
+@click.option(
+    "--profile-output",
+    help="File to write the phase breakdown to as JSON",
+)
+@click.option(
+    "--cache-dir",
+    help="Directory where optimal scores and alignments are cached for reuse",
+)
+@click.option(
+    "--threads",
+    type=int,
+    default=1,
+    help="Number of processes filling tiles of the scoring matrix, requires --engine=numpy, the most processes of plans with --engine=auto",
+)
+@click.option(
+    "--max-memory",
+    callback=parse_max_memory,
+    help="Memory budget of plans of --engine=auto like 512M or 4G, available memory by default",
+)
+@click.option(
+    "--checkpoint",
+    help="File where completed rows of the scoring matrix fill are checkpointed",
+)
+@click.option(
+    "--checkpoint-interval",
+    type=float,
+    help="Minimal number of seconds between two checkpoints, a minute by default",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="If set, the fill continues from the rows completed in --checkpoint",
+)
 def main(
     sequence_1: str,
     sequence_2: str,
     scoring_function: str,
-    substitution_matrix: str,
+    substitution_matrix: SubstitutionMatrix,
+    engine: str,
     direct: bool,
     output_path: str,
+    low_memory: bool = False,
+    score_only: bool = False,
+    band: Optional[Union[int, str]] = None,
+    max_alignments: Optional[int] = None,
+    first_only: bool = False,
     print_scoring_matrix: bool = False,
+    profile: bool = False,
+    profile_output: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    threads: int = 1,
+    max_memory: Optional[int] = None,
+    matrix_window: Optional[Tuple[slice, slice]] = None,
+    save_matrix: Optional[str] = None,
+    checkpoint: Optional[str] = None,
+    checkpoint_interval: Optional[float] = None,
+    resume: bool = False,
+    anchor_k: Optional[int] = None,
+    workers: int = 1,
+    verify_anchors: bool = False,
 ) -> None:
     """Run Needleman-Wunsch algorithm"""
+    if resume and not checkpoint:
+        raise click.UsageError("--resume requires --checkpoint")
+    if checkpoint and (score_only or low_memory or band is not None or anchor_k):
+        raise click.UsageError(
+            "--checkpoint requires the full scoring matrix, it is not supported with --score-only, --low-memory, --band and --anchor-k"
+        )
+    if verify_anchors and not anchor_k:
+        raise click.UsageError("--verify-anchors requires --anchor-k")
+    if engine == "striped" and not (score_only or low_memory or band is not None):
+        raise click.UsageError(
+            "--engine=striped requires --score-only, --low-memory or --band"
+        )
+    if scoring_function == "affine":
+        if low_memory or band is not None:
+            raise click.UsageError(
+                "--scoring_function=affine requires the full scoring matrix, it is not supported with --low-memory and --band"
+            )
+        if engine == "numpy":
+            raise click.UsageError(
+                "--scoring_function=affine is not supported by --engine=numpy"
+            )
+        if score_only and engine == "python":
+            # Scores of affine gaps are computed without the full matrix only by the striped engine
+            logging.info("Computing the score with the striped engine")
+            engine = "striped"
+    fill_checkpoint = None
+    if checkpoint:
+        from global_sequence_alignment.checkpoint import (
+            CHECKPOINT_INTERVAL,
+            FillCheckpoint,
+        )
+
+        fill_checkpoint = FillCheckpoint(
+            checkpoint,
+            CHECKPOINT_INTERVAL if checkpoint_interval is None else checkpoint_interval,
+            resume,
+        )
+    phase_timer = PhaseTimer() if profile or profile_output else None
+    try:
+        align_sequences(
+            sequence_1,
+            sequence_2,
+            scoring_function,
+            substitution_matrix,
+            engine,
+            direct,
+            output_path,
+            low_memory,
+            score_only,
+            band,
+            max_alignments,
+            first_only,
+            print_scoring_matrix or matrix_window is not None,
+            phase_timer or NO_INSTRUMENTATION,
+            AlignmentCache(cache_dir) if cache_dir else None,
+            threads,
+            matrix_window,
+            save_matrix,
+            fill_checkpoint,
+            max_memory,
+            anchor_k,
+            workers,
+            verify_anchors,
+        )
+    except MemoryBudgetError as error:
+        raise click.ClickException(str(error)) from None
+    if phase_timer is None:
+        return
+
+    if profile:
+        print("\n")
+        print(phase_timer.format_report())
+    if profile_output:
+        with open(profile_output, "w") as f:
+            json.dump(phase_timer.get_report(), f, indent=2)
+            f.write("\n")
+
+
+def align_sequences(
+    sequence_1: str,
+    sequence_2: str,
+    scoring_function: str,
+    substitution_matrix: SubstitutionMatrix,
+    engine: str,
+    direct: bool,
+    output_path: str,
+    low_memory: bool,
+    score_only: bool,
+    band: Optional[Union[int, str]],
+    max_alignments: Optional[int],
+    first_only: bool,
+    print_scoring_matrix: bool,
+    instrumentation: Instrumentation,
+    cache: Optional[AlignmentCache],
+    threads: int,
+    matrix_window: Optional[Tuple[slice, slice]] = None,
+    save_matrix: Optional[str] = None,
+    checkpoint: Optional["FillCheckpoint"] = None,
+    max_memory: Optional[int] = None,
+    anchor_k: Optional[int] = None,
+    workers: int = 1,
+    verify_anchors: bool = False,
+) -> None:
     if not direct:
-        logging.info(f"Reading {sequence_1}")
-        sequence_1 = read_fasta_file(sequence_1)
-        logging.info(f"Length: {len(sequence_1)}")
-        logging.info(f"Reading {sequence_2}")
-        sequence_2 = read_fasta_file(sequence_2)
-        logging.info(f"Length: {len(sequence_2)}")
+        with instrumentation.phase("read"):
+            logging.info(f"Reading {sequence_1}")
+            sequence_1 = read_fasta_file(sequence_1)
+            logging.info(f"Length: {len(sequence_1)}")
+            logging.info(f"Reading {sequence_2}")
+            sequence_2 = read_fasta_file(sequence_2)
+            logging.info(f"Length: {len(sequence_2)}")
     logging.info("Sequences loaded")
 
     # Execute Needleman-Wunsch algorithm
-    needleman_wunsch = NeedlemanWunsch(scoring_function, substitution_matrix)
-    alignments, optimal_score, scoring_matrix = needleman_wunsch.align(
-        sequence_1, sequence_2
+    needleman_wunsch = NeedlemanWunsch(
+        scoring_function,
+        substitution_matrix,
+        engine,
+        instrumentation,
+        cache,
+        threads,
+        checkpoint,
+        max_memory,
     )
+    if score_only:
+        optimal_score = needleman_wunsch.score(sequence_1, sequence_2)
+        print("\n")
+        print(f"Optimal score: {optimal_score}")
+        if cache is not None:
+            logging.info(cache.format_stats())
+        return
+
+    if anchor_k:
+        alignment, optimal_score = needleman_wunsch.align_anchored(
+            sequence_1, sequence_2, anchor_k, workers, verify_anchors
+        )
+        alignments, scoring_matrix = [alignment], None
+    elif band is not None:
+        alignment, optimal_score = needleman_wunsch.align_banded(
+            sequence_1, sequence_2, None if band == "auto" else band
+        )
+        alignments, scoring_matrix = [alignment], None
+    elif low_memory:
+        alignment, optimal_score = needleman_wunsch.align_linear_space(
+            sequence_1, sequence_2
+        )
+        alignments, scoring_matrix = [alignment], None
+    elif cache is not None or engine == "auto":
+        # Cached and planned results are complete lists, so alignments are not streamed
+        alignments, optimal_score, scoring_matrix = needleman_wunsch.align(
+            sequence_1, sequence_2, max_alignments, first_only
+        )
+        if cache is not None:
+            logging.info(cache.format_stats())
+    else:
+        scoring_matrix = needleman_wunsch.build_scoring_matrix(sequence_1, sequence_2)
+        optimal_score = scoring_matrix.get_optimal_score()
+        # Alignments are extracted lazily while they are written out
+        alignments = scoring_matrix.iter_alignments(max_alignments, first_only)
+
+    if save_matrix:
+        if scoring_matrix is None:
+            logging.warning(
+                "Scoring matrix is not available in low memory, banded and anchored modes and for cached results, not saved"
+            )
+        else:
+            with instrumentation.phase("serialization"):
+                scoring_matrix.save(save_matrix)
+            logging.info(f"Saved scoring matrix to {save_matrix}")
+
+    print_results(
+        optimal_score,
+        alignments,
+        scoring_matrix,
+        output_path,
+        print_scoring_matrix,
+        matrix_window,
+        instrumentation,
+    )
+
 
+def print_results(
+    optimal_score: int,
+    alignments: Iterable[Alignment],
+    scoring_matrix: Optional[ScoringMatrix],
+    output_path: Optional[str],
+    print_scoring_matrix: bool,
+    matrix_window: Optional[Tuple[slice, slice]],
+    instrumentation: Instrumentation,
+) -> None:
     # Print optimal score
     print("\n")
     print(f"Optimal score: {optimal_score}")
 
     # Print optimal alignments
+    with instrumentation.phase("serialization"):
+        if output_path:
+            alignments_written = write_optimal_alignments_to_file(
+                output_path, alignments
+            )
+            logging.info(f"Written {alignments_written} alignments to {output_path}")
+        else:
+            print("\n")
+            print("Optimal alignments:")
+            for alignment_idx, alignment in enumerate(alignments):
+                print("Found alignment #{}:".format(alignment_idx + 1))
+                print(alignment)
+                print("\n")
+
+        # Print scoring matrix
+        print("\n")
+        print("Scoring and traceback matrix:")
+        if print_scoring_matrix:
+            if scoring_matrix is None:
+                print(
+                    "Not available in low memory, banded and anchored modes and for cached results"
+                )
+            elif matrix_window is not None:
+                print(scoring_matrix.render(*matrix_window))
+            else:
+                print(scoring_matrix)
+
+
+@cli.command()
+@click.argument("matrix_file")
+@click.option(
+    "--print_scoring_matrix",
+    is_flag=True,
+    help="If set, the scoring matrix is printed to the console",
+)
+@click.option(
+    "--matrix-window",
+    callback=parse_matrix_window,
+    help="Rows and columns of the scoring matrix to print as r0:r1,c0:c1, implies --print_scoring_matrix",
+)
+@click.option(
+    "--max-alignments",
+    type=int,
+    help="Maximum number of co-optimal alignments to extract",
+)
+@click.option(
+    "--first-only",
+    is_flag=True,
+    help="If set, only the first optimal alignment is extracted",
+)
+@click.option("--output-path")
+def inspect(
+    matrix_file: str,
+    print_scoring_matrix: bool,
+    matrix_window: Optional[Tuple[slice, slice]],
+    max_alignments: Optional[int],
+    first_only: bool,
+    output_path: Optional[str],
+) -> None:
+    """Traceback and print scoring matrix saved with --save-matrix
+
+    The file is mapped into memory, so only the cells traceback and printing
+    touch are read and nothing is filled again.
+    """
+    scoring_matrix = ScoringMatrix.load(matrix_file)
+    logging.info(f"Loaded scoring matrix from {matrix_file}")
+    print_results(
+        scoring_matrix.get_optimal_score(),
+        scoring_matrix.iter_alignments(max_alignments, first_only),
+        scoring_matrix,
+        output_path,
+        print_scoring_matrix or matrix_window is not None,
+        matrix_window,
+        NO_INSTRUMENTATION,
+    )
+
+
+@cli.command()
+@click.argument("fasta_files", nargs=-1)
+@click.option(
+    "--manifest",
+    help="File with a pair of FASTA file paths per line, aligned instead of all pairs of FASTA_FILES",
+)
+@click.option("--scoring_function", default="constant")
+@click.option(
+    "--substitution_matrix",
+    default="nucleotide",
+    callback=parse_substitution_matrix,
+    help="nucleotide, protein, an NCBI matrix like BLOSUM80 or an NCBI matrix file",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(ENGINES),
+    default="python",
+    help="Engine used to fill the scoring matrix",
+)
+@click.option("--workers", type=int, default=1, help="Number of worker processes")
+@click.option(
+    "--max-alignments",
+    type=int,
+    help="Maximum number of co-optimal alignments to extract per pair",
+)
+@click.option(
+    "--first-only",
+    is_flag=True,
+    help="If set, only the first optimal alignment is extracted per pair",
+)
+@click.option(
+    "--score-only",
+    is_flag=True,
+    help="If set, only optimal scores are computed, without alignment files",
+)
+@click.option(
+    "--cache-dir",
+    help="Directory where optimal scores and alignments are cached for reuse",
+)
+@click.option("--output-dir", required=True)
+def batch(
+    fasta_files: Tuple[str, ...],
+    manifest: Optional[str],
+    scoring_function: str,
+    substitution_matrix: SubstitutionMatrix,
+    engine: str,
+    workers: int,
+    max_alignments: Optional[int],
+    first_only: bool,
+    score_only: bool,
+    output_dir: str,
+    cache_dir: Optional[str] = None,
+) -> None:
+    """Align all pairs of sequences from FASTA files in a process pool
+
+    Every record of the files is a sequence. With a manifest, every record of
+    the first file of a pair is aligned with every record of the second one.
+    """
+    file_pairs = read_manifest(manifest) if manifest else []
+    file_paths = (
+        list(itertools.chain.from_iterable(file_pairs)) if manifest else fasta_files
+    )
+
+    sequences: Dict[str, str] = {}
+    names_by_file: Dict[str, List[str]] = {}
+    for file_path in file_paths:
+        if file_path in names_by_file:
+            continue
+        logging.info(f"Reading {file_path}")
+        names_by_file[file_path] = []
+        for name, sequence in read_fasta_sequences(file_path):
+            if name in sequences:
+                raise click.BadParameter(f"Duplicate sequence name {name}")
+            sequences[name] = sequence
+            names_by_file[file_path].append(name)
+
+    if manifest:
+        pairs = [
+            pair
+            for path_1, path_2 in file_pairs
+            for pair in itertools.product(names_by_file[path_1], names_by_file[path_2])
+        ]
+    else:
+        pairs = list(itertools.combinations(sequences, 2))
+    logging.info(f"Sequences loaded, aligning {len(pairs)} pairs")
+
+    os.makedirs(output_dir, exist_ok=True)
+    cache = AlignmentCache(cache_dir) if cache_dir else None
+    needleman_wunsch = NeedlemanWunsch(
+        scoring_function, substitution_matrix, engine, cache=cache
+    )
+    results = needleman_wunsch.align_many(
+        ((sequences[name_1], sequences[name_2]) for name_1, name_2 in pairs),
+        workers=workers,
+        max_alignments=max_alignments,
+        first_only=first_only,
+        score_only=score_only,
+    )
+
+    # Results are written as soon as each pair is finished
+    scores: Dict[Tuple[str, str], int] = {}
+    with open(os.path.join(output_dir, "scores.tsv"), "w") as scores_file:
+        scores_file.write("sequence_1\tsequence_2\toptimal_score\n")
+        for pair_index, alignments, optimal_score in results:
+            name_1, name_2 = pairs[pair_index]
+            logging.info(f"Aligned {name_1} and {name_2} with score {optimal_score}")
+            scores[(name_1, name_2)] = optimal_score
+            scores_file.write(f"{name_1}\t{name_2}\t{optimal_score}\n")
+            scores_file.flush()
+            if not score_only:
+                write_optimal_alignments_to_file(
+                    os.path.join(output_dir, f"{name_1}_{name_2}.txt"), alignments
+                )
+
+    write_score_matrix(
+        os.path.join(output_dir, "score_matrix.tsv"), list(sequences), scores
+    )
+    if cache is not None:
+        logging.info(cache.format_stats())
+
+
+@cli.command()
+@click.argument("query")
+@click.argument("target_files", nargs=-1, required=True)
+@click.option("--scoring_function", default="constant")
+@click.option(
+    "--substitution_matrix",
+    default="nucleotide",
+    callback=parse_substitution_matrix,
+    help="nucleotide, protein, an NCBI matrix like BLOSUM80 or an NCBI matrix file",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(ENGINES),
+    default="python",
+    help="Engine used to fill the scoring matrix",
+)
+@click.option("--top", type=int, help="Number of best targets to keep in the table")
+@click.option("--output-path", help="File to write the table to instead of the console")
+def search(
+    query: str,
+    target_files: Tuple[str, ...],
+    scoring_function: str,
+    substitution_matrix: SubstitutionMatrix,
+    engine: str,
+    top: Optional[int],
+    output_path: Optional[str],
+) -> None:
+    """Rank targets from FASTA files by optimal score of aligning QUERY with them
+
+    The first record of the QUERY file is prepared once and every record of
+    the target files is read and scored one by one. The table of ranks,
+    target names and scores is written as TSV from the best target.
+    """
+    logging.info(f"Reading {query}")
+    needleman_wunsch = NeedlemanWunsch(scoring_function, substitution_matrix, engine)
+    prepared_query = needleman_wunsch.prepare(read_fasta_file(query))
+    targets = itertools.chain.from_iterable(
+        iter_fasta_sequences(file_path) for file_path in target_files
+    )
+    ranking = prepared_query.rank(targets, top)
+
+    lines = ["rank\ttarget\toptimal_score"]
+    for rank, (name, optimal_score) in enumerate(ranking, start=1):
+        lines.append(f"{rank}\t{name}\t{optimal_score}")
     if output_path:
-        write_optimal_alignments_to_file(output_path, alignments)
+        with open(output_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        logging.info(f"Written {len(ranking)} ranked targets to {output_path}")
     else:
-        print("\n")
-        print("Optimal alignments:")
-        for alignment_idx, alignment in enumerate(alignments):
-            print("Found alignment #{}:".format(alignment_idx + 1))
-            print(alignment)
-            print("\n")
+        print("\n".join(lines))
 
-    # Print scoring matrix
-    print("\n")
-    print("Scoring and traceback matrix:")
-    if print_scoring_matrix:
-        print(scoring_matrix)
+
+@cli.command()
+@click.argument("fasta_files", nargs=-1, required=True)
+@click.option("--scoring_function", default="constant")
+@click.option(
+    "--substitution_matrix",
+    default="nucleotide",
+    callback=parse_substitution_matrix,
+    help="nucleotide, protein, an NCBI matrix like BLOSUM80 or an NCBI matrix file",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(ENGINES),
+    default="python",
+    help="Engine computing optimal scores of pairs for the guide tree",
+)
+@click.option(
+    "--guide-tree",
+    type=click.Choice(["upgma", "nj"]),
+    default="upgma",
+    help="Guide tree built by UPGMA or neighbor joining",
+)
+@click.option("--workers", type=int, default=1, help="Number of worker processes")
+@click.option(
+    "--max-memory",
+    callback=parse_max_memory,
+    help="Memory budget of a scoring matrix of profiles like 512M or 4G, over it profiles are aligned in linear space",
+)
+@click.option(
+    "--cache-dir",
+    help="Directory where optimal scores of pairs are cached for reuse",
+)
+@click.option(
+    "--output-path", help="File to write aligned FASTA to instead of the console"
+)
+def msa(
+    fasta_files: Tuple[str, ...],
+    scoring_function: str,
+    substitution_matrix: SubstitutionMatrix,
+    engine: str,
+    guide_tree: str,
+    workers: int,
+    max_memory: Optional[int],
+    cache_dir: Optional[str],
+    output_path: Optional[str],
+) -> None:
+    """Align all sequences from FASTA files progressively into one alignment
+
+    Optimal scores of all pairs, computed in a process pool, give a guide
+    tree along which profiles of the sequences are aligned. The alignment is
+    written as aligned FASTA in the order of the sequences.
+    """
+    sequences: Dict[str, str] = {}
+    for file_path in fasta_files:
+        logging.info(f"Reading {file_path}")
+        for name, sequence in read_fasta_sequences(file_path):
+            if name in sequences:
+                raise click.BadParameter(f"Duplicate sequence name {name}")
+            sequences[name] = sequence
+
+    cache = AlignmentCache(cache_dir) if cache_dir else None
+    needleman_wunsch = NeedlemanWunsch(
+        scoring_function, substitution_matrix, engine, cache=cache
+    )
+    names = list(sequences)
+    try:
+        rows, merges = needleman_wunsch.align_multiple(
+            list(sequences.values()), guide_tree, workers, max_memory
+        )
+    except ValueError as error:
+        raise click.ClickException(str(error)) from None
+    from global_sequence_alignment.msa import format_newick
+
+    logging.info(f"Guide tree {format_newick(merges, names)}")
+    if output_path:
+        with open(output_path, "w") as f:
+            write_aligned_fasta(f, names, rows)
+        logging.info(f"Written alignment of {len(rows)} sequences to {output_path}")
+    else:
+        write_aligned_fasta(sys.stdout, names, rows)
+    if cache is not None:
+        logging.info(cache.format_stats())
+
+
+@cli.command()
+@click.option("--socket", "socket_path", help="Unix socket path to listen on")
+@click.option("--host", default="127.0.0.1", help="Host to listen on without --socket")
+@click.option(
+    "--port", type=int, help="Port to listen on without --socket, 8765 by default"
+)
+@click.option("--workers", type=int, default=1, help="Number of worker processes")
+@click.option(
+    "--max-pending",
+    type=int,
+    help="Maximum number of jobs waiting for results, twice the workers by default",
+)
+@click.option(
+    "--max-alignments",
+    type=click.IntRange(min=1),
+    help="Maximum number of co-optimal alignments of a job, also given to jobs without max_alignments, 100 by default",
+)
+@click.option(
+    "--max-sequence-length",
+    type=click.IntRange(min=1),
+    help="Maximum length of sequences of a job, 1048576 by default",
+)
+def serve(
+    socket_path: Optional[str],
+    host: str,
+    port: Optional[int],
+    workers: int,
+    max_pending: Optional[int],
+    max_alignments: Optional[int],
+    max_sequence_length: Optional[int],
+) -> None:
+    """Serve alignments of JSON jobs sent one per line
+
+    A job has sequence_1 and sequence_2 and optionally id, scoring_function,
+    substitution_matrix, engine, max_alignments, first_only and score_only.
+    Its result has the id, score and alignments, or an error.
+    """
+
+    import asyncio
+
+    from global_sequence_alignment.jobs import (
+        MAX_JOB_ALIGNMENTS,
+        MAX_JOB_SEQUENCE_LENGTH,
+    )
+    from global_sequence_alignment.server import DEFAULT_PORT, AlignmentServer
+
+    async def run_server():
+        async with AlignmentServer(
+            workers,
+            max_pending,
+            max_alignments=max_alignments or MAX_JOB_ALIGNMENTS,
+            max_sequence_length=max_sequence_length or MAX_JOB_SEQUENCE_LENGTH,
+        ) as server:
+            await server.serve(
+                socket_path, host, DEFAULT_PORT if port is None else port
+            )
+
+    asyncio.run(run_server())
 
 
 if __name__ == "__main__":
-    main()
+    cli()
@@ -0,0 +1,13 @@
+def mutate(random_generator, sequence, mutations):
+    """Substitute, insert or delete symbols at random positions of sequence"""
+    symbols = list(sequence)
+    for _ in range(mutations):
+        position = random_generator.randrange(len(symbols))
+        operation = random_generator.choice(["substitute", "insert", "delete"])
+        if operation == "substitute":
+            symbols[position] = random_generator.choice("ACGT")
+        elif operation == "insert":
+            symbols.insert(position, random_generator.choice("ACGT"))
+        elif len(symbols) > 1:
+            del symbols[position]
+    return "".join(symbols)
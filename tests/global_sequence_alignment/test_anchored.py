@@ -0,0 +1,134 @@
+import random
+from unittest import TestCase
+
+from global_sequence_alignment.anchored import (
+    chain_anchors,
+    find_anchors,
+    join_operations,
+    merge_anchors,
+    verify_score,
+)
+from global_sequence_alignment.needleman_wunsch import NeedlemanWunsch
+from tests.global_sequence_alignment.helpers import mutate
+
+
+def get_alignment_score(needleman_wunsch, alignment):
+    """Score an alignment symbol by symbol, gaps by their length"""
+    substitution_matrix = needleman_wunsch.substitution_matrix
+    score = 0
+    for symbol_1, symbol_2 in zip(alignment.sequence_1, alignment.sequence_2):
+        if "-" not in (symbol_1, symbol_2):
+            score += substitution_matrix.get_score(symbol_1, symbol_2)
+    for row in [alignment.sequence_1, alignment.sequence_2]:
+        gap_length = 0
+        for symbol in row + " ":
+            if symbol == "-":
+                gap_length += 1
+            elif gap_length:
+                score += needleman_wunsch.scoring_function.score(gap_length)
+                gap_length = 0
+    return score
+
+
+class TestAnchors(TestCase):
+    def test_only_unique_kmers_are_anchors(self):
+        anchors = find_anchors("GATTACAGATT", "TTACAGGATT", 4)
+
+        # GATT occurs twice in sequence_1
+        self.assertEqual(anchors, [(2, 0), (3, 1), (4, 2)])
+
+    def test_chain_increasing_in_both_sequences(self):
+        chain = chain_anchors([(0, 5), (1, 1), (2, 2), (3, 0), (4, 4)])
+
+        self.assertEqual(chain, [(1, 1), (2, 2), (4, 4)])
+        self.assertEqual(chain_anchors([]), [])
+
+    def test_merging_overlapping_kmers(self):
+        segments = merge_anchors([(0, 0), (1, 1), (2, 2), (3, 5), (10, 12)], 3)
+
+        self.assertEqual(segments, [(0, 0, 5), (10, 12, 3)])
+
+    def test_joining_operations(self):
+        operations = join_operations([((2, "M"),), (), ((1, "M"), (3, "I"))])
+
+        self.assertEqual(operations, ((3, "M"), (3, "I")))
+
+
+class TestAlignAnchored(TestCase):
+    def setUp(self):
+        random_generator = random.Random(0)
+        self.sequence_1 = "".join(random_generator.choices("ACGT", k=2000))
+        self.sequence_2 = mutate(random_generator, self.sequence_1, 40)
+
+    def test_alignment_of_similar_sequences_is_optimal(self):
+        for scoring_function in ["linear", "affine"]:
+            needleman_wunsch = NeedlemanWunsch(scoring_function, "nucleotide")
+
+            alignment, score = needleman_wunsch.align_anchored(
+                self.sequence_1, self.sequence_2
+            )
+
+            with self.subTest(scoring_function=scoring_function):
+                self.assertEqual(alignment.sequence_1.replace("-", ""), self.sequence_1)
+                self.assertEqual(alignment.sequence_2.replace("-", ""), self.sequence_2)
+                self.assertEqual(
+                    get_alignment_score(needleman_wunsch, alignment), score
+                )
+                self.assertEqual(
+                    score,
+                    NeedlemanWunsch(scoring_function, "nucleotide", "auto").score(
+                        self.sequence_1, self.sequence_2
+                    ),
+                )
+
+    def test_workers_give_the_same_alignment(self):
+        needleman_wunsch = NeedlemanWunsch("linear", "nucleotide")
+
+        results = [
+            needleman_wunsch.align_anchored(
+                self.sequence_1, self.sequence_2, workers=workers
+            )
+            for workers in [1, 2]
+        ]
+
+        self.assertEqual(results[0][1], results[1][1])
+        self.assertEqual(results[0][0].operations, results[1][0].operations)
+
+    def test_without_anchors_the_whole_pair_is_one_chunk(self):
+        needleman_wunsch = NeedlemanWunsch()
+
+        alignment, score = needleman_wunsch.align_anchored("GATTACA", "GCATGCT")
+
+        self.assertEqual(score, needleman_wunsch.score("GATTACA", "GCATGCT"))
+        self.assertEqual(alignment.sequence_1.replace("-", ""), "GATTACA")
+
+    def test_verify_warns_about_suboptimal_score(self):
+        needleman_wunsch = NeedlemanWunsch("linear", "nucleotide")
+        # The only anchor forces a misalignment of the repeated halves
+        sequence_1 = "ACGT" + "TTTTGGGG" * 4
+        sequence_2 = "TTTTGGGG" * 4 + "ACGT"
+
+        with self.assertLogs(level="WARNING"):
+            _, score = needleman_wunsch.align_anchored(
+                sequence_1, sequence_2, kmer_length=4, verify=True
+            )
+        with self.assertLogs(level="INFO") as logs:
+            needleman_wunsch.align_anchored(
+                self.sequence_1, self.sequence_2, verify=True
+            )
+
+        self.assertLess(score, needleman_wunsch.score(sequence_1, sequence_2))
+        self.assertIn("is the optimal score", logs.output[-1])
+
+    def test_score_above_optimal_score_is_an_error(self):
+        needleman_wunsch = NeedlemanWunsch()
+        optimal_score = needleman_wunsch.score("GATTACA", "GCATGCT")
+
+        with self.assertRaises(ValueError):
+            verify_score(needleman_wunsch, "GATTACA", "GCATGCT", optimal_score + 1)
+
+    def test_kmer_length_has_to_be_positive(self):
+        for kmer_length in [0, -1]:
+            with self.subTest(kmer_length=kmer_length):
+                with self.assertRaises(ValueError):
+                    NeedlemanWunsch().align_anchored("GATTACA", "GCATGCT", kmer_length)
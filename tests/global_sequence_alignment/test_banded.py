@@ -0,0 +1,99 @@
+import random
+from unittest import TestCase
+
+from global_sequence_alignment.banded import (
+    BandedScoringMatrix,
+    BandLimitError,
+    align_banded,
+)
+from global_sequence_alignment.needleman_wunsch import (
+    ConstantGapPenalty,
+    NeedlemanWunsch,
+    NucleotideSubstitutionMatrix,
+)
+from tests.global_sequence_alignment.helpers import mutate
+
+
+class TestBandedScoringMatrix(TestCase):
+    def test_allocating_only_cells_within_band(self):
+        banded_matrix = BandedScoringMatrix(
+            "GATTACA" * 10,
+            "GATTACA" * 10,
+            ConstantGapPenalty(),
+            NucleotideSubstitutionMatrix(),
+            band=3,
+        )
+
+        self.assertEqual(len(banded_matrix.traceback_flags), 71 * 7)
+
+    def test_band_reaches_bottom_right_corner(self):
+        banded_matrix = BandedScoringMatrix(
+            "GATTACA",
+            "GA",
+            ConstantGapPenalty(),
+            NucleotideSubstitutionMatrix(),
+            band=1,
+        )
+
+        banded_matrix.fill()
+
+        self.assertEqual(banded_matrix.band, 5)
+        self.assertEqual(banded_matrix.optimal_score, -3)
+
+
+class TestAlignBanded(TestCase):
+    def assert_optimal_alignment(self, sequence_1, sequence_2, band=None):
+        needleman_wunsch = NeedlemanWunsch()
+
+        alignment, optimal_score = needleman_wunsch.align_banded(
+            sequence_1, sequence_2, band
+        )
+
+        self.assertEqual(optimal_score, needleman_wunsch.score(sequence_1, sequence_2))
+        self.assertEqual(alignment.sequence_1.replace("-", ""), sequence_1)
+        self.assertEqual(alignment.sequence_2.replace("-", ""), sequence_2)
+
+    def test_same_alignment_as_full_matrix(self):
+        needleman_wunsch = NeedlemanWunsch()
+        alignments, optimal_score, _ = needleman_wunsch.align("GATTACA", "GTCGACGCA")
+
+        alignment, banded_score = needleman_wunsch.align_banded(
+            "GATTACA", "GTCGACGCA", band=2
+        )
+
+        self.assertEqual(banded_score, optimal_score)
+        self.assertEqual(alignment, alignments[0])
+
+    def test_empty_sequences(self):
+        self.assert_optimal_alignment("", "")
+        self.assert_optimal_alignment("GA", "")
+
+    def test_optimal_for_similar_sequences(self):
+        random_generator = random.Random(0)
+        for _ in range(20):
+            sequence_1 = "".join(random_generator.choices("ACGT", k=60))
+            sequence_2 = mutate(random_generator, sequence_1, 6)
+            self.assert_optimal_alignment(sequence_1, sequence_2, band=2)
+            self.assert_optimal_alignment(sequence_1, sequence_2)
+
+    def test_band_is_doubled_when_optimal_path_leaves_it(self):
+        # The optimal path shifts 8 diagonals away and comes back
+        sequence_1 = "TTTTTTTT" + "GATTACA" * 6
+        sequence_2 = "GATTACA" * 6 + "CCCCCCCC"
+
+        self.assert_optimal_alignment(sequence_1, sequence_2, band=0)
+
+    def test_band_is_not_doubled_over_max_cells(self):
+        sequence_1 = "TTTTTTTT" + "GATTACA" * 6
+        sequence_2 = "GATTACA" * 6 + "CCCCCCCC"
+        rows = len(sequence_2) + 1
+
+        with self.assertRaises(BandLimitError):
+            align_banded(
+                sequence_1,
+                sequence_2,
+                ConstantGapPenalty(),
+                NucleotideSubstitutionMatrix(),
+                band=1,
+                max_cells=rows * 3,
+            )
@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+from global_sequence_alignment.cache import AlignmentCache
+from global_sequence_alignment.needleman_wunsch import Alignment, NeedlemanWunsch
+
+PAIRS = [("GATTACA", "GTCGACGCA"), ("ATC", "ATC"), ("GA", "G"), ("", "")]
+
+
+class TestAlignMany(TestCase):
+    def assert_same_as_aligning_one_by_one(self, workers):
+        needleman_wunsch = NeedlemanWunsch()
+
+        results = needleman_wunsch.align_many(PAIRS, workers=workers)
+
+        results_by_pair = {
+            pair_index: (alignments, optimal_score)
+            for pair_index, alignments, optimal_score in results
+        }
+        self.assertEqual(len(results_by_pair), len(PAIRS))
+        for pair_index, (sequence_1, sequence_2) in enumerate(PAIRS):
+            alignments, optimal_score, _ = needleman_wunsch.align(
+                sequence_1, sequence_2
+            )
+            self.assertEqual(results_by_pair[pair_index], (alignments, optimal_score))
+
+    def test_aligning_in_process(self):
+        self.assert_same_as_aligning_one_by_one(workers=1)
+
+    def test_aligning_in_process_pool(self):
+        self.assert_same_as_aligning_one_by_one(workers=2)
+
+    def test_aligning_first_only(self):
+        results = list(NeedlemanWunsch().align_many(PAIRS[:1], first_only=True))
+
+        self.assertEqual(results, [(0, [Alignment("GAT-TA--CA", "G-TCGACGCA")], 0)])
+
+    def test_scoring_only(self):
+        results = NeedlemanWunsch().align_many(PAIRS, workers=2, score_only=True)
+
+        self.assertEqual(
+            sorted(results), [(0, [], 0), (1, [], 3), (2, [], 0), (3, [], 0)]
+        )
+
+    def test_cached_pairs_not_submitted_to_pool(self):
+        cache = AlignmentCache()
+        needleman_wunsch = NeedlemanWunsch(cache=cache)
+        first_results = sorted(needleman_wunsch.align_many(PAIRS, workers=2))
+
+        second_results = sorted(needleman_wunsch.align_many(PAIRS, workers=2))
+
+        self.assertEqual(second_results, first_results)
+        self.assertEqual(cache.get_stats()["memory_hits"], len(PAIRS))
+        self.assertEqual(cache.get_stats()["misses"], len(PAIRS))
@@ -0,0 +1,95 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from global_sequence_alignment.cache import AlignmentCache
+from global_sequence_alignment.needleman_wunsch import NeedlemanWunsch
+
+
+class TestAlignmentCache(TestCase):
+    def test_align_reuses_cached_result(self):
+        cache = AlignmentCache()
+        needleman_wunsch = NeedlemanWunsch(cache=cache)
+
+        alignments, optimal_score, _ = needleman_wunsch.align("GATTACA", "GCATGCT")
+        cached_alignments, cached_score, scoring_matrix = needleman_wunsch.align(
+            "GATTACA", "GCATGCT"
+        )
+
+        self.assertEqual(cached_alignments, alignments)
+        self.assertEqual(cached_score, optimal_score)
+        self.assertIsNone(scoring_matrix)
+        self.assertEqual(cache.get_stats()["memory_hits"], 1)
+        self.assertEqual(cache.get_stats()["misses"], 1)
+
+    def test_planned_alignments_are_cached(self):
+        sequence_1 = "GATTACA" * 40
+        sequence_2 = "GCATGCT" * 40
+        for max_memory in [2**16, None]:
+            cache = AlignmentCache()
+            needleman_wunsch = NeedlemanWunsch(
+                engine="auto", cache=cache, max_memory=max_memory
+            )
+
+            alignments, optimal_score, _ = needleman_wunsch.align(
+                sequence_1, sequence_2, first_only=True
+            )
+            cached_alignments, cached_score, scoring_matrix = needleman_wunsch.align(
+                sequence_1, sequence_2, first_only=True
+            )
+
+            with self.subTest(max_memory=max_memory):
+                self.assertEqual(cached_alignments, alignments)
+                self.assertEqual(cached_score, optimal_score)
+                self.assertIsNone(scoring_matrix)
+                self.assertEqual(cache.get_stats()["memory_hits"], 1)
+                self.assertEqual(cache.get_stats()["misses"], 1)
+
+    def test_key_depends_on_configuration(self):
+        cache = AlignmentCache()
+        constant = NeedlemanWunsch("constant", cache=cache)
+        linear = NeedlemanWunsch("linear", cache=cache)
+
+        self.assertNotEqual(
+            cache.make_key(constant, "GA", "G"), cache.make_key(linear, "GA", "G")
+        )
+        self.assertNotEqual(
+            cache.make_key(constant, "GA", "G"),
+            cache.make_key(constant, "GA", "G", score_only=True),
+        )
+        self.assertNotEqual(
+            cache.make_key(constant, "GA", "G"), cache.make_key(constant, "G", "AG")
+        )
+
+    def test_score_reused_from_disk(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            NeedlemanWunsch(cache=AlignmentCache(cache_dir)).score("GATTACA", "GCA")
+            cache = AlignmentCache(cache_dir)
+
+            optimal_score = NeedlemanWunsch(cache=cache).score("GATTACA", "GCA")
+
+        self.assertEqual(optimal_score, NeedlemanWunsch().score("GATTACA", "GCA"))
+        self.assertEqual(cache.get_stats()["disk_hits"], 1)
+
+    def test_memory_tier_evicts_least_recently_used(self):
+        cache = AlignmentCache(memory_entries=2)
+        for key in ["a", "b", "c"]:
+            cache.store(key, [], 0)
+            if key == "b":
+                cache.load("a", "", "")
+
+        self.assertEqual(list(cache.memory), ["a", "c"])
+
+    def test_disk_tier_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = AlignmentCache(cache_dir, memory_entries=0)
+            cache.store("aa", [], 0)
+            entry_bytes = cache.disk_bytes
+            cache.max_disk_bytes = entry_bytes * 2
+            os.utime(cache._get_file_path("aa"), (0, 0))
+            cache.store("bb", [], 0)
+            cache.store("cc", [], 0)
+
+            self.assertIsNone(cache.load("aa", "", ""))
+            self.assertIsNotNone(cache.load("cc", "", ""))
+            self.assertLessEqual(cache.disk_bytes, entry_bytes * 2)
@@ -0,0 +1,137 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from global_sequence_alignment.checkpoint import FillCheckpoint
+from global_sequence_alignment.needleman_wunsch import (
+    AffineGapPenalty,
+    AffineScoringMatrix,
+    ConstantGapPenalty,
+    NeedlemanWunsch,
+    NucleotideSubstitutionMatrix,
+    ScoringMatrix,
+)
+
+SEQUENCE_1 = "GATTACAGATTACACCGT"
+SEQUENCE_2 = "GCATGCTTACAGGATC"
+
+
+class Interrupted(Exception):
+    pass
+
+
+class InterruptedCheckpoint(FillCheckpoint):
+    """Checkpoint of every row stopping the fill after writing a given row"""
+
+    def __init__(self, file_path: str, interrupted_row: int):
+        super().__init__(file_path, interval=0)
+        self.interrupted_row = interrupted_row
+
+    def write(self, row, frontier=None):
+        super().write(row, frontier)
+        if row == self.interrupted_row:
+            self.file.close()
+            raise Interrupted
+
+
+class TestFillCheckpoint(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, "fill.checkpoint")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_scoring_matrix(self, engine, affine, checkpoint):
+        if affine:
+            return AffineScoringMatrix(
+                SEQUENCE_1,
+                SEQUENCE_2,
+                AffineGapPenalty(-3, -1),
+                NucleotideSubstitutionMatrix(),
+                checkpoint=checkpoint,
+            )
+        return ScoringMatrix(
+            SEQUENCE_1,
+            SEQUENCE_2,
+            ConstantGapPenalty(-2),
+            NucleotideSubstitutionMatrix(),
+            engine=engine,
+            checkpoint=checkpoint,
+        )
+
+    def assert_resumed_fill_is_identical(self, engine="python", affine=False):
+        expected = self.make_scoring_matrix(engine, affine, None)
+        expected.fill()
+
+        interrupted = self.make_scoring_matrix(
+            engine, affine, InterruptedCheckpoint(self.file_path, 7)
+        )
+        with self.assertRaises(Interrupted):
+            interrupted.fill()
+
+        resumed = self.make_scoring_matrix(
+            engine, affine, FillCheckpoint(self.file_path, resume=True)
+        )
+        resumed.fill()
+
+        # Rows were restored up to the interrupted one and none written since
+        self.assertEqual(resumed.checkpoint.rows_written, 7)
+        self.assertEqual(str(resumed), str(expected))
+        self.assertEqual(resumed.get_alignments(), expected.get_alignments())
+        self.assertEqual(resumed.get_optimal_score(), expected.get_optimal_score())
+        self.assertFalse(os.path.exists(self.file_path))
+
+    def test_python_engine(self):
+        self.assert_resumed_fill_is_identical("python")
+
+    def test_numpy_engine(self):
+        self.assert_resumed_fill_is_identical("numpy")
+
+    def test_affine_layers(self):
+        self.assert_resumed_fill_is_identical(affine=True)
+
+    def test_corrupted_slot_falls_back_to_previous_checkpoint(self):
+        interrupted = self.make_scoring_matrix(
+            "python", False, InterruptedCheckpoint(self.file_path, 6)
+        )
+        with self.assertRaises(Interrupted):
+            interrupted.fill()
+        # Row 6 was recorded in the second slot, the last bytes of the file
+        with open(self.file_path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b"\xff")
+
+        checkpoint = FillCheckpoint(self.file_path, resume=True)
+        resumed = self.make_scoring_matrix("python", False, None)
+        self.assertEqual(checkpoint.start(resumed)[0], 5)
+        checkpoint.file.close()
+
+    def test_checkpoint_of_different_alignment(self):
+        interrupted = self.make_scoring_matrix(
+            "python", False, InterruptedCheckpoint(self.file_path, 3)
+        )
+        with self.assertRaises(Interrupted):
+            interrupted.fill()
+
+        different = ScoringMatrix(
+            SEQUENCE_2,
+            SEQUENCE_1,
+            ConstantGapPenalty(-2),
+            NucleotideSubstitutionMatrix(),
+            checkpoint=FillCheckpoint(self.file_path, resume=True),
+        )
+        with self.assertRaises(ValueError):
+            different.fill()
+
+    def test_resume_without_checkpoint_fills_from_start(self):
+        needleman_wunsch = NeedlemanWunsch(
+            checkpoint=FillCheckpoint(self.file_path, resume=True)
+        )
+        alignments, optimal_score, _ = needleman_wunsch.align(SEQUENCE_1, SEQUENCE_2)
+
+        self.assertEqual(
+            (alignments, optimal_score),
+            NeedlemanWunsch().align(SEQUENCE_1, SEQUENCE_2)[:2],
+        )
+        self.assertFalse(os.path.exists(self.file_path))
@@ -0,0 +1,77 @@
+import gzip
+import os
+import tempfile
+from unittest import TestCase
+
+from global_sequence_alignment.fasta import FastaFormatError, read_fasta_records
+
+MULTI_RECORD_FASTA = b""">first record
+GATT
+ACA
+>second record
+GTCG\r
+ACGCA\r
+
+>empty record
+"""
+
+
+class TestReadFastaRecords(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_file(self, name, content):
+        file_path = os.path.join(self.directory.name, name)
+        with open(file_path, "wb") as f:
+            f.write(content)
+        return file_path
+
+    def test_reading_multiple_records(self):
+        file_path = self.write_file("sequences.fna", MULTI_RECORD_FASTA)
+
+        records = list(read_fasta_records(file_path))
+
+        self.assertEqual(
+            records,
+            [
+                ("first record", b"GATTACA"),
+                ("second record", b"GTCGACGCA"),
+                ("empty record", b""),
+            ],
+        )
+
+    def test_reading_gzip_compressed_file(self):
+        file_path = self.write_file(
+            "sequences.fna.gz", gzip.compress(MULTI_RECORD_FASTA)
+        )
+
+        records = list(read_fasta_records(file_path))
+
+        self.assertEqual(
+            records,
+            [
+                ("first record", b"GATTACA"),
+                ("second record", b"GTCGACGCA"),
+                ("empty record", b""),
+            ],
+        )
+
+    def test_reading_empty_file(self):
+        file_path = self.write_file("empty.fna", b"")
+
+        self.assertEqual(list(read_fasta_records(file_path)), [])
+
+    def test_reading_file_without_header(self):
+        file_path = self.write_file("sequence.txt", b"GATTACA\n")
+
+        with self.assertRaises(FastaFormatError):
+            list(read_fasta_records(file_path))
+
+    def test_reading_records_lazily(self):
+        file_path = self.write_file("sequences.fna", MULTI_RECORD_FASTA)
+
+        records = read_fasta_records(file_path)
+
+        self.assertEqual(next(records), ("first record", b"GATTACA"))
+        records.close()
@@ -0,0 +1,60 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from global_sequence_alignment.instrumentation import PhaseTimer, ProgressLogger
+from global_sequence_alignment.needleman_wunsch import NeedlemanWunsch
+
+
+class TestPhaseTimer(TestCase):
+    def test_nested_phase_time_is_not_counted_for_outer_phase(self):
+        phase_timer = PhaseTimer()
+        with patch("time.perf_counter", side_effect=[0.0, 1.0, 3.0, 6.0]):
+            phase_timer.start_phase("serialization")
+            phase_timer.start_phase("traceback")
+            phase_timer.end_phase("traceback")
+            phase_timer.end_phase("serialization")
+
+        self.assertEqual(
+            phase_timer.phase_seconds, {"serialization": 4.0, "traceback": 2.0}
+        )
+        self.assertEqual(phase_timer.total_seconds, 6.0)
+
+    def test_ending_phase_out_of_order(self):
+        phase_timer = PhaseTimer()
+        phase_timer.start_phase("fill")
+
+        with self.assertRaises(ValueError):
+            phase_timer.end_phase("init")
+
+    def test_align_reports_phases_and_cells(self):
+        phase_timer = PhaseTimer()
+        needleman_wunsch = NeedlemanWunsch(instrumentation=phase_timer)
+
+        needleman_wunsch.align("GATTACA", "GCATGCT")
+
+        self.assertEqual(set(phase_timer.phase_seconds), {"init", "fill", "traceback"})
+        self.assertEqual(phase_timer.cells, 49)
+        self.assertGreater(phase_timer.cells_per_second, 0)
+
+    def test_score_reports_cells(self):
+        phase_timer = PhaseTimer()
+        needleman_wunsch = NeedlemanWunsch(instrumentation=phase_timer)
+
+        needleman_wunsch.score("GATTACA", "GCA")
+
+        self.assertEqual(set(phase_timer.phase_seconds), {"fill"})
+        self.assertEqual(phase_timer.cells, 21)
+
+
+class TestProgressLogger(TestCase):
+    def test_logging_throttled_by_time(self):
+        with patch("time.monotonic", side_effect=[0.0, 1.0, 5.0, 6.0, 10.5]):
+            progress_logger = ProgressLogger(100, interval=5.0)
+            with self.assertLogs(level="INFO") as logs:
+                for cells_computed in [10, 50, 60, 90]:
+                    progress_logger.update(cells_computed)
+
+        self.assertEqual(
+            [record.getMessage() for record in logs.records],
+            ["Computed 50% of cells", "Computed 90% of cells"],
+        )
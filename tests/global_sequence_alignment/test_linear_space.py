@@ -0,0 +1,115 @@
+import logging
+import random
+import tracemalloc
+from unittest import TestCase
+
+from global_sequence_alignment.linear_space import compute_last_row
+from global_sequence_alignment.needleman_wunsch import (
+    AffineGapPenalty,
+    Alignment,
+    ConstantGapPenalty,
+    NeedlemanWunsch,
+    NucleotideSubstitutionMatrix,
+    ScoringMatrix,
+)
+
+
+def score_alignment(alignment, substitution_matrix, gap_penalty=-1):
+    score = 0
+    for symbol_1, symbol_2 in zip(alignment.sequence_1, alignment.sequence_2):
+        if symbol_1 == "-" or symbol_2 == "-":
+            score += gap_penalty
+        else:
+            score += substitution_matrix.get_score(symbol_1, symbol_2)
+    return score
+
+
+class TestComputeLastRow(TestCase):
+    def test_last_row_matches_scoring_matrix(self):
+        _, _, scoring_matrix = NeedlemanWunsch().align("GATTACA", "GTCGACGCA")
+
+        for engine in ["python", "numpy"]:
+            last_row = compute_last_row(
+                "GATTACA", "GTCGACGCA", -1, NucleotideSubstitutionMatrix(), engine
+            )
+            self.assertEqual(list(last_row), scoring_matrix.scoring_matrix[-1])
+
+
+class TestHirschberg(TestCase):
+    def assert_optimal_alignment(self, sequence_1, sequence_2, engine="python"):
+        needleman_wunsch = NeedlemanWunsch(engine=engine)
+        _, expected_score, _ = needleman_wunsch.align(sequence_1, sequence_2)
+
+        alignment, optimal_score = needleman_wunsch.align_linear_space(
+            sequence_1, sequence_2
+        )
+
+        self.assertEqual(optimal_score, expected_score)
+        self.assertEqual(alignment.sequence_1.replace("-", ""), sequence_1)
+        self.assertEqual(alignment.sequence_2.replace("-", ""), sequence_2)
+        self.assertEqual(
+            score_alignment(alignment, needleman_wunsch.substitution_matrix),
+            optimal_score,
+        )
+
+    def test_empty_sequences(self):
+        alignment, optimal_score = NeedlemanWunsch().align_linear_space("", "")
+
+        self.assertEqual(alignment, Alignment("", ""))
+        self.assertEqual(optimal_score, 0)
+
+    def test_one_empty_sequence(self):
+        alignment, optimal_score = NeedlemanWunsch().align_linear_space("GA", "")
+
+        self.assertEqual(alignment, Alignment("GA", "--"))
+        self.assertEqual(optimal_score, -2)
+
+    def test_identical_sequences(self):
+        alignment, optimal_score = NeedlemanWunsch().align_linear_space("ATC", "ATC")
+
+        self.assertEqual(alignment, Alignment("ATC", "ATC"))
+        self.assertEqual(optimal_score, 3)
+
+    def test_optimal_for_random_sequences(self):
+        random_generator = random.Random(0)
+        for engine in ["python", "numpy"]:
+            for _ in range(20):
+                sequence_1 = "".join(
+                    random_generator.choices("ACGT", k=random_generator.randint(0, 20))
+                )
+                sequence_2 = "".join(
+                    random_generator.choices("ACGT", k=random_generator.randint(0, 20))
+                )
+                self.assert_optimal_alignment(sequence_1, sequence_2, engine)
+
+    def test_unsupported_scoring_function(self):
+        needleman_wunsch = NeedlemanWunsch(scoring_function=AffineGapPenalty())
+
+        with self.assertRaises(ValueError):
+            needleman_wunsch.align_linear_space("ATC", "ATC")
+
+    def test_memory_usage_is_linear(self):
+        random_generator = random.Random(0)
+        sequence_1 = "".join(random_generator.choices("ACGT", k=200))
+        sequence_2 = "".join(random_generator.choices("ACGT", k=200))
+        needleman_wunsch = NeedlemanWunsch()
+
+        # Keep log records of other handlers out of the measurement
+        logging.disable(logging.INFO)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        tracemalloc.start()
+        ScoringMatrix(
+            sequence_1,
+            sequence_2,
+            ConstantGapPenalty(),
+            NucleotideSubstitutionMatrix(),
+        ).fill()
+        _, full_matrix_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        needleman_wunsch.align_linear_space(sequence_1, sequence_2)
+        _, linear_space_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # Two rows of Python ints plus the aligned strings, far below 40k cells
+        self.assertLess(linear_space_peak, 100 * (len(sequence_1) + len(sequence_2)))
+        self.assertLess(linear_space_peak * 20, full_matrix_peak)
@@ -0,0 +1,113 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from global_sequence_alignment.matrix_file import load_scoring_matrix
+from global_sequence_alignment.needleman_wunsch import (
+    AffineGapPenalty,
+    AffineScoringMatrix,
+    ConstantGapPenalty,
+    NucleotideSubstitutionMatrix,
+    ProteinSubstitutionMatrix,
+    ScoringMatrix,
+)
+
+
+class TestMatrixFile(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, "matrix.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_same_after_loading(self, scoring_matrix):
+        scoring_matrix.fill()
+        scoring_matrix.save(self.file_path)
+        loaded = ScoringMatrix.load(self.file_path)
+
+        self.assertIs(type(loaded), type(scoring_matrix))
+        self.assertEqual(vars(loaded).keys(), vars(scoring_matrix).keys())
+        self.assertEqual(loaded.get_optimal_score(), scoring_matrix.get_optimal_score())
+        self.assertEqual(loaded.get_alignments(), scoring_matrix.get_alignments())
+        self.assertEqual(str(loaded), str(scoring_matrix))
+
+    def test_python_engine(self):
+        self.assert_same_after_loading(
+            ScoringMatrix(
+                "GATTACA",
+                "GTCGACGCA",
+                ConstantGapPenalty(),
+                NucleotideSubstitutionMatrix(),
+            )
+        )
+
+    def test_numpy_engine(self):
+        self.assert_same_after_loading(
+            ScoringMatrix(
+                "HEAGAWGHEE",
+                "PAWHEAE",
+                ConstantGapPenalty(-8),
+                ProteinSubstitutionMatrix(),
+                engine="numpy",
+            )
+        )
+
+    def test_affine_layers(self):
+        self.assert_same_after_loading(
+            AffineScoringMatrix(
+                "GATTACA",
+                "GTTTACA",
+                AffineGapPenalty(-3, -1),
+                NucleotideSubstitutionMatrix(),
+            )
+        )
+
+    def test_empty_sequences(self):
+        self.assert_same_after_loading(
+            ScoringMatrix("", "", ConstantGapPenalty(), NucleotideSubstitutionMatrix())
+        )
+
+    def test_unfilled_matrix_is_not_saved(self):
+        scoring_matrix = ScoringMatrix(
+            "GA", "G", ConstantGapPenalty(), NucleotideSubstitutionMatrix()
+        )
+
+        with self.assertRaises(ValueError):
+            scoring_matrix.save(self.file_path)
+
+    def test_invalid_files(self):
+        with open(self.file_path, "wb") as f:
+            f.write(b"GATTACA\n")
+        with self.assertRaises(ValueError):
+            load_scoring_matrix(self.file_path)
+
+        scoring_matrix = ScoringMatrix(
+            "GA", "G", ConstantGapPenalty(), NucleotideSubstitutionMatrix()
+        )
+        scoring_matrix.fill()
+        scoring_matrix.save(self.file_path)
+        with open(self.file_path, "r+b") as f:
+            f.truncate(os.path.getsize(self.file_path) - 1)
+        with self.assertRaises(ValueError):
+            load_scoring_matrix(self.file_path)
+
+
+class TestRender(TestCase):
+    def setUp(self):
+        self.scoring_matrix = ScoringMatrix(
+            "GATTACA", "GTCGACGCA", ConstantGapPenalty(), NucleotideSubstitutionMatrix()
+        )
+        self.scoring_matrix.fill()
+
+    def test_window_is_part_of_full_rendering(self):
+        full_rows = str(self.scoring_matrix).split("\n")
+        window_rows = self.scoring_matrix.render(slice(2, 5), slice(1, 4)).split("\n")
+
+        self.assertEqual(len(window_rows), 6)
+        self.assertEqual(window_rows, [row[4:16] for row in full_rows[4:10]])
+
+    def test_window_is_clipped_to_matrix(self):
+        rendered = self.scoring_matrix.render(slice(9, 100), slice(7, None))
+
+        self.assertEqual(rendered, " ↖  \n   0")
@@ -0,0 +1,164 @@
+import random
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from global_sequence_alignment.cache import AlignmentCache
+from global_sequence_alignment.msa import (
+    NEIGHBOR_JOINING,
+    Profile,
+    align_profiles,
+    build_neighbor_joining_tree,
+    build_pair_scores,
+    build_upgma_tree,
+    format_newick,
+)
+from global_sequence_alignment.needleman_wunsch import NeedlemanWunsch
+
+PROTEINS = [
+    "MALWMRLLPLLALLALWGPDPAAAFVNQHLCGSHLVEALYLVCGERGFFYTPKTRREAED",
+    "MTLWMRLLPLLALLVLWEPNPAQAFVNQHLCGSHLVEALYLVCGERGFFYTPKSRRGVED",
+    "MALWTRLRPLLALLALWPPPPARAFVNQHLCGSHLVEALYLVCGERGFFYTPKARREVEG",
+    "MALWMRFLPLLALLVLWEPKPAQAFVKQHLCGPHLVEALYLVCGERGFFYTPKSRREVED",
+]
+
+
+def get_sum_of_pairs_score(rows_1, rows_2, needleman_wunsch):
+    """Sum of scores of pairs of a row of each, pairs with a gap scoring the gap penalty"""
+    substitution_matrix = needleman_wunsch.substitution_matrix
+    gap_penalty = needleman_wunsch.scoring_function.gap_penalty
+    score = 0
+    for row_1 in rows_1:
+        for row_2 in rows_2:
+            for symbol_1, symbol_2 in zip(row_1, row_2):
+                if "-" in (symbol_1, symbol_2):
+                    score += gap_penalty
+                else:
+                    score += substitution_matrix.get_score(symbol_1, symbol_2)
+    return score
+
+
+class TestProfiles(TestCase):
+    def test_single_sequences_align_like_pairs(self):
+        needleman_wunsch = NeedlemanWunsch("constant", "BLOSUM62")
+        substitution_matrix = needleman_wunsch.substitution_matrix
+        random_generator = random.Random(0)
+        for _ in range(10):
+            sequence_1, sequence_2 = (
+                "".join(
+                    random_generator.choices(
+                        "ARNDCQEGHILKMFPSTWYV", k=random_generator.randint(0, 20)
+                    )
+                )
+                for _ in range(2)
+            )
+            profile_1 = Profile.from_sequence(0, sequence_1, substitution_matrix)
+            profile_2 = Profile.from_sequence(1, sequence_2, substitution_matrix)
+            expected_score = needleman_wunsch.score(sequence_1, sequence_2)
+            with self.subTest(sequence_1=sequence_1, sequence_2=sequence_2):
+                for max_memory in [None, 0]:
+                    _, optimal_score = align_profiles(
+                        profile_1,
+                        profile_2,
+                        needleman_wunsch.scoring_function,
+                        substitution_matrix,
+                        max_memory,
+                    )
+                    self.assertEqual(optimal_score, expected_score)
+
+    def test_full_matrix_and_linear_space_agree(self):
+        needleman_wunsch = NeedlemanWunsch("constant", "BLOSUM62")
+        substitution_matrix = needleman_wunsch.substitution_matrix
+        profile_1 = Profile([0, 1], ["MALW-RLL", "M-LWMRLL"], substitution_matrix)
+        profile_2 = Profile([2, 3], ["MAWTRLR", "MALWTRL"], substitution_matrix)
+
+        results = [
+            align_profiles(
+                profile_1,
+                profile_2,
+                needleman_wunsch.scoring_function,
+                substitution_matrix,
+                max_memory,
+            )
+            for max_memory in [None, 0]
+        ]
+
+        for alignment, optimal_score in results:
+            rows = profile_1.merge(profile_2, alignment).rows
+            self.assertEqual(
+                [row.replace("-", "") for row in rows],
+                ["MALWRLL", "MLWMRLL", "MAWTRLR", "MALWTRL"],
+            )
+            self.assertEqual(
+                get_sum_of_pairs_score(rows[:2], rows[2:], needleman_wunsch),
+                optimal_score,
+            )
+        self.assertEqual(results[0][1], results[1][1])
+
+    def test_pair_scores_of_gaps(self):
+        needleman_wunsch = NeedlemanWunsch("constant", "nucleotide")
+
+        pair_scores = build_pair_scores(needleman_wunsch.substitution_matrix, -2)
+
+        self.assertEqual(pair_scores.shape, (5, 5))
+        self.assertEqual(pair_scores[0, 0], 1)
+        self.assertTrue((pair_scores[4] == -2).all())
+        self.assertTrue((pair_scores[:, 4] == -2).all())
+
+
+class TestGuideTrees(TestCase):
+    distances = np.array(
+        [
+            [0.0, 0.1, 0.6, 0.7],
+            [0.1, 0.0, 0.5, 0.6],
+            [0.6, 0.5, 0.0, 0.2],
+            [0.7, 0.6, 0.2, 0.0],
+        ]
+    )
+
+    def test_upgma(self):
+        merges = build_upgma_tree(self.distances)
+
+        self.assertEqual(merges, [(0, 1), (2, 3), (4, 5)])
+        self.assertEqual(format_newick(merges, "abcd"), "((a,b),(c,d));")
+
+    def test_neighbor_joining(self):
+        merges = build_neighbor_joining_tree(self.distances)
+
+        self.assertEqual(format_newick(merges, "abcd"), "((a,b),(c,d));")
+
+
+class TestAlignMultiple(TestCase):
+    def test_rows_are_sequences_with_gaps(self):
+        needleman_wunsch = NeedlemanWunsch("constant", "BLOSUM62")
+        sequences = [sequence[k:] for k, sequence in enumerate(PROTEINS)]
+
+        for guide_tree in ["upgma", NEIGHBOR_JOINING]:
+            rows, merges = needleman_wunsch.align_multiple(sequences, guide_tree)
+            with self.subTest(guide_tree=guide_tree):
+                self.assertEqual([row.replace("-", "") for row in rows], sequences)
+                self.assertEqual(len(set(map(len, rows))), 1)
+                self.assertEqual(len(merges), len(sequences) - 1)
+
+    def test_identical_sequences_have_no_gaps(self):
+        rows, _ = NeedlemanWunsch().align_multiple(["GATTACA"] * 3 + ["GATTACA"])
+
+        self.assertEqual(rows, ["GATTACA"] * 4)
+
+    def test_pair_scores_reused_from_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = AlignmentCache(directory)
+            needleman_wunsch = NeedlemanWunsch("constant", "BLOSUM62", cache=cache)
+
+            first_rows, _ = needleman_wunsch.align_multiple(PROTEINS)
+            misses = cache.misses
+            rows, _ = needleman_wunsch.align_multiple(PROTEINS)
+
+        self.assertEqual(misses, 6)
+        self.assertEqual(cache.misses, 6)
+        self.assertEqual(rows, first_rows)
+
+    def test_refusing_affine_gap_penalty(self):
+        with self.assertRaises(ValueError):
+            NeedlemanWunsch("affine").align_multiple(["GA", "G"])
@@ -1,13 +1,27 @@
+import itertools
+import logging
+import os
+import random
+import subprocess
+import sys
+import tracemalloc
 from unittest import TestCase
 from unittest.mock import MagicMock
 
+import global_sequence_alignment
 from global_sequence_alignment.needleman_wunsch import (
+    AffineGapPenalty,
+    AffineScoringMatrix,
     Alignment,
     ConstantGapPenalty,
     InvalidSymbolError,
+    LinearGapPenalty,
+    NeedlemanWunsch,
     NucleotideSubstitutionMatrix,
+    ProteinSubstitutionMatrix,
     ScoringMatrix,
     TracebackDirection,
+    TracebackMatrix,
 )
 
 
@@ -38,6 +52,85 @@ class TestNucleotideSubstitutionMatrix(TestCase):
         with self.assertRaises(InvalidSymbolError):
             substitution_matrix.get_score(symbol_1, symbol_2)
 
+    def test_encoding_sequence(self):
+        substitution_matrix = NucleotideSubstitutionMatrix()
+
+        self.assertEqual(substitution_matrix.encode("ACGTA"), bytes([0, 1, 2, 3, 0]))
+        self.assertEqual(substitution_matrix.encode(b"ACGTA"), bytes([0, 1, 2, 3, 0]))
+
+    def test_encoding_sequence_with_invalid_symbol(self):
+        substitution_matrix = NucleotideSubstitutionMatrix()
+
+        with self.assertRaisesRegex(InvalidSymbolError, "Symbol N"):
+            substitution_matrix.encode("ACNT")
+        with self.assertRaisesRegex(InvalidSymbolError, "Symbol Ä"):
+            substitution_matrix.encode("ACÄT")
+
+    def test_getting_profile(self):
+        substitution_matrix = NucleotideSubstitutionMatrix()
+
+        profile = substitution_matrix.get_profile("AC")
+
+        self.assertEqual(profile, [[1, -1], [-1, 1], [-1, -1], [-1, -1]])
+
+
+class TestAlignment(TestCase):
+    def test_gapped_rows_round_trip(self):
+        alignment = Alignment("GA-TTACA", "G-CTT--A")
+
+        self.assertEqual(alignment.cigar, "1M1D1I2M2D1M")
+        self.assertEqual(alignment.sequence_1, "GA-TTACA")
+        self.assertEqual(alignment.sequence_2, "G-CTT--A")
+        self.assertEqual(
+            Alignment.from_cigar("GATTACA", "GCTTA", alignment.cigar), alignment
+        )
+
+    def test_rendering_from_start_coordinates(self):
+        alignment = Alignment.from_cigar("xxGATTACA", "yGCATGCT", "1M1I1M1D4M", 2, 1)
+
+        self.assertEqual(str(alignment), "G-ATTACA\nGCA-TGCT")
+        self.assertEqual((alignment.end_1, alignment.end_2), (9, 8))
+        self.assertEqual(alignment, Alignment("G-ATTACA", "GCA-TGCT"))
+
+    def test_statistics(self):
+        alignment = Alignment("GA-TTACA", "G-CTT--A")
+
+        self.assertEqual(alignment.length, 8)
+        self.assertEqual(alignment.gap_count, 4)
+        self.assertEqual(alignment.identity, 4 / 8)
+
+    def test_empty_alignment(self):
+        alignment = Alignment("", "")
+
+        self.assertEqual(alignment.cigar, "")
+        self.assertEqual(alignment.identity, 0.0)
+
+    def test_no_instance_dictionary(self):
+        with self.assertRaises(AttributeError):
+            Alignment("GA", "G-").extra = None
+
+
+class TestTracebackMatrix(TestCase):
+    def test_new_matrix_has_no_directions(self):
+        traceback_matrix = TracebackMatrix(2, 3)
+
+        self.assertEqual(traceback_matrix.tolist(), [[None] * 3, [None] * 3])
+        self.assertEqual(traceback_matrix.nbytes, 6)
+
+    def test_setting_directions(self):
+        traceback_matrix = TracebackMatrix(2, 3)
+
+        traceback_matrix.set_directions(
+            1, 2, [TracebackDirection.DIAGONAL, TracebackDirection.SIDE]
+        )
+
+        self.assertEqual(
+            traceback_matrix.get_directions(1, 2),
+            [TracebackDirection.DIAGONAL, TracebackDirection.SIDE],
+        )
+        self.assertEqual(traceback_matrix.get_flags(1, 2), 0b101)
+        self.assertIsNone(traceback_matrix.get_directions(1, 1))
+
 
 class TestScoringMatrix(TestCase):
     def test_building_scoring_matrix_for_empty_sequences(self):
@@ -51,7 +144,7 @@ class TestScoringMatrix(TestCase):
         )
 
         self.assertEqual(scoring_matrix.scoring_matrix, [[0]])
-        self.assertEqual(scoring_matrix.traceback_matrix, [[None]])
+        self.assertEqual(scoring_matrix.traceback_matrix.tolist(), [[None]])
 
     def test_building_scoring_matrix_for_nonempty_sequences(self):
         sequence_1 = "ABC"
@@ -77,7 +170,8 @@ class TestScoringMatrix(TestCase):
         scoring_function = MagicMock(gap_penalty=-1)
         scoring_function.score.return_value = -1
         substitution_matrix = MagicMock()
-        substitution_matrix.get_score.return_value = 1
+        substitution_matrix.encode.return_value = b"\x00"
+        substitution_matrix.get_profile.return_value = [[1]]
 
         scoring_matrix = ScoringMatrix(
             sequence_1, sequence_2, scoring_function, substitution_matrix
@@ -92,7 +186,9 @@ class TestScoringMatrix(TestCase):
             [None, None],
             [None, [TracebackDirection.DIAGONAL]],
         ]
-        self.assertEqual(scoring_matrix.traceback_matrix, expected_traceback_matrix)
+        self.assertEqual(
+            scoring_matrix.traceback_matrix.tolist(), expected_traceback_matrix
+        )
 
     def test_filling_for_multiple_symbol_sequences(self):
         sequence_1 = "ATC"
@@ -135,7 +231,9 @@ class TestScoringMatrix(TestCase):
                 [TracebackDirection.DIAGONAL],
             ],
         ]
-        self.assertEqual(scoring_matrix.traceback_matrix, expected_traceback_matrix)
+        self.assertEqual(
+            scoring_matrix.traceback_matrix.tolist(), expected_traceback_matrix
+        )
 
     def test_getting_alignment_for_empty_sequences(self):
         sequence_1 = ""
@@ -185,3 +283,242 @@ class TestScoringMatrix(TestCase):
 
         expected_alignment = Alignment("GA", "G-")
         self.assertEqual(alignments, [expected_alignment])
+
+    def test_getting_alignment_through_first_column(self):
+        sequence_1 = "AG"
+        sequence_2 = "G"
+        scoring_function = ConstantGapPenalty(gap_penalty=-1)
+        substitution_matrix = NucleotideSubstitutionMatrix()
+
+        scoring_matrix = ScoringMatrix(
+            sequence_1, sequence_2, scoring_function, substitution_matrix
+        )
+
+        scoring_matrix.fill()
+
+        alignments = scoring_matrix.get_alignments()
+
+        expected_alignment = Alignment("AG", "-G")
+        self.assertEqual(alignments, [expected_alignment])
+
+    def test_limiting_number_of_alignments(self):
+        scoring_matrix = ScoringMatrix(
+            "GATTACA",
+            "GTCGACGCA",
+            ConstantGapPenalty(gap_penalty=-1),
+            NucleotideSubstitutionMatrix(),
+        )
+        scoring_matrix.fill()
+
+        all_alignments = scoring_matrix.get_alignments()
+
+        self.assertEqual(len(all_alignments), 4)
+        self.assertEqual(
+            scoring_matrix.get_alignments(max_alignments=2), all_alignments[:2]
+        )
+        self.assertEqual(
+            scoring_matrix.get_alignments(first_only=True), all_alignments[:1]
+        )
+
+    def test_iterating_alignments_of_long_sequences(self):
+        sequence = "GATTACA" * 300
+        scoring_matrix = ScoringMatrix(
+            sequence,
+            sequence,
+            ConstantGapPenalty(gap_penalty=-1),
+            NucleotideSubstitutionMatrix(),
+            engine="numpy",
+        )
+        scoring_matrix.fill()
+
+        alignment = next(scoring_matrix.iter_alignments())
+
+        self.assertEqual(alignment, Alignment(sequence, sequence))
+
+
+def enumerate_alignments(sequence_1, sequence_2):
+    """Enumerate all alignments of two sequences as pairs of gapped strings"""
+    if not sequence_1 and not sequence_2:
+        yield "", ""
+        return
+    if sequence_1 and sequence_2:
+        for aligned_1, aligned_2 in enumerate_alignments(
+            sequence_1[1:], sequence_2[1:]
+        ):
+            yield sequence_1[0] + aligned_1, sequence_2[0] + aligned_2
+    if sequence_2:
+        for aligned_1, aligned_2 in enumerate_alignments(sequence_1, sequence_2[1:]):
+            yield "-" + aligned_1, sequence_2[0] + aligned_2
+    if sequence_1:
+        for aligned_1, aligned_2 in enumerate_alignments(sequence_1[1:], sequence_2):
+            yield sequence_1[0] + aligned_1, "-" + aligned_2
+
+
+def score_affine_alignment(aligned_1, aligned_2, scoring_function, substitution_matrix):
+    """Score alignment charging each run of gaps in one sequence as one gap"""
+    score = 0
+    for aligned in [aligned_1, aligned_2]:
+        for is_gap, run in itertools.groupby(aligned, key=lambda symbol: symbol == "-"):
+            if is_gap:
+                score += scoring_function.score(len(list(run)))
+    for symbol_1, symbol_2 in zip(aligned_1, aligned_2):
+        if symbol_1 != "-" and symbol_2 != "-":
+            score += substitution_matrix.get_score(symbol_1, symbol_2)
+    return score
+
+
+class TestAffineScoringMatrix(TestCase):
+    def assert_same_as_brute_force(
+        self, sequence_1, sequence_2, scoring_function, substitution_matrix
+    ):
+        scoring_matrix = AffineScoringMatrix(
+            sequence_1, sequence_2, scoring_function, substitution_matrix
+        )
+        scoring_matrix.fill()
+
+        scored_alignments = [
+            (
+                score_affine_alignment(
+                    aligned_1, aligned_2, scoring_function, substitution_matrix
+                ),
+                aligned_1,
+                aligned_2,
+            )
+            for aligned_1, aligned_2 in enumerate_alignments(sequence_1, sequence_2)
+        ]
+        expected_score = max(score for score, _, _ in scored_alignments)
+        expected_alignments = sorted(
+            (aligned_1, aligned_2)
+            for score, aligned_1, aligned_2 in scored_alignments
+            if score == expected_score
+        )
+
+        alignments = scoring_matrix.get_alignments()
+
+        self.assertEqual(scoring_matrix.get_optimal_score(), expected_score)
+        self.assertEqual(
+            sorted((a.sequence_1, a.sequence_2) for a in alignments),
+            expected_alignments,
+        )
+
+    def test_gap_is_opened_once(self):
+        scoring_function = AffineGapPenalty(gap_penalty=-5, gap_extension_penalty=-1)
+        scoring_matrix = AffineScoringMatrix(
+            "GATTACA", "GACA", scoring_function, NucleotideSubstitutionMatrix()
+        )
+        scoring_matrix.fill()
+
+        self.assertEqual(scoring_matrix.get_optimal_score(), -3)
+        self.assertEqual(
+            scoring_matrix.get_alignments(),
+            [Alignment("GATTACA", "G---ACA"), Alignment("GATTACA", "GA---CA")],
+        )
+
+    def test_same_as_brute_force_for_random_nucleotide_sequences(self):
+        random_generator = random.Random(0)
+        scoring_function = AffineGapPenalty(gap_penalty=-3, gap_extension_penalty=-1)
+        for _ in range(30):
+            sequence_1 = "".join(
+                random_generator.choices("ACGT", k=random_generator.randint(0, 5))
+            )
+            sequence_2 = "".join(
+                random_generator.choices("ACGT", k=random_generator.randint(0, 5))
+            )
+            self.assert_same_as_brute_force(
+                sequence_1, sequence_2, scoring_function, NucleotideSubstitutionMatrix()
+            )
+
+    def test_same_as_brute_force_for_random_protein_sequences(self):
+        random_generator = random.Random(0)
+        scoring_function = AffineGapPenalty(gap_penalty=-2, gap_extension_penalty=-1)
+        substitution_matrix = ProteinSubstitutionMatrix()
+        for _ in range(30):
+            sequence_1 = "".join(
+                random_generator.choices("ARNDCQ", k=random_generator.randint(0, 5))
+            )
+            sequence_2 = "".join(
+                random_generator.choices("ARNDCQ", k=random_generator.randint(0, 5))
+            )
+            self.assert_same_as_brute_force(
+                sequence_1, sequence_2, scoring_function, substitution_matrix
+            )
+
+    def test_linear_gap_penalty_scores_every_gap_symbol(self):
+        needleman_wunsch = NeedlemanWunsch(
+            scoring_function=LinearGapPenalty(gap_penalty=-2)
+        )
+
+        alignments, optimal_score, _ = needleman_wunsch.align("GATTACA", "GACA")
+
+        self.assertEqual(optimal_score, -2)
+        self.assertIn(Alignment("GATTACA", "GA---CA"), alignments)
+
+    def test_affine_gap_penalty_selects_gotoh_matrix(self):
+        needleman_wunsch = NeedlemanWunsch(scoring_function="affine")
+
+        _, _, scoring_matrix = needleman_wunsch.align("GATTACA", "GACA")
+
+        self.assertIsInstance(scoring_matrix, AffineScoringMatrix)
+
+
+class TestNeedlemanWunsch(TestCase):
+    def test_score_for_empty_sequences(self):
+        needleman_wunsch = NeedlemanWunsch()
+
+        self.assertEqual(needleman_wunsch.score("", ""), 0)
+        self.assertEqual(needleman_wunsch.score("GA", ""), -2)
+
+    def test_score_equals_optimal_score_of_alignment(self):
+        for engine in ["python", "numpy"]:
+            needleman_wunsch = NeedlemanWunsch(engine=engine)
+
+            _, optimal_score, _ = needleman_wunsch.align("GATTACA", "GTCGACGCA")
+
+            self.assertEqual(
+                needleman_wunsch.score("GATTACA", "GTCGACGCA"), optimal_score
+            )
+
+    def test_score_uses_less_memory_than_filling_matrix(self):
+        sequence_1 = "GATTACA" * 20
+        sequence_2 = "GTCGACGCA" * 15
+        needleman_wunsch = NeedlemanWunsch()
+
+        # Keep log records of other handlers out of the measurement
+        logging.disable(logging.INFO)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        tracemalloc.start()
+        scoring_matrix = ScoringMatrix(
+            sequence_1,
+            sequence_2,
+            needleman_wunsch.scoring_function,
+            needleman_wunsch.substitution_matrix,
+        )
+        scoring_matrix.fill()
+        _, full_matrix_peak = tracemalloc.get_traced_memory()
+        del scoring_matrix
+        tracemalloc.reset_peak()
+        needleman_wunsch.score(sequence_1, sequence_2)
+        _, score_only_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertLess(score_only_peak * 20, full_matrix_peak)
+
+    def test_aligning_installs_no_log_handlers(self):
+        code = (
+            "import logging; "
+            "from global_sequence_alignment.needleman_wunsch import NeedlemanWunsch; "
+            "NeedlemanWunsch().align('GA', 'G'); "
+            "NeedlemanWunsch().align_linear_space('GA', 'G'); "
+            "print(len(logging.getLogger().handlers))"
+        )
+        package_path = os.path.dirname(global_sequence_alignment.__file__)
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(package_path))
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+        self.assertEqual(output.split(), ["0"])
@@ -0,0 +1,106 @@
+import random
+from unittest import TestCase
+
+from global_sequence_alignment.needleman_wunsch import (
+    AffineGapPenalty,
+    ConstantGapPenalty,
+    InvalidSymbolError,
+    NeedlemanWunsch,
+    NucleotideSubstitutionMatrix,
+    ProteinSubstitutionMatrix,
+    ScoringMatrix,
+)
+
+
+def fill_scoring_matrix(sequence_1, sequence_2, substitution_matrix, engine):
+    scoring_matrix = ScoringMatrix(
+        sequence_1,
+        sequence_2,
+        ConstantGapPenalty(gap_penalty=-1),
+        substitution_matrix,
+        engine=engine,
+    )
+    scoring_matrix.fill()
+    return scoring_matrix
+
+
+class TestNumpyEngine(TestCase):
+    def assert_same_as_python_engine(self, sequence_1, sequence_2, substitution_matrix):
+        expected = fill_scoring_matrix(
+            sequence_1, sequence_2, substitution_matrix, "python"
+        )
+        actual = fill_scoring_matrix(
+            sequence_1, sequence_2, substitution_matrix, "numpy"
+        )
+
+        self.assertEqual(actual.scoring_matrix.tolist(), expected.scoring_matrix)
+        self.assertEqual(
+            actual.traceback_matrix.tolist(), expected.traceback_matrix.tolist()
+        )
+        self.assertEqual(actual.get_optimal_score(), expected.get_optimal_score())
+        self.assertEqual(actual.get_alignments(), expected.get_alignments())
+
+    def test_filling_for_multiple_symbol_sequences(self):
+        scoring_matrix = fill_scoring_matrix(
+            "ATC", "ATC", NucleotideSubstitutionMatrix(), "numpy"
+        )
+
+        expected_scoring_matrix = [
+            [0, -1, -2, -3],
+            [-1, 1, 0, -1],
+            [-2, 0, 2, 1],
+            [-3, -1, 1, 3],
+        ]
+        self.assertEqual(
+            scoring_matrix.scoring_matrix.tolist(), expected_scoring_matrix
+        )
+
+    def test_same_as_python_engine_for_nucleotides(self):
+        self.assert_same_as_python_engine(
+            "GATTACA", "GTCGACGCA", NucleotideSubstitutionMatrix()
+        )
+
+    def test_same_as_python_engine_for_proteins(self):
+        self.assert_same_as_python_engine(
+            "MALWMRLLPLL", "MTLWMRLLPLLALL", ProteinSubstitutionMatrix()
+        )
+
+    def test_same_as_python_engine_for_random_sequences(self):
+        random_generator = random.Random(0)
+        for _ in range(20):
+            sequence_1 = "".join(
+                random_generator.choices("ACGT", k=random_generator.randint(0, 15))
+            )
+            sequence_2 = "".join(
+                random_generator.choices("ACGT", k=random_generator.randint(0, 15))
+            )
+            self.assert_same_as_python_engine(
+                sequence_1, sequence_2, NucleotideSubstitutionMatrix()
+            )
+
+    def test_invalid_symbol(self):
+        with self.assertRaises(InvalidSymbolError):
+            fill_scoring_matrix("AXC", "ATC", NucleotideSubstitutionMatrix(), "numpy")
+
+    def test_unsupported_scoring_function(self):
+        scoring_matrix = ScoringMatrix(
+            "ATC",
+            "ATC",
+            AffineGapPenalty(),
+            NucleotideSubstitutionMatrix(),
+            engine="numpy",
+        )
+        with self.assertRaises(ValueError):
+            scoring_matrix.fill()
+
+    def test_aligning_with_numpy_engine(self):
+        needleman_wunsch = NeedlemanWunsch(engine="numpy")
+
+        alignments, optimal_score, _ = needleman_wunsch.align("GA", "G")
+
+        self.assertEqual(optimal_score, 0)
+        self.assertEqual([str(alignment) for alignment in alignments], ["GA\nG-"])
+
+    def test_invalid_engine(self):
+        with self.assertRaises(ValueError):
+            NeedlemanWunsch(engine="fortran")
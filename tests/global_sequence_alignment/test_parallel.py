@@ -0,0 +1,98 @@
+import random
+from unittest import TestCase
+
+from global_sequence_alignment import parallel
+from global_sequence_alignment.needleman_wunsch import (
+    PROTEIN_SYMBOL_TO_INDEX,
+    LinearGapPenalty,
+    NeedlemanWunsch,
+    NucleotideSubstitutionMatrix,
+    ProteinSubstitutionMatrix,
+    ScoringMatrix,
+)
+from global_sequence_alignment.planner import NUMPY_BYTES_PER_CELL, plan_alignment
+
+
+def make_scoring_matrix(sequence_1, sequence_2, substitution_matrix, threads=1):
+    return ScoringMatrix(
+        sequence_1,
+        sequence_2,
+        LinearGapPenalty(gap_penalty=-2),
+        substitution_matrix,
+        engine="numpy",
+        threads=threads,
+    )
+
+
+class TestParallelFill(TestCase):
+    def assert_same_as_serial_fill(
+        self, sequence_1, sequence_2, substitution_matrix, tile_height, tile_width
+    ):
+        expected = make_scoring_matrix(sequence_1, sequence_2, substitution_matrix)
+        expected.fill()
+        actual = make_scoring_matrix(
+            sequence_1, sequence_2, substitution_matrix, threads=3
+        )
+
+        parallel.fill(
+            sequence_1,
+            sequence_2,
+            actual.scoring_function,
+            substitution_matrix,
+            actual.shared_buffers,
+            threads=3,
+            tile_height=tile_height,
+            tile_width=tile_width,
+        )
+
+        self.assertEqual(
+            actual.scoring_matrix.tolist(), expected.scoring_matrix.tolist()
+        )
+        self.assertEqual(actual.traceback_matrix.flags, expected.traceback_matrix.flags)
+
+    def test_tiles_not_dividing_matrix(self):
+        random_generator = random.Random(0)
+        sequence_1 = "".join(random_generator.choices("ACGT", k=101))
+        sequence_2 = "".join(random_generator.choices("ACGT", k=77))
+
+        self.assert_same_as_serial_fill(
+            sequence_1, sequence_2, NucleotideSubstitutionMatrix(), 10, 16
+        )
+
+    def test_protein_tiles_of_single_cells(self):
+        random_generator = random.Random(1)
+        sequence_1 = "".join(random_generator.choices(PROTEIN_SYMBOL_TO_INDEX, k=20))
+        sequence_2 = "".join(random_generator.choices(PROTEIN_SYMBOL_TO_INDEX, k=13))
+
+        self.assert_same_as_serial_fill(
+            sequence_1, sequence_2, ProteinSubstitutionMatrix(), 1, 1
+        )
+
+    def test_empty_sequence(self):
+        self.assert_same_as_serial_fill(
+            "", "GATTACA", NucleotideSubstitutionMatrix(), 4, 4
+        )
+
+    def test_matrices_take_planned_memory(self):
+        scoring_matrix = make_scoring_matrix(
+            "GATTACA" * 100, "GCATGCT" * 50, NucleotideSubstitutionMatrix(), threads=2
+        )
+        plan = plan_alignment(LinearGapPenalty(gap_penalty=-2), 700, 350, threads=2)
+
+        self.assertEqual(
+            scoring_matrix.scoring_matrix.nbytes
+            + scoring_matrix.traceback_matrix.nbytes,
+            plan.cells * NUMPY_BYTES_PER_CELL,
+        )
+
+    def test_align_with_threads(self):
+        needleman_wunsch = NeedlemanWunsch(engine="numpy", threads=2)
+
+        alignments, optimal_score, _ = needleman_wunsch.align("GATTACA", "GCATGCT")
+
+        self.assertEqual(optimal_score, NeedlemanWunsch().score("GATTACA", "GCATGCT"))
+        self.assertEqual(alignments, NeedlemanWunsch().align("GATTACA", "GCATGCT")[0])
+
+    def test_threads_require_numpy_engine(self):
+        with self.assertRaises(ValueError):
+            NeedlemanWunsch(threads=2)
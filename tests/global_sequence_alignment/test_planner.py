@@ -0,0 +1,159 @@
+import random
+from unittest import TestCase
+
+from global_sequence_alignment.needleman_wunsch import (
+    AffineGapPenalty,
+    ConstantGapPenalty,
+    NeedlemanWunsch,
+)
+from global_sequence_alignment.planner import (
+    BANDED,
+    BANDED_MAX_SHARE,
+    FULL,
+    LINEAR_SPACE,
+    PARALLEL,
+    SCORE,
+    MemoryBudgetError,
+    parse_memory_size,
+    plan_alignment,
+)
+
+GiB = 2**30
+
+
+class TestPlanAlignment(TestCase):
+    def test_score_only(self):
+        plan = plan_alignment(ConstantGapPenalty(), 10, 10, score_only=True)
+        affine_plan = plan_alignment(
+            AffineGapPenalty(), 10000, 10000, score_only=True, max_memory=2**21
+        )
+
+        self.assertEqual((plan.strategy, plan.engine), (SCORE, "python"))
+        self.assertEqual((affine_plan.strategy, affine_plan.engine), (SCORE, "striped"))
+
+    def test_all_alignments_take_full_matrix(self):
+        plan = plan_alignment(ConstantGapPenalty(), 5000, 5000, max_memory=GiB)
+
+        self.assertEqual((plan.strategy, plan.engine), (FULL, "numpy"))
+        self.assertEqual(plan.cells, 5001 * 5001)
+        self.assertEqual(plan.memory_bytes, 5001 * 5001 * 5)
+
+    def test_parallel_fill_of_large_matrix(self):
+        plan = plan_alignment(
+            ConstantGapPenalty(), 5000, 5000, threads=4, max_memory=GiB
+        )
+        checkpointed_plan = plan_alignment(
+            ConstantGapPenalty(),
+            5000,
+            5000,
+            threads=4,
+            max_memory=GiB,
+            checkpointed=True,
+        )
+
+        self.assertEqual((plan.strategy, plan.threads), (PARALLEL, 4))
+        self.assertEqual(checkpointed_plan.strategy, FULL)
+
+    def test_checkpointed_alignment_takes_full_matrix(self):
+        plan = plan_alignment(
+            ConstantGapPenalty(),
+            5000,
+            5010,
+            first_only=True,
+            max_memory=GiB,
+            checkpointed=True,
+        )
+
+        self.assertEqual(plan.strategy, FULL)
+
+    def test_one_alignment(self):
+        similar_plan = plan_alignment(
+            ConstantGapPenalty(), 5000, 5010, first_only=True, max_memory=GiB
+        )
+        plan = plan_alignment(
+            ConstantGapPenalty(), 5000, 2000, max_alignments=1, max_memory=GiB
+        )
+        small_budget_plan = plan_alignment(
+            ConstantGapPenalty(), 5000, 2000, first_only=True, max_memory=2**20
+        )
+
+        self.assertEqual(similar_plan.strategy, BANDED)
+        self.assertEqual(similar_plan.max_cells, int(5001 * 5011 * BANDED_MAX_SHARE))
+        self.assertEqual(plan.strategy, FULL)
+        self.assertEqual(small_budget_plan.strategy, LINEAR_SPACE)
+
+    def test_refusing_plans_over_budget(self):
+        with self.assertRaises(MemoryBudgetError):
+            plan_alignment(ConstantGapPenalty(), 5000, 5000, max_memory=2**20)
+        with self.assertRaises(MemoryBudgetError):
+            plan_alignment(
+                AffineGapPenalty(), 5000, 5000, first_only=True, max_memory=2**20
+            )
+
+    def test_parse_memory_size(self):
+        self.assertEqual(parse_memory_size("100"), 100)
+        self.assertEqual(parse_memory_size("512M"), 512 * 2**20)
+        self.assertEqual(parse_memory_size("4G"), 4 * GiB)
+        self.assertEqual(parse_memory_size("1.5KiB"), 1536)
+        with self.assertRaises(ValueError):
+            parse_memory_size("lots")
+
+
+class TestAutoEngine(TestCase):
+    def test_same_results_as_python_engine(self):
+        for scoring_function in ["constant", "affine"]:
+            expected = NeedlemanWunsch(scoring_function, "nucleotide").align(
+                "GATTACA", "GCATGCT"
+            )
+            needleman_wunsch = NeedlemanWunsch(scoring_function, "nucleotide", "auto")
+            with self.subTest(scoring_function=scoring_function):
+                self.assertEqual(
+                    needleman_wunsch.align("GATTACA", "GCATGCT")[:2], expected[:2]
+                )
+                self.assertEqual(
+                    needleman_wunsch.score("GATTACA", "GCATGCT"), expected[1]
+                )
+
+    def test_one_alignment_in_linear_space(self):
+        sequence_1 = "GATTACA" * 30
+        sequence_2 = "GCATGCT" * 10
+        expected_score = NeedlemanWunsch().align(sequence_1, sequence_2, 1)[1]
+        needleman_wunsch = NeedlemanWunsch(engine="auto", max_memory=2**16)
+
+        self.assertEqual(
+            needleman_wunsch.plan(sequence_1, sequence_2, first_only=True).strategy,
+            LINEAR_SPACE,
+        )
+        alignments, optimal_score, scoring_matrix = needleman_wunsch.align(
+            sequence_1, sequence_2, first_only=True
+        )
+        self.assertEqual(optimal_score, expected_score)
+        self.assertEqual(len(alignments), 1)
+        self.assertIsNone(scoring_matrix)
+
+    def test_band_too_wide_is_planned_again(self):
+        random_generator = random.Random(0)
+        sequence_1, sequence_2 = (
+            "".join(random_generator.choices("ACGT", k=3000)) for _ in range(2)
+        )
+        expected_score = NeedlemanWunsch(engine="numpy").score(sequence_1, sequence_2)
+        needleman_wunsch = NeedlemanWunsch(engine="auto", max_memory=2**20)
+
+        self.assertEqual(
+            needleman_wunsch.plan(sequence_1, sequence_2, first_only=True).strategy,
+            BANDED,
+        )
+        with self.assertLogs(level="INFO") as logs:
+            alignments, optimal_score, _ = needleman_wunsch.align(
+                sequence_1, sequence_2, first_only=True
+            )
+
+        self.assertTrue(any("planning without a band" in line for line in logs.output))
+        self.assertEqual(optimal_score, expected_score)
+        self.assertEqual(alignments[0].sequence_1.replace("-", ""), sequence_1)
+
+    def test_refusing_scoring_matrix_over_budget(self):
+        needleman_wunsch = NeedlemanWunsch(engine="auto", max_memory=2**10)
+
+        with self.assertRaises(MemoryBudgetError):
+            needleman_wunsch.build_scoring_matrix("GATTACA" * 10, "GCATGCT" * 10)
@@ -0,0 +1,47 @@
+from unittest import TestCase
+
+from global_sequence_alignment.needleman_wunsch import NeedlemanWunsch
+
+QUERY = "HEAGAWGHEE"
+TARGETS = ["PAWHEAE", "HEAGAWGHEE", "GAWG", "HEAE", "WWWW"]
+
+
+class TestPreparedQuery(TestCase):
+    def test_same_results_as_unprepared_alignment(self):
+        for engine in ["python", "numpy"]:
+            needleman_wunsch = NeedlemanWunsch("constant", "protein", engine)
+            prepared_query = needleman_wunsch.prepare(QUERY)
+            for target in TARGETS:
+                with self.subTest(engine=engine, target=target):
+                    self.assertEqual(
+                        prepared_query.score(target),
+                        needleman_wunsch.score(QUERY, target),
+                    )
+                    self.assertEqual(
+                        prepared_query.align(target)[:2],
+                        needleman_wunsch.align(QUERY, target)[:2],
+                    )
+
+    def test_affine_alignment(self):
+        needleman_wunsch = NeedlemanWunsch("affine", "protein")
+        prepared_query = needleman_wunsch.prepare(QUERY)
+
+        self.assertEqual(
+            prepared_query.align("PAWHEAE")[:2],
+            needleman_wunsch.align(QUERY, "PAWHEAE")[:2],
+        )
+
+    def test_rank(self):
+        prepared_query = NeedlemanWunsch("constant", "protein", "numpy").prepare(QUERY)
+        scores = {target: prepared_query.score(target) for target in TARGETS}
+        ranking = prepared_query.rank((target, target) for target in TARGETS)
+
+        self.assertEqual([name for name, _ in ranking][0], QUERY)
+        self.assertEqual(
+            [optimal_score for _, optimal_score in ranking],
+            sorted(scores.values(), reverse=True),
+        )
+        self.assertEqual(
+            prepared_query.rank(((target, target) for target in TARGETS), top=2),
+            ranking[:2],
+        )
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from unittest import TestCase
+
+from global_sequence_alignment.server import AlignmentServer
+
+JOB = {"sequence_1": "GATTACA", "sequence_2": "GCATGCT", "first_only": True}
+
+
+class BrokenExecutor:
+    """Executor whose workers died"""
+
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("A process in the process pool was terminated")
+
+    def shutdown(self, wait=True):
+        pass
+
+
+async def send_lines(server, socket_path, lines, limit=2**16):
+    """Send lines to server over a unix socket and get the response lines"""
+    unix_server = await asyncio.start_unix_server(
+        server.handle_connection, socket_path, limit=limit
+    )
+    async with unix_server:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        for line in lines:
+            writer.write(line + b"\n")
+        writer.write_eof()
+        responses = [json.loads(line) async for line in reader]
+        writer.close()
+    return responses
+
+
+class TestAlignmentServer(TestCase):
+    def test_equal_jobs_in_flight_are_merged(self):
+        async def align_twice():
+            async with AlignmentServer(workers=2) as server:
+                results = await asyncio.gather(server.align(JOB), server.align(JOB))
+                return server, results
+
+        server, results = asyncio.run(align_twice())
+
+        self.assertEqual(
+            results[0], {"score": 0, "alignments": [["G-ATTACA", "GCA-TGCT"]]}
+        )
+        self.assertEqual(results[1], results[0])
+        self.assertEqual((server.jobs_computed, server.jobs_merged), (1, 1))
+
+    def test_invalid_job(self):
+        async def align_invalid():
+            async with AlignmentServer() as server:
+                return await server.align({**JOB, "engine": "fortran"})
+
+        self.assertEqual(asyncio.run(align_invalid()), {"error": "Invalid engine"})
+
+    def test_job_fields_are_validated(self):
+        invalid_fields = [
+            ({"first_only": "false"}, "first_only has to be a boolean"),
+            ({"score_only": 1}, "score_only has to be a boolean"),
+            ({"max_alignments": True}, "max_alignments has to be a positive integer"),
+            ({"max_alignments": 0}, "max_alignments has to be a positive integer"),
+            ({"max_alignments": -1}, "max_alignments has to be a positive integer"),
+        ]
+
+        async def align_invalid():
+            async with AlignmentServer() as server:
+                return [
+                    await server.align({**JOB, **fields})
+                    for fields, _ in invalid_fields
+                ]
+
+        for (fields, error), result in zip(
+            invalid_fields, asyncio.run(align_invalid())
+        ):
+            with self.subTest(fields=fields):
+                self.assertEqual(result, {"error": error})
+
+    def test_jobs_over_limits_get_errors(self):
+        async def align_over_limits():
+            async with AlignmentServer(
+                max_alignments=2, max_sequence_length=7
+            ) as server:
+                return await asyncio.gather(
+                    server.align({**JOB, "first_only": False}),
+                    server.align({**JOB, "max_alignments": 3}),
+                    server.align({**JOB, "sequence_2": "GCATGCTA"}),
+                )
+
+        limited, too_many, too_long = asyncio.run(align_over_limits())
+
+        self.assertEqual(len(limited["alignments"]), 2)
+        self.assertEqual(too_many, {"error": "max_alignments has to be at most 2"})
+        self.assertEqual(
+            too_long, {"error": "Sequences have to be at most 7 symbols long"}
+        )
+
+    def test_jobs_over_unix_socket(self):
+        jobs = [
+            {"id": job_id, **JOB, "sequence_2": "GA" * job_id} for job_id in range(4)
+        ]
+
+        async def send_jobs(socket_path):
+            async with AlignmentServer(workers=2, max_pending=1) as server:
+                lines = [json.dumps(job).encode() for job in jobs] + [b"not json"]
+                return server, await send_lines(server, socket_path, lines)
+
+        with tempfile.TemporaryDirectory() as directory:
+            server, responses = asyncio.run(
+                send_jobs(os.path.join(directory, "server.sock"))
+            )
+
+        self.assertEqual(len(responses), len(jobs) + 1)
+        self.assertIn({"error": "Job has to be a JSON object"}, responses)
+        self.assertEqual(
+            sorted(response["id"] for response in responses if "id" in response),
+            [0, 1, 2, 3],
+        )
+        self.assertEqual(server.pending_jobs._value, 1)
+
+    def test_too_long_lines_get_errors(self):
+        long_job = {"id": 0, **JOB, "sequence_2": "GA" * 1000}
+        lines = [json.dumps(long_job).encode(), json.dumps({"id": 1, **JOB}).encode()]
+
+        async def send_jobs(socket_path):
+            async with AlignmentServer() as server:
+                return await send_lines(server, socket_path, lines, limit=1000)
+
+        with tempfile.TemporaryDirectory() as directory:
+            responses = asyncio.run(send_jobs(os.path.join(directory, "server.sock")))
+
+        self.assertEqual(
+            responses,
+            [
+                {"error": "Job line is too long"},
+                {"id": 1, "score": 0, "alignments": [["G-ATTACA", "GCA-TGCT"]]},
+            ],
+        )
+
+    def test_jobs_of_broken_workers_get_errors(self):
+        jobs = [{"id": job_id, **JOB} for job_id in [1, 2]]
+
+        async def send_jobs(socket_path):
+            async with AlignmentServer(workers=2, max_pending=1) as server:
+                server.executor.shutdown()
+                server.executor = BrokenExecutor()
+                lines = [json.dumps(job).encode() for job in jobs]
+                return await send_lines(server, socket_path, lines)
+
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertLogs(level="ERROR"):
+                responses = asyncio.run(
+                    send_jobs(os.path.join(directory, "server.sock"))
+                )
+
+        # Workers are restarted for the next job
+        self.assertEqual(
+            responses,
+            [
+                {"id": 1, "error": "Worker process terminated abruptly"},
+                {"id": 2, "score": 0, "alignments": [["G-ATTACA", "GCA-TGCT"]]},
+            ],
+        )
@@ -0,0 +1,130 @@
+import random
+from unittest import TestCase
+
+from global_sequence_alignment import striped
+from global_sequence_alignment.linear_space import compute_last_row
+from global_sequence_alignment.needleman_wunsch import (
+    AffineGapPenalty,
+    AffineScoringMatrix,
+    LinearGapPenalty,
+    NeedlemanWunsch,
+    NucleotideSubstitutionMatrix,
+    ProteinSubstitutionMatrix,
+)
+
+
+def random_sequence(symbols, max_length):
+    return "".join(random.choices(symbols, k=random.randint(0, max_length)))
+
+
+class TestStriped(TestCase):
+    def test_same_last_row_as_python_engine(self):
+        random.seed(0)
+        substitution_matrix = ProteinSubstitutionMatrix()
+        for lanes in [1, 4, 64]:
+            for _ in range(20):
+                sequence_1 = random_sequence("ACDEFGHIKLMNPQRSTVWY", 40)
+                sequence_2 = random_sequence("ACDEFGHIKLMNPQRSTVWY", 40)
+                profile = striped.StripedProfile(sequence_1, substitution_matrix, lanes)
+                with self.subTest(lanes=lanes, sequences=(sequence_1, sequence_2)):
+                    self.assertEqual(
+                        striped.compute_last_row(
+                            sequence_1, sequence_2, -2, -2, substitution_matrix, profile
+                        ).tolist(),
+                        compute_last_row(
+                            sequence_1, sequence_2, -2, substitution_matrix
+                        ),
+                    )
+
+    def test_same_score_as_affine_scoring_matrix(self):
+        random.seed(1)
+        substitution_matrix = NucleotideSubstitutionMatrix()
+        scoring_function = AffineGapPenalty(gap_penalty=-5, gap_extension_penalty=-1)
+        for lanes in [1, 4, 64]:
+            for _ in range(20):
+                sequence_1 = random_sequence("ACGT", 40)
+                sequence_2 = random_sequence("ACGT", 40)
+                scoring_matrix = AffineScoringMatrix(
+                    sequence_1, sequence_2, scoring_function, substitution_matrix
+                )
+                scoring_matrix.fill()
+                profile = striped.StripedProfile(sequence_1, substitution_matrix, lanes)
+                with self.subTest(lanes=lanes, sequences=(sequence_1, sequence_2)):
+                    self.assertEqual(
+                        striped.compute_last_row(
+                            sequence_1, sequence_2, -5, -1, substitution_matrix, profile
+                        )[-1],
+                        scoring_matrix.get_optimal_score(),
+                    )
+
+    def test_overflowing_int16_lanes_falls_back_to_int32(self):
+        substitution_matrix = NucleotideSubstitutionMatrix()
+        sequence_1 = "A" * 2000
+        sequence_2 = "C" * 2000
+
+        with self.assertLogs(level="INFO") as logs:
+            last_row = striped.compute_last_row(
+                sequence_1, sequence_2, -20, -20, substitution_matrix
+            )
+
+        self.assertIn("Scores overflow int16 lanes", logs.output[0])
+        self.assertEqual(
+            last_row.tolist(),
+            compute_last_row(
+                sequence_1, sequence_2, -20, substitution_matrix, engine="numpy"
+            ).tolist(),
+        )
+
+    def test_gap_extension_penalty_below_opening_one(self):
+        with self.assertRaises(ValueError):
+            striped.get_gap_penalties(
+                AffineGapPenalty(gap_penalty=-1, gap_extension_penalty=-5)
+            )
+
+    def test_gap_penalties(self):
+        self.assertEqual(striped.get_gap_penalties(LinearGapPenalty(-3)), (-3, -3))
+        self.assertEqual(
+            striped.get_gap_penalties(AffineGapPenalty(-10, -1)), (-10, -1)
+        )
+
+
+class TestStripedEngine(TestCase):
+    def test_score(self):
+        for scoring_function in ["constant", "linear", "affine"]:
+            expected = NeedlemanWunsch(scoring_function, "protein").align(
+                "HEAGAWGHEE", "PAWHEAE"
+            )[1]
+            with self.subTest(scoring_function=scoring_function):
+                self.assertEqual(
+                    NeedlemanWunsch(scoring_function, "protein", "striped").score(
+                        "HEAGAWGHEE", "PAWHEAE"
+                    ),
+                    expected,
+                )
+
+    def test_prepared_query(self):
+        needleman_wunsch = NeedlemanWunsch("affine", "protein", "striped")
+        prepared_query = needleman_wunsch.prepare("HEAGAWGHEE")
+
+        for target in ["PAWHEAE", "HEAGAWGHEE", "", "W"]:
+            with self.subTest(target=target):
+                self.assertEqual(
+                    prepared_query.score(target),
+                    needleman_wunsch.score("HEAGAWGHEE", target),
+                )
+
+    def test_low_memory_alignment(self):
+        expected = NeedlemanWunsch("constant", "nucleotide").align("GATTACA", "GCATGCT")
+
+        alignment, optimal_score = NeedlemanWunsch(
+            "constant", "nucleotide", "striped"
+        ).align_linear_space("GATTACA", "GCATGCT")
+
+        self.assertEqual(optimal_score, expected[1])
+        self.assertIn(alignment, expected[0])
+
+    def test_scoring_matrix_is_not_built(self):
+        with self.assertRaises(ValueError):
+            NeedlemanWunsch("constant", "nucleotide", "striped").build_scoring_matrix(
+                "GATTACA", "GCATGCT"
+            )
@@ -0,0 +1,182 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+
+from global_sequence_alignment.jobs import parse_job
+from global_sequence_alignment.needleman_wunsch import NeedlemanWunsch
+from global_sequence_alignment.substitution_matrices import (
+    NCBI_MATRICES,
+    MatrixFormatError,
+    get_sidecar_path,
+    load_substitution_matrix,
+    parse_ncbi_matrix,
+    register_matrix_file,
+)
+
+SMALL_MATRIX = """# Made up matrix
+   A  C  G
+A  2 -1 -3
+G -3 -2  5
+C -1  4 -2
+"""
+
+
+def write_matrix_file(directory, text, name="SMALL"):
+    file_path = os.path.join(directory, name)
+    with open(file_path, "w") as f:
+        f.write(text)
+    return file_path
+
+
+class TestParseNcbiMatrix(TestCase):
+    def test_rows_in_order_of_columns(self):
+        scores, symbols = parse_ncbi_matrix(SMALL_MATRIX)
+
+        self.assertEqual(symbols, ["A", "C", "G"])
+        self.assertEqual(scores, [[2, -1, -3], [-1, 4, -2], [-3, -2, 5]])
+
+    def test_malformed_matrices(self):
+        for text in [
+            "",
+            "A C\nA 1 0\n",
+            "A C\nA 1 0\nC 0\n",
+            "A C\nA 1 0\nC 0 x\n",
+            "A C\nA 1 0\nA 1 0\nC 0 1\n",
+            "A A\nA 1 0\nA 0 1\n",
+            "A \u00c5\nA 1 0\n\u00c5 0 1\n",
+        ]:
+            with self.subTest(text=text), self.assertRaises(MatrixFormatError):
+                parse_ncbi_matrix(text)
+
+
+def use_temporary_cache_home(test_case):
+    """Keep sidecars written by a test in a temporary cache directory"""
+    cache_home = tempfile.TemporaryDirectory()
+    test_case.addCleanup(cache_home.cleanup)
+    patcher = mock.patch.dict(os.environ, {"XDG_CACHE_HOME": cache_home.name})
+    patcher.start()
+    test_case.addCleanup(patcher.stop)
+    return cache_home.name
+
+
+class TestLoadSubstitutionMatrix(TestCase):
+    def setUp(self):
+        self.cache_home = use_temporary_cache_home(self)
+
+    def test_bundled_matrices(self):
+        blosum62 = load_substitution_matrix("BLOSUM62")
+        nucleotide = load_substitution_matrix("NUC.4.4")
+
+        self.assertEqual(blosum62.get_score("W", "W"), 11)
+        self.assertEqual(blosum62.get_score("A", "R"), -1)
+        self.assertEqual(blosum62.get_score("*", "*"), 1)
+        self.assertEqual(nucleotide.get_score("A", "A"), 5)
+        self.assertEqual(nucleotide.get_score("A", "T"), -4)
+
+    def test_sidecar_reused_while_file_is_unchanged(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = write_matrix_file(directory, SMALL_MATRIX)
+            sidecar_path = get_sidecar_path(file_path)
+
+            parsed = load_substitution_matrix(file_path)
+            self.assertTrue(os.path.exists(sidecar_path))
+            self.assertTrue(sidecar_path.startswith(self.cache_home))
+            # A sidecar matching the file is read without parsing the file
+            stat = os.stat(file_path)
+            with open(file_path, "w") as f:
+                f.write(SMALL_MATRIX.replace("#", "!"))
+            os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            from_sidecar = load_substitution_matrix(file_path)
+
+            write_matrix_file(directory, SMALL_MATRIX.replace(" 5\n", " 7\n"))
+            os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            changed = load_substitution_matrix(file_path)
+
+        self.assertEqual(from_sidecar.symbol_to_index, parsed.symbol_to_index)
+        self.assertEqual(from_sidecar.scores, parsed.scores)
+        self.assertEqual(changed.get_score("G", "G"), 7)
+
+    def test_unwritable_sidecar_loads_without_it(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = write_matrix_file(directory, SMALL_MATRIX)
+            os.makedirs(get_sidecar_path(file_path))
+
+            with self.assertLogs(level="INFO"):
+                substitution_matrix = load_substitution_matrix(file_path)
+
+        self.assertEqual(substitution_matrix.get_score("C", "C"), 4)
+
+    def test_unknown_matrix(self):
+        with self.assertRaisesRegex(ValueError, "Invalid substitution matrix"):
+            load_substitution_matrix("BLOSUM1000")
+
+    def test_unreadable_matrix_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaisesRegex(ValueError, "Cannot read substitution matrix"):
+                load_substitution_matrix(directory)
+
+    def test_sidecars_of_files_with_the_same_name(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.mkdir(os.path.join(directory, "other"))
+            file_path = write_matrix_file(directory, SMALL_MATRIX)
+            other_path = write_matrix_file(
+                os.path.join(directory, "other"), SMALL_MATRIX.replace(" 5\n", " 7\n")
+            )
+
+            substitution_matrix = load_substitution_matrix(file_path)
+            other_matrix = load_substitution_matrix(other_path)
+
+            # Sidecars are not written next to the files
+            self.assertEqual(sorted(os.listdir(directory)), ["SMALL", "other"])
+        self.assertEqual(substitution_matrix.get_score("G", "G"), 5)
+        self.assertEqual(other_matrix.get_score("G", "G"), 7)
+
+    def test_registered_matrix_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = write_matrix_file(directory, SMALL_MATRIX)
+            register_matrix_file("SMALL", file_path)
+            try:
+                substitution_matrix = load_substitution_matrix("SMALL")
+                job = parse_job(
+                    {
+                        "sequence_1": "A",
+                        "sequence_2": "C",
+                        "substitution_matrix": "SMALL",
+                    }
+                )
+            finally:
+                del NCBI_MATRICES["SMALL"]
+
+        self.assertEqual(substitution_matrix.get_score("A", "G"), -3)
+        self.assertEqual(job[3], "SMALL")
+
+    def test_jobs_do_not_take_file_paths(self):
+        with self.assertRaises(ValueError):
+            parse_job(
+                {
+                    "sequence_1": "A",
+                    "sequence_2": "A",
+                    "substitution_matrix": NCBI_MATRICES["BLOSUM62"],
+                }
+            )
+
+
+class TestNeedlemanWunschWithNcbiMatrices(TestCase):
+    def setUp(self):
+        use_temporary_cache_home(self)
+
+    def test_aligning_with_matrix_name_and_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "blosum80.txt")
+            shutil.copyfile(NCBI_MATRICES["BLOSUM80"], file_path)
+
+            by_name = NeedlemanWunsch("constant", "BLOSUM80").align(
+                "HEAGAWGHEE", "PAWHEAE"
+            )
+            by_path = NeedlemanWunsch("constant", file_path).align(
+                "HEAGAWGHEE", "PAWHEAE"
+            )
+
+        self.assertEqual(by_name[:2], by_path[:2])
+        self.assertEqual(by_name[1], 45)
@@ -1,6 +1,335 @@
-from unittest import TestCase
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase, mock
+
+from click.testing import CliRunner
+
+from global_sequence_alignment.needleman_wunsch import Alignment
+from global_sequence_alignment.substitution_matrices import load_substitution_matrix
+from main import cli, read_fasta_file, write_optimal_alignments_to_file
+
+
+def write_fasta_file(directory, name, sequence):
+    file_path = os.path.join(directory, f"{name}.fna")
+    with open(file_path, "w") as f:
+        f.write(f">{name}\n{sequence}\n")
+    return file_path
 
 
 class TestMain(TestCase):
     def test_main(self):
         self.assertTrue(True)
+
+    def test_writing_alignments_from_generator(self):
+        alignments = (Alignment(s, s) for s in ["GA", "TC"])
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "output.txt")
+            alignments_written = write_optimal_alignments_to_file(file_path, alignments)
+            with open(file_path) as f:
+                content = f.read()
+
+        self.assertEqual(alignments_written, 2)
+        self.assertEqual(content, "GA\nGA\n\nTC\nTC\n")
+
+    def test_aligning_directly_provided_sequences(self):
+        result = CliRunner().invoke(cli, ["--direct", "GA", "G"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Optimal score: 0", result.output)
+        self.assertIn("GA\nG-", result.output)
+
+    def test_striped_engine_scores_only(self):
+        result = CliRunner().invoke(
+            cli, ["--direct", "GATTACA", "GCATGCT", "--engine=striped", "--score-only"]
+        )
+        rejected = CliRunner().invoke(
+            cli, ["--direct", "GATTACA", "GCATGCT", "--engine=striped"]
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Optimal score: 0", result.output)
+        self.assertEqual(rejected.exit_code, 2)
+
+    def test_auto_engine_within_memory_budget(self):
+        result = CliRunner().invoke(cli, ["--direct", "GA", "G", "--engine=auto"])
+        refused = CliRunner().invoke(
+            cli, ["--direct", "GA", "G", "--engine=auto", "--max-memory=10"]
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Planned full with the python engine", result.output)
+        self.assertIn("GA\nG-", result.output)
+        self.assertEqual(refused.exit_code, 1)
+        self.assertIn("Memory budget of 10 B is too small", refused.output)
+
+    def test_anchored_alignment(self):
+        sequence_1 = "ACGTTGCAGGATTACA" + "C" + "TTGACCGTAGCATGCA"
+        sequence_2 = "ACGTTGCAGGATTACA" + "GG" + "TTGACCGTAGCATGCA"
+
+        result = CliRunner().invoke(
+            cli,
+            ["--direct", sequence_1, sequence_2, "--anchor-k=8", "--verify-anchors"],
+        )
+        rejected = CliRunner().invoke(cli, ["--direct", "GA", "G", "--verify-anchors"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Anchored 32 of 33 symbols in 2 segments", result.output)
+        self.assertIn("Anchored score is the optimal score 30", result.output)
+        self.assertEqual(rejected.exit_code, 2)
+
+    def test_band(self):
+        result = CliRunner().invoke(cli, ["--direct", "GATTACA", "GCATGCT", "--band=0"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Optimal score: 0", result.output)
+        for band in ["abc", "-1", "1.5"]:
+            rejected = CliRunner().invoke(
+                cli, ["--direct", "GATTACA", "GCATGCT", f"--band={band}"]
+            )
+
+            with self.subTest(band=band):
+                self.assertEqual(rejected.exit_code, 2)
+                self.assertIn(
+                    "has to be a non-negative integer or 'auto'", rejected.output
+                )
+
+    def test_affine_scoring_function(self):
+        arguments = ["--direct", "GATTACA", "GCATGCT", "--scoring_function=affine"]
+
+        result = CliRunner().invoke(cli, arguments + ["--score-only"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Optimal score: ", result.output)
+        for options in [["--band=2"], ["--low-memory"], ["--engine=numpy"]]:
+            rejected = CliRunner().invoke(cli, arguments + options)
+
+            with self.subTest(options=options):
+                self.assertEqual(rejected.exit_code, 2)
+                self.assertIn("--scoring_function=affine", rejected.output)
+
+    def test_checkpoint_requires_full_matrix(self):
+        for option in ["--score-only", "--low-memory", "--band=auto", "--anchor-k=8"]:
+            result = CliRunner().invoke(
+                cli, ["--direct", "GA", "G", "--checkpoint=fill.checkpoint", option]
+            )
+
+            with self.subTest(option=option):
+                self.assertEqual(result.exit_code, 2)
+                self.assertIn(
+                    "--checkpoint requires the full scoring matrix", result.output
+                )
+
+    def test_log_level_before_sequences(self):
+        result = CliRunner().invoke(
+            cli, ["--log-level", "WARNING", "--direct", "GA", "G"]
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Optimal score: 0", result.output)
+        self.assertNotIn("INFO", result.output)
+
+    def test_stdin_jsonl(self):
+        jobs = [
+            {"id": 1, "sequence_1": "GA", "sequence_2": "G"},
+            {
+                "id": 2,
+                "sequence_1": "GATTACA",
+                "sequence_2": "GCATGCT",
+                "score_only": True,
+            },
+            {"id": 3, "sequence_1": "GU", "sequence_2": "G"},
+        ]
+        result = CliRunner().invoke(
+            cli,
+            ["--stdin-jsonl"],
+            input="".join(json.dumps(job) + "\n" for job in jobs) + "not json\n",
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(
+            [json.loads(line) for line in result.stdout.splitlines()],
+            [
+                {"id": 1, "score": 0, "alignments": [["GA", "G-"]]},
+                {"id": 2, "score": 0, "alignments": []},
+                {"id": 3, "error": "Symbol U is not in the substitution matrix"},
+                {"error": "Job has to be a JSON object"},
+            ],
+        )
+
+    def test_import_has_no_side_effects(self):
+        code = (
+            "import logging, sys, main; "
+            "print(len(logging.getLogger().handlers), "
+            "'numpy' in sys.modules, 'asyncio' in sys.modules)"
+        )
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(sys.modules["main"].__file__))
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+        self.assertEqual(output.split(), ["0", "False", "False"])
+
+    def test_profile_written_as_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profile_path = os.path.join(directory, "profile.json")
+            result = CliRunner().invoke(
+                cli,
+                ["--direct", "GATTACA", "GCATGCT", "--profile-output", profile_path],
+            )
+            with open(profile_path) as f:
+                profile = json.load(f)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(
+            set(profile["phases"]), {"init", "fill", "traceback", "serialization"}
+        )
+        self.assertEqual(profile["cells"], 49)
+
+    def test_inspecting_saved_matrix(self):
+        with tempfile.TemporaryDirectory() as directory:
+            matrix_path = os.path.join(directory, "matrix.bin")
+            aligned = CliRunner().invoke(
+                cli, ["--direct", "GA", "G", "--save-matrix", matrix_path]
+            )
+            inspected = CliRunner().invoke(
+                cli, ["inspect", matrix_path, "--matrix-window", "1:,1:"]
+            )
+
+        self.assertEqual(aligned.exit_code, 0)
+        self.assertEqual(inspected.exit_code, 0)
+        self.assertIn("Optimal score: 0", inspected.output)
+        self.assertIn("GA\nG-", inspected.output)
+        self.assertIn(" ↖      \n   1 ← 0", inspected.output)
+
+    def test_batch(self):
+        with tempfile.TemporaryDirectory() as directory:
+            fasta_files = [
+                write_fasta_file(directory, name, sequence)
+                for name, sequence in [
+                    ("a", "GATTACA"),
+                    ("b", "GTCGACGCA"),
+                    ("c", "GA"),
+                ]
+            ]
+            output_dir = os.path.join(directory, "output")
+
+            result = CliRunner().invoke(
+                cli, ["batch", *fasta_files, "--first-only", "--output-dir", output_dir]
+            )
+
+            self.assertEqual(result.exit_code, 0)
+            with open(os.path.join(output_dir, "score_matrix.tsv")) as f:
+                score_matrix = f.read()
+            with open(os.path.join(output_dir, "a_b.txt")) as f:
+                alignment = f.read()
+
+        self.assertEqual(
+            score_matrix, "\ta\tb\tc\na\t\t0\t-3\nb\t0\t\t-5\nc\t-3\t-5\t\n"
+        )
+        self.assertEqual(alignment, "GAT-TA--CA\nG-TCGACGCA\n")
+
+    def test_reading_first_record_of_fasta_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "sequences.fna")
+            with open(file_path, "w") as f:
+                f.write(">a\nGATT\nACA\n>b\nGA\n")
+
+            with self.assertLogs(level="WARNING"):
+                sequence = read_fasta_file(file_path)
+
+        self.assertEqual(sequence, "GATTACA")
+
+    def test_batch_of_multi_record_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "sequences.fna")
+            with open(file_path, "w") as f:
+                f.write(">a first\nGATTACA\n>b second\nGTCGACGCA\n>c\nGA\n")
+            output_dir = os.path.join(directory, "output")
+
+            result = CliRunner().invoke(
+                cli, ["batch", file_path, "--score-only", "--output-dir", output_dir]
+            )
+
+            self.assertEqual(result.exit_code, 0)
+            with open(os.path.join(output_dir, "scores.tsv")) as f:
+                scores = f.read()
+
+        self.assertEqual(
+            scores,
+            "sequence_1\tsequence_2\toptimal_score\na\tb\t0\na\tc\t-3\nb\tc\t-5\n",
+        )
+
+    def test_search(self):
+        with tempfile.TemporaryDirectory() as directory:
+            query_path = write_fasta_file(directory, "query", "GATTACA")
+            targets_path = os.path.join(directory, "targets.fna")
+            with open(targets_path, "w") as f:
+                f.write(">a\nGA\n>b\nGATTACA\n>c\nGTCGACGCA\n")
+            single_target_path = write_fasta_file(directory, "d", "GATTCA")
+
+            result = CliRunner().invoke(
+                cli,
+                ["search", query_path, targets_path, single_target_path, "--top", "3"],
+            )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(
+            result.output.endswith(
+                "rank\ttarget\toptimal_score\n1\tb\t7\n2\td\t5\n3\tc\t0\n"
+            )
+        )
+
+    def test_ncbi_substitution_matrix(self):
+        with mock.patch(
+            "global_sequence_alignment.substitution_matrices.load_substitution_matrix",
+            wraps=load_substitution_matrix,
+        ) as load:
+            result = CliRunner().invoke(
+                cli,
+                ["--direct", "HEAGAWGHEE", "PAWHEAE", "--substitution_matrix=BLOSUM80"],
+            )
+        unknown = CliRunner().invoke(
+            cli, ["--direct", "GA", "G", "--substitution_matrix=BLOSUM1000"]
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Optimal score: 45", result.output)
+        load.assert_called_once_with("BLOSUM80")
+        self.assertEqual(unknown.exit_code, 2)
+        self.assertIn("Invalid substitution matrix BLOSUM1000", unknown.output)
+
+    def test_msa(self):
+        with tempfile.TemporaryDirectory() as directory:
+            fasta_files = [
+                write_fasta_file(directory, name, sequence)
+                for name, sequence in [
+                    ("a", "GATTACA"),
+                    ("b", "GATTTACA"),
+                    ("c", "GATACA"),
+                ]
+            ]
+            output_path = os.path.join(directory, "msa.fna")
+
+            result = CliRunner().invoke(
+                cli, ["msa", *fasta_files, "--output-path", output_path]
+            )
+
+            self.assertEqual(result.exit_code, 0)
+            with open(output_path) as f:
+                records = f.read().split(">")[1:]
+
+        names = [record.split("\n")[0] for record in records]
+        rows = [record.split("\n", 1)[1].replace("\n", "") for record in records]
+        self.assertEqual(names, ["a", "b", "c"])
+        self.assertEqual(
+            [row.replace("-", "") for row in rows], ["GATTACA", "GATTTACA", "GATACA"]
+        )
+        self.assertEqual({len(row) for row in rows}, {8})